@@ -16,11 +16,1856 @@ implementation details.  Helper functions such as the database connection
 are also documented.
 """
 
+import asyncio
+import atexit
+import base64
+import bisect
+import contextvars
+import csv
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
 import os
+import queue
+import re
 import sqlite3
-from typing import List, Dict, Any
+import ssl
+import struct
+import threading
+import time
+import unicodedata
+import urllib.parse
+import weakref
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence
 
-from flask import Flask, render_template, request, g, redirect, url_for, flash, session
+import click
+from flask import (Flask, render_template, request, g, redirect, url_for, flash, session,
+                   jsonify, make_response, send_file, stream_template,
+                   before_render_template, template_rendered)
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.datastructures import MultiDict
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:
+    # Optional: without it `flask snapshot build` only writes gzip variants.
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Columns of the `sites` table covered by the free-text search index.
+SEARCH_COLUMNS = ('name', 'description', 'verification_type', 'context', 'country', 'sources')
+
+# Common verification keywords used across the site entries.  They populate
+# the filter and suggestion drop-downs and the `site_verification_methods`
+# junction table.
+VERIFICATION_TYPES = (
+    'Pièce d’identité', 'Selfie', 'Selfie vidéo', 'Estimation faciale',
+    'Carte bancaire', 'Numéro de téléphone', 'Yoti', 'Persona',
+    'Veriff', 'FaceTec', 'Stripe', 'k‑iD', 'Pas d’ID requis'
+)
+
+# Flags for country codes and regions that cannot be derived from a
+# two-letter ISO code.
+FLAG_EMOJIS = {
+    'FR': '🇫🇷',
+    'UK': '🇬🇧',
+    'AU': '🇦🇺',
+    'US': '🇺🇸',
+    'EU': '🇪🇺',
+    'UE': '🇪🇺',
+    'UK, FR': '🇬🇧 🇫🇷',
+    'FR, UK': '🇫🇷 🇬🇧',
+    'International': '🌍'
+}
+
+# Severity levels as exposed in the `?severity=` filter, mapped to the label
+# and CSS class produced by `compute_severity` and the sortable rank stored
+# in `sites.severity_rank` (higher is more intrusive).
+SEVERITY_LEVELS = {
+    'low': ('Faible', 'severity-low', 0),
+    'medium': ('Moyen', 'severity-medium', 1),
+    'high': ('Élevé', 'severity-high', 2),
+    'very-high': ('Très élevé', 'severity-very-high', 3),
+}
+SEVERITY_RANKS = {css_class: rank for _, css_class, rank in SEVERITY_LEVELS.values()}
+
+# Editable columns of the `sites` table, in insertion order.
+SITE_COLUMNS = (
+    'name', 'url', 'category', 'description', 'verification_type',
+    'context', 'date_in_effect', 'status', 'country', 'sources'
+)
+
+# Fields exposed by the JSON API, selectable with `?fields=`.
+API_FIELDS = ('id',) + SITE_COLUMNS + ('severity_label', 'severity_class', 'alternatives')
+
+# Site fields included in the results of the domain lookup API.
+LOOKUP_FIELDS = ('id', 'name', 'url', 'severity_label', 'severity_class')
+
+# Number of catalogue changes kept in the `data_changes` log for the other
+# processes (see `sync_caches`); a process that falls further behind
+# drops all of its caches.
+DATA_CHANGES_KEEP = 1000
+
+# Signs, in the address or the start of a page reached by `flask links
+# check`, that a site asks for proof of age: wording of the verification
+# step and the domains of the providers that run it.
+AGE_GATE_PATTERN = re.compile(
+    r"age[ _-]?verif\w*|verify (?:your )?age|v[ée]rifi\w+ (?:de |votre |ton )?(?:l[’']|d[’'])?[âa]ge"
+    r"|yoti\.com|agechecked|go\.cam|verifymy|withpersona\.com|veriff\.(?:com|me)",
+    re.IGNORECASE,
+)
+
+# Health of a checked link as shown on the site pages (see `describe_link`).
+LINK_STATE_LABELS = {
+    'ok': 'Lien en ligne',
+    'gated': 'Vérification d’âge détectée',
+    'blocked': 'Accès refusé à la vérification automatique',
+    'broken': 'Lien inaccessible',
+}
+
+# Response types compressed by `compress_response` (see COMPRESSION).
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'application/json',
+    'application/javascript', 'application/x-ndjson', 'image/svg+xml',
+})
+
+# Leading bytes of the binary domain-set artifacts served by /api/domain-set.
+DOMAIN_SET_MAGIC = b'SIDS'
+
+# Columns of `sites` computed from the editable ones whenever a row is
+# written: the precomputed severity and the normalised URL key.
+SITE_DERIVED_COLUMNS = ('severity_label', 'severity_class', 'severity_rank', 'url_key')
+
+# Junction tables holding one row per (value, site) for the multi-valued
+# columns of `sites`, as (table name, value column) pairs.
+FACET_TABLES = (
+    ('site_categories', 'category'),
+    ('site_countries', 'country'),
+    ('site_verification_methods', 'method'),
+)
+
+# Facets counted in the `facet_counts` table, named after the `/sites`
+# query parameter that filters on them.  The first three are read from
+# the `FACET_TABLES` junction tables, `severity` from `sites.severity_rank`.
+FACET_NAMES = ('category', 'country', 'verification_type', 'severity')
+
+
+def build_fts_query(text: str) -> str:
+    """Translate a free-text search box value into an FTS5 MATCH expression.
+
+    The input is split into word tokens and each token is quoted (so that
+    characters such as `-`, `:` or `*` typed by visitors are never
+    interpreted as FTS5 operators) and turned into a prefix query.  All
+    tokens must match, mirroring the behaviour users expect from a search
+    box.  An empty string is returned when the input contains no word
+    characters at all.
+    """
+    tokens = re.findall(r'\w+', text)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+@lru_cache(maxsize=1024)
+def flag_emoji(country_string: str) -> str:
+    """Return flag emoji(s) for a comma-separated country code string.
+
+    Supports ISO country codes like 'FR' (🇫🇷), 'UK' (🇬🇧),
+    'AU' (🇦🇺), 'US' (🇺🇸) as well as 'UE'/'EU' (🇪🇺).  If multiple
+    codes are provided they will be concatenated with spaces.
+    If a code is unknown, it returns an empty string for that code.
+    The catalogue only holds a handful of distinct country strings, so
+    results are memoised.
+    """
+    if not country_string:
+        return ''
+    # If the entire string matches a mapping, return it directly
+    if country_string in FLAG_EMOJIS:
+        return FLAG_EMOJIS[country_string]
+    # Otherwise parse each code individually
+    flags: list[str] = []
+    for code in country_string.split(','):
+        code = code.strip()
+        if code in FLAG_EMOJIS:
+            flags.append(FLAG_EMOJIS[code])
+        else:
+            # Build Unicode flag for 2-letter code if possible
+            if len(code) == 2 and code.isalpha():
+                # Convert letters to regional indicator symbols
+                base = ord('🇦') - ord('A')
+                flag_chars = ''.join(chr(base + ord(ch.upper())) for ch in code)
+                flags.append(flag_chars)
+    return ' '.join(flags)
+
+
+def compute_severity(site_row: Mapping[str, Any]) -> tuple[str, str]:
+    """Compute a severity label and a corresponding CSS class based on site data.
+
+    Severity levels:
+        - low (green): optional verification, not restricted to a single country
+        - medium (yellow): verification planned or experimental, or
+          mandatory but limited to certain content types
+        - high (orange): mandatory verification or geo‑blocking in specific regions
+        - very-high (red): strict mandatory verification combined with blocking
+
+    The function returns a tuple (label, css_class).  It only depends on
+    the `status` and `country` fields and is evaluated when a site is
+    written; readers use the stored `severity_*` columns.
+    """
+    status = (site_row['status'] or '').lower()
+    country = (site_row['country'] or '').lower()
+    # Default values
+    label = 'Moyen'
+    css_class = 'severity-medium'
+    # Determine if verification is optional (facultatif) or required (obligatoire)
+    is_optional = any(word in status for word in ['facultatif', 'facultative', 'optionnel', 'optionnelle', 'optionnelle', 'optionnelle'])
+    is_mandatory = any(word in status for word in ['obligatoire', 'requise', 'vérification requise', 'mandatory', 'requis'])
+    is_blocked = any(word in status for word in ['bloqué', 'blocage', 'non accessible', 'blocage complet'])
+    # Determine if the country list implies global or local scope
+    # Consider multiple codes or explicit 'international' as global
+    country_codes = [c.strip() for c in country.split(',') if c.strip()]
+    is_global = False
+    if not country_codes or any(code in ['international', 'global', 'monde'] for code in country_codes):
+        is_global = True
+    elif len(country_codes) > 1:
+        is_global = True
+    # Compute severity according to rules
+    if is_blocked:
+        label = 'Très élevé'
+        css_class = 'severity-very-high'
+    elif is_mandatory:
+        # Mandatory verification.  If it applies globally or multiple regions, severity very high
+        if is_global:
+            label = 'Très élevé'
+            css_class = 'severity-very-high'
+        else:
+            label = 'Élevé'
+            css_class = 'severity-high'
+    elif is_optional:
+        # Optional verification.  If global scope, severity low; if localized, medium
+        if is_global:
+            label = 'Faible'
+            css_class = 'severity-low'
+        else:
+            label = 'Moyen'
+            css_class = 'severity-medium'
+    else:
+        # Unknown or planned/experimental status; treat as medium
+        label = 'Moyen'
+        css_class = 'severity-medium'
+    return label, css_class
+
+
+def severity_columns(site: Mapping[str, Any]) -> tuple[str, str, int]:
+    """Return the (severity_label, severity_class, severity_rank) values stored for a site."""
+    label, css_class = compute_severity(site)
+    return label, css_class, SEVERITY_RANKS[css_class]
+
+
+def site_row_values(site: Mapping[str, Any]) -> list[Any]:
+    """Return the values stored for a site, in `SITE_COLUMNS + SITE_DERIVED_COLUMNS` order.
+
+    Missing optional fields are stored as empty strings; the derived
+    columns are computed from the editable ones.
+    """
+    record = {column: site.get(column) or '' for column in SITE_COLUMNS}
+    values = [record[column] for column in SITE_COLUMNS]
+    values.extend(severity_columns(record))
+    values.append(normalize_url(record['url']))
+    return values
+
+
+def split_values(value: str | None) -> list[str]:
+    """Split a comma-joined column value (as written by `suggest`) into tokens.
+
+    Whitespace around each token is stripped, empty tokens are dropped and
+    duplicates are removed while preserving the original order.
+    """
+    if not value:
+        return []
+    return list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+
+
+def iter_json_array(stream, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the items of the JSON array read from the text `stream`, one at a time.
+
+    The stream is read `chunk_size` characters at a time and each item is
+    decoded with `JSONDecoder.raw_decode` as soon as it is complete, so
+    only the current item (and one chunk) is held in memory whatever the
+    size of the array.  Raises `ValueError` when the input is not an array.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer, position = buffer[position:] + chunk, 0
+        return True
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return ''
+
+    if next_char() != '[':
+        raise ValueError('expected a JSON array')
+    position += 1
+    if next_char() == ']':
+        return
+    separator_pattern = re.compile(r'\s*([,\]])')
+    while True:
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # An item cut at the end of the buffer (a number, say) can
+            # decode too early: it is complete once "," or "]" follows.
+            separator = separator_pattern.match(buffer, end)
+            if separator is not None or not fill():
+                break
+        if separator is None:
+            raise ValueError('expected "," or "]" in the JSON array')
+        position = separator.end()
+        yield item
+        if separator.group(1) == ']':
+            return
+
+
+def match_verification_methods(verification_type: str | None) -> list[str]:
+    """Return the `VERIFICATION_TYPES` keywords mentioned in a free-text description.
+
+    The `verification_type` column holds prose such as "Selfie vidéo ou
+    pièce d’identité via un prestataire".  A keyword applies when it occurs
+    anywhere in that text, compared case-insensitively; this is the same
+    rule the former `LIKE '%keyword%'` filter used.
+    """
+    if not verification_type:
+        return []
+    text = verification_type.casefold()
+    return [keyword for keyword in VERIFICATION_TYPES if keyword.casefold() in text]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of a row into an opaque, URL-safe cursor."""
+    raw = json.dumps(list(values), separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str | None, length: int) -> list[Any] | None:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Returns None for a missing, malformed or foreign cursor (for example
+    one issued for a different sort order) so callers fall back to the
+    first page instead of failing.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+def build_site_query(args: MultiDict) -> tuple[str, list[Any], list[tuple[str, str, bool]]]:
+    """Build the filtered `sites` query shared by the HTML listing and the API.
+
+    Returns `(sql, params, sort_keys)` where `sql` is a SELECT ending with
+    its WHERE clause (no ORDER BY or LIMIT) and `sort_keys` lists `(sql_expression, result_column,
+    descending)` tuples describing the total order of the result.  The
+    last sort key is always the primary key so that keyset pagination is
+    stable.  See `list_sites` for the supported query parameters.
+    """
+    # Empty values come from the "Toutes" option of the drop-downs.
+    categories = [value for value in args.getlist('category') if value]
+    verifs = [value for value in args.getlist('verification_type') if value]
+    countries = [value for value in args.getlist('country') if value]
+    query = args.get('q')
+    severities = [level for level in args.getlist('severity') if level in SEVERITY_LEVELS]
+
+    sql = 'SELECT sites.*'
+    joins = ''
+    params: list[Any] = []
+    conditions: list[str] = []
+    sort_keys = [('sites.name', 'name', False), ('sites.id', 'id', False)]
+    # Free text search goes through the FTS5 index.  Its MATCH parameter
+    # must come first because the JOIN precedes the WHERE clause.
+    fts_query = build_fts_query(query) if query else ''
+    if fts_query:
+        sql += ', bm25(sites_fts) AS score'
+        joins = ' JOIN sites_fts ON sites_fts.rowid = sites.id AND sites_fts MATCH ?'
+        params.append(fts_query)
+        sort_keys.insert(0, ('bm25(sites_fts)', 'score', False))
+    elif query:
+        # Only punctuation was entered: nothing can match.
+        conditions.append('0')
+    # Category, verification and country filters are resolved through
+    # the junction tables: each selected group becomes an indexed
+    # primary-key lookup returning the matching site IDs.  Values
+    # within a group are OR-ed, groups are AND-ed.
+    for (table, column), selected_values in zip(FACET_TABLES, (categories, countries, verifs)):
+        if selected_values:
+            placeholders = ','.join('?' * len(selected_values))
+            conditions.append(
+                f'sites.id IN (SELECT site_id FROM {table} WHERE {column} IN ({placeholders}))'
+            )
+            params.extend(selected_values)
+    if severities:
+        placeholders = ','.join('?' * len(severities))
+        conditions.append(f'sites.severity_rank IN ({placeholders})')
+        params.extend(SEVERITY_LEVELS[level][2] for level in severities)
+    if args.get('sort') == 'severity':
+        sort_keys.insert(0, ('sites.severity_rank', 'severity_rank', True))
+    # The WHERE clause is always present so that callers can append further
+    # conditions with AND.
+    sql += ' FROM sites' + joins + ' WHERE ' + (' AND '.join(conditions) or '1')
+    return sql, params, sort_keys
+
+
+def build_facet_count_query(args: MultiDict) -> tuple[str, list[Any]] | None:
+    """Build one statement counting the sites per facet value under the filters in `args`.
+
+    Returns `(sql, params)` yielding `(facet, value, count)` rows, or None
+    when no filter is active, in which case the global counts stored in
+    `facet_counts` apply as they are.  Each facet is counted over the
+    sites matching every active filter except its own, so the values of a
+    facet show how many sites selecting them would yield (values within
+    a facet are OR-ed).  Facets sharing the same filter set share one CTE,
+    evaluated once; a facet whose only active filter is its own reads its
+    stored counts instead.  Severity values are returned as ranks.
+    """
+    def active(name: str) -> bool:
+        if name == 'severity':
+            return any(level in SEVERITY_LEVELS for level in args.getlist(name))
+        return any(args.getlist(name))
+
+    query = bool(args.get('q'))
+    filtered = [name for name in FACET_NAMES if active(name)]
+    if not query and not filtered:
+        return None
+    ctes: dict[tuple[str, ...], str] = {}
+    cte_sql: list[str] = []
+    params: list[Any] = []
+    selects: list[str] = []
+    tables = dict(zip(FACET_NAMES, FACET_TABLES))
+    for name in FACET_NAMES:
+        others = tuple(other for other in filtered if other != name)
+        if not query and not others:
+            selects.append(f"SELECT facet, value, count FROM facet_counts WHERE facet = '{name}'")
+            continue
+        if others not in ctes:
+            ctes[others] = f'matched_{len(ctes)}'
+            base = MultiDict([(key, value) for key, value in args.items(multi=True)
+                              if key == 'q' or key in others])
+            sql, base_params, _ = build_site_query(base)
+            cte_sql.append(f'{ctes[others]}(id) AS (SELECT id FROM ({sql}))')
+            params.extend(base_params)
+        matched = ctes[others]
+        if name == 'severity':
+            selects.append(f"SELECT 'severity', severity_rank, COUNT(*) FROM sites "
+                           f'WHERE id IN {matched} GROUP BY severity_rank')
+        else:
+            table, column = tables[name]
+            selects.append(f"SELECT '{name}', {column}, COUNT(*) FROM {table} "
+                           f'WHERE site_id IN {matched} GROUP BY {column}')
+    sql = ' UNION ALL '.join(selects)
+    if cte_sql:
+        sql = 'WITH ' + ', '.join(cte_sql) + ' ' + sql
+    return sql, params
+
+
+def collect_facet_counts(rows: Iterable[Sequence[Any]]) -> dict[str, dict[str, int]]:
+    """Group `(facet, value, count)` rows by facet, keyed like the `/sites` filter parameters.
+
+    Severity ranks are translated back to their `SEVERITY_LEVELS` keys.
+    """
+    levels = {rank: level for level, (_, _, rank) in SEVERITY_LEVELS.items()}
+    counts: dict[str, dict[str, int]] = {name: {} for name in FACET_NAMES}
+    for facet, value, count in rows:
+        if facet == 'severity':
+            value = levels.get(int(value))
+            if value is None:
+                continue
+        counts[facet][value] = count
+    return counts
+
+
+def paginate_query(db: sqlite3.Connection, sql: str, params: list[Any],
+                   sort_keys: list[tuple[str, str, bool]], page_size: int,
+                   after: str | None = None, before: str | None = None) -> 'KeysetPage':
+    """Run `sql` (as returned by `build_site_query`) as one keyset-paginated page.
+
+    `after` and `before` are cursors from a previous page.  Instead of an
+    OFFSET, which makes SQLite walk and discard every preceding row, the
+    cursor values become a lexicographic comparison on the sort keys, so
+    each page costs the same regardless of its depth.  One extra row is
+    requested to know whether another page follows.  Rows are fetched
+    lazily from the cursor as the returned page is iterated.
+    """
+    backwards = False
+    values = decode_cursor(after, len(sort_keys))
+    if values is None:
+        values = decode_cursor(before, len(sort_keys))
+        backwards = values is not None
+    params = list(params)
+    if values is not None:
+        alternatives = []
+        for i, (expr, _column, descending) in enumerate(sort_keys):
+            operator = '<' if descending != backwards else '>'
+            terms = [f'{prev_expr} = ?' for prev_expr, _c, _d in sort_keys[:i]]
+            terms.append(f'{expr} {operator} ?')
+            alternatives.append('(' + ' AND '.join(terms) + ')')
+            params.extend(values[:i + 1])
+        keyset = '(' + ' OR '.join(alternatives) + ')'
+        sql += ' AND ' + keyset
+    order = ', '.join(
+        f"{expr} {'DESC' if descending != backwards else 'ASC'}" for expr, _c, descending in sort_keys
+    )
+    sql += f' ORDER BY {order} LIMIT ?'
+    params.append(page_size + 1)
+    return KeysetPage(db.execute(sql, params), sort_keys, page_size, backwards, values is not None)
+
+
+class KeysetPage:
+    """One page of rows from `paginate_query`, with cursors for its neighbours.
+
+    Iterating the page yields at most `page_size` rows in display order.
+    When walking forwards the rows are streamed straight from the SQLite
+    cursor, which lets a streamed template start sending HTML before the
+    query is exhausted; `has_next` and `next_cursor` are only meaningful
+    once iteration has finished.  A page can be iterated only once.
+    """
+
+    def __init__(self, cursor: Iterable[sqlite3.Row], sort_keys: list[tuple[str, str, bool]],
+                 page_size: int, backwards: bool, from_cursor: bool) -> None:
+        self._cursor = cursor
+        self._columns = [column for _e, column, _d in sort_keys]
+        self.page_size = page_size
+        self.backwards = backwards
+        self.from_cursor = from_cursor
+        self._has_more = False
+        self._first: sqlite3.Row | None = None
+        self._last: sqlite3.Row | None = None
+
+    def __iter__(self) -> Iterator[sqlite3.Row]:
+        if self.backwards:
+            rows = list(self._cursor)
+            self._has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+        else:
+            rows = self._cursor
+        count = 0
+        for row in rows:
+            if count == self.page_size:
+                self._has_more = True
+                break
+            if self._first is None:
+                self._first = row
+            self._last = row
+            count += 1
+            yield row
+
+    def _key(self, row: sqlite3.Row | None) -> str | None:
+        return encode_cursor([row[column] for column in self._columns]) if row is not None else None
+
+    @property
+    def has_next(self) -> bool:
+        return self.from_cursor if self.backwards else self._has_more
+
+    @property
+    def has_prev(self) -> bool:
+        return self._has_more if self.backwards else self.from_cursor
+
+    @property
+    def next_cursor(self) -> str | None:
+        return self._key(self._last) if self.has_next else None
+
+    @property
+    def prev_cursor(self) -> str | None:
+        return self._key(self._first) if self.has_prev else None
+
+
+def utc_now() -> datetime:
+    """Return the current UTC time truncated to whole seconds (HTTP date precision)."""
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def normalize_args(args: MultiDict) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """Return a hashable, order-independent form of a query string.
+
+    Empty values (such as the "Toutes" option of a filter) are dropped and
+    repeated values are sorted, so equivalent URLs share one cache entry.
+    """
+    return tuple(sorted(
+        (key, tuple(sorted(value for value in values if value)))
+        for key, values in args.lists()
+        if any(values)
+    ))
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU mapping with optional expiry.
+
+    Every entry is stored together with the data version it was computed
+    from; `get` treats entries from another version, or older than `ttl`
+    seconds, as missing.  A `max_entries` of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries: int, ttl: float | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, tuple[int, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, version: int) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, stored_at, value = entry
+            if entry_version != version or (self.ttl and time.monotonic() - stored_at > self.ttl):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, version: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def normalize_host(value: str | None) -> str:
+    """Return the lower-cased host name of a URL or bare host, without `www.`.
+
+    Scheme, credentials, port, path and a trailing dot are removed, and
+    internationalised names are converted to their ASCII (punycode) form so
+    that both spellings match.  An empty string is returned when no host
+    can be extracted.
+    """
+    if not value:
+        return ''
+    value = value.strip()
+    if '//' not in value:
+        value = '//' + value
+    try:
+        host = urllib.parse.urlsplit(value).hostname or ''
+    except ValueError:
+        return ''
+    host = host.rstrip('.')
+    try:
+        host = host.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    host = host.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def domain_set_width(count: int, fp_rate: float) -> int:
+    """Return the hash width in bytes giving at most `fp_rate` false positives.
+
+    A lookup of an unlisted domain is a false positive when its truncated
+    hash collides with one of the `count` stored hashes, which happens with
+    probability of about `count / 2**bits`.
+    """
+    bits = math.ceil(math.log2(max(count, 1) / fp_rate))
+    return min(max(4, math.ceil(bits / 8)), 16)
+
+
+def domain_hash(host: str, width: int) -> bytes:
+    """Hash a normalised host name (see `normalize_host`) for the domain set."""
+    return hashlib.sha256(host.encode('ascii', 'ignore')).digest()[:width]
+
+
+def encode_domain_set(hashes: Sequence[bytes], width: int, version: bytes) -> bytes:
+    """Serialise a sorted hash array.
+
+    Layout (integers big-endian): magic `SIDS`, kind (0 = full), hash
+    width in bytes, two reserved bytes, hash count (u32), 16-byte version,
+    then the hashes in ascending order.  Clients test membership of each
+    suffix of a visited host (`a.b.example.com`, `b.example.com`,
+    `example.com`) with a binary search.
+    """
+    header = struct.pack('>4sBBHI16s', DOMAIN_SET_MAGIC, 0, width, 0, len(hashes), version)
+    return header + b''.join(hashes)
+
+
+def encode_domain_set_delta(added: Sequence[bytes], removed: Sequence[bytes], width: int,
+                            base: bytes, version: bytes) -> bytes:
+    """Serialise the changes turning the set `base` into the set `version`.
+
+    Layout: magic `SIDS`, kind (1 = delta), hash width, one reserved byte,
+    added count (u32), removed count (u32), 16-byte base version, 16-byte
+    new version, then the added and the removed hashes, each sorted.
+    """
+    header = struct.pack('>4sBBBxII16s16s', DOMAIN_SET_MAGIC, 1, width, 0,
+                         len(added), len(removed), base, version)
+    return header + b''.join(added) + b''.join(removed)
+
+
+def decode_domain_set(blob: bytes) -> tuple[int, bytes, list[bytes]]:
+    """Parse a full artifact produced by `encode_domain_set`.
+
+    Returns `(width, version, hashes)`; raises ValueError on malformed input.
+    """
+    size = struct.calcsize('>4sBBHI16s')
+    if len(blob) < size:
+        raise ValueError('truncated domain set')
+    magic, kind, width, _reserved, count, version = struct.unpack_from('>4sBBHI16s', blob)
+    if magic != DOMAIN_SET_MAGIC or kind != 0 or len(blob) != size + count * width:
+        raise ValueError('not a full domain set')
+    return width, version, [blob[size + i * width:size + (i + 1) * width] for i in range(count)]
+
+
+def normalize_url(url: str | None) -> str:
+    """Return the key identifying a site URL, as stored in `sites.url_key`.
+
+    It is the normalised host (see `normalize_host`) followed by the path
+    without its trailing slash, so `https://www.Reddit.com/` and
+    `reddit.com` share the key `reddit.com`.  Query strings and fragments
+    are ignored.
+    """
+    host = normalize_host(url)
+    if not host:
+        return ''
+    value = url.strip() if '//' in url else '//' + url.strip()
+    try:
+        path = urllib.parse.urlsplit(value).path.rstrip('/')
+    except ValueError:
+        path = ''
+    return host + path
+
+
+def is_site_url(url: str | None) -> bool:
+    """Tell whether `url` can identify a site: an http(s) URL or a bare host name with a dot.
+
+    `https://`, `not a url`, `javascript:alert(1)` or `mailto:a@b.fr`
+    are rejected, so every accepted URL has a non-empty `normalize_url`
+    key.
+    """
+    value = (url or '').strip()
+    try:
+        scheme = urllib.parse.urlsplit(value).scheme.lower()
+        if '://' in value:
+            if scheme not in ('http', 'https'):
+                return False
+        elif scheme and '.' not in scheme:
+            # "javascript:…", "mailto:…"; "reddit.com:8080" parses with a
+            # dotted scheme and is a host name with a port.
+            return False
+        parts = urllib.parse.urlsplit(value if '://' in value else '//' + value)
+        parts.port
+    except ValueError:
+        return False
+    host = (parts.hostname or '').strip('.')
+    return '.' in host and not any(char.isspace() for char in host) and bool(normalize_url(value))
+
+
+def normalize_name(name: str | None) -> str:
+    """Return the key used to compare site names: folded case, no accents, letters and digits only.
+
+    "X (Twitter)" and "x-twitter" share the key `xtwitter`.
+    """
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    return ''.join(ch for ch in decomposed.casefold() if ch.isalnum())
+
+
+def name_trigrams(key: str) -> set[str]:
+    """Return the 3-character substrings of a name key (the key itself if shorter)."""
+    if len(key) < 3:
+        return {key} if key else set()
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the trigram sets of two name keys, between 0 and 1."""
+    ta, tb = name_trigrams(a), name_trigrams(b)
+    if not (ta and tb):
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+class DomainIndex:
+    """In-memory map from normalised host names to the sites listed under them.
+
+    A lookup walks the labels of the requested host from the most to the
+    least specific (`a.b.reddit.com`, `b.reddit.com`, `reddit.com`) so that
+    any subdomain of a listed site matches, without consulting SQLite or a
+    public-suffix list.  Payloads are plain dicts ready to be serialised.
+
+    The index records the data version it reflects.  `update` patches it
+    in place for a handful of changed sites when it is current, otherwise
+    the owner is expected to `load` it again from the database.
+    """
+
+    def __init__(self) -> None:
+        self.version: int | None = None
+        self._hosts: dict[str, list[dict[str, Any]]] = {}
+        self._site_hosts: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, entries: Iterable[tuple[str, dict[str, Any]]], version: int) -> None:
+        """Replace the whole index with `(host, payload)` entries."""
+        hosts: dict[str, list[dict[str, Any]]] = {}
+        site_hosts: dict[int, str] = {}
+        for host, payload in entries:
+            if host:
+                hosts.setdefault(host, []).append(payload)
+                site_hosts[payload['id']] = host
+        with self._lock:
+            self._hosts = hosts
+            self._site_hosts = site_hosts
+            self.version = version
+
+    def update(self, site_ids: Iterable[int], entries: Iterable[tuple[str, dict[str, Any]]],
+               from_version: int, to_version: int) -> bool:
+        """Replace the entries of `site_ids` if the index reflects `from_version`.
+
+        Sites that no longer exist are simply absent from `entries`.
+        Returns False, leaving the index stale, when it was not current.
+        """
+        with self._lock:
+            if self.version != from_version:
+                return False
+            for site_id in site_ids:
+                host = self._site_hosts.pop(site_id, None)
+                if host is not None:
+                    remaining = [p for p in self._hosts.get(host, []) if p['id'] != site_id]
+                    if remaining:
+                        self._hosts[host] = remaining
+                    else:
+                        self._hosts.pop(host, None)
+            for host, payload in entries:
+                if host:
+                    # Lists are replaced rather than mutated so that
+                    # concurrent lookups never observe a partial update.
+                    self._hosts[host] = self._hosts.get(host, []) + [payload]
+                    self._site_hosts[payload['id']] = host
+            self.version = to_version
+            return True
+
+    def lookup(self, host: str) -> list[dict[str, Any]]:
+        """Return the sites listed for `host` (already normalised) or a parent domain."""
+        hosts = self._hosts
+        labels = host.split('.')
+        for i in range(len(labels) - 1):
+            sites = hosts.get('.'.join(labels[i:]))
+            if sites:
+                return sites
+        return []
+
+
+class NameIndex:
+    """In-memory autocomplete index over the names of sites and alternatives.
+
+    Names are compared by their `normalize_name` key.  Every key, and the
+    part of it starting at each following word ("premium" for "Pornhub
+    Premium"), is kept in one sorted list, so prefix matches are a binary
+    search.  The same list serves as an implicit trie for misspelled
+    prefixes: `search` walks it branch by branch, carrying one row of the
+    Levenshtein matrix, and abandons a branch as soon as every value of
+    the row exceeds the tolerated distance.  An alternative listed under
+    several sites is a single entry when its name and URL are the same.
+
+    Like `DomainIndex`, the index records the data version it reflects and
+    `update` patches it for a handful of changed sites.  Updates build a
+    new sorted list and swap it in one assignment, so `search` never takes
+    a lock nor observes a partial update.
+    """
+
+    def __init__(self) -> None:
+        self.version: int | None = None
+        self._keys: list[tuple[str, int]] = []
+        # entry id -> (keys, payload, rank, identity), rank 0 for sites and
+        # 1 for alternatives
+        self._entries: dict[int, tuple[list[str], dict[str, Any], int, tuple[Any, ...]]] = {}
+        self._identities: dict[tuple[Any, ...], int] = {}
+        self._entry_sites: dict[int, set[int]] = {}
+        self._site_entries: dict[int, list[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _add(self, site_id: int, kind: str, name: str, url: str | None
+             ) -> tuple[int, list[str]] | None:
+        """Register one name of `site_id`; return `(entry id, keys)` if it is a new entry."""
+        words = [key for key in (normalize_name(word) for word in (name or '').split()) if key]
+        if not words:
+            return None
+        identity = (kind, site_id if kind == 'site' else None, ''.join(words), url, name)
+        entry_id = self._identities.get(identity)
+        created = entry_id is None
+        if created:
+            entry_id = self._next_id
+            self._next_id += 1
+            keys = [''.join(words[i:]) for i in range(len(words))]
+            payload = {'type': kind, 'name': name, 'url': url}
+            if kind == 'site':
+                payload['id'] = site_id
+            self._entries[entry_id] = (keys, payload, 0 if kind == 'site' else 1, identity)
+            self._identities[identity] = entry_id
+            self._entry_sites[entry_id] = set()
+        self._entry_sites[entry_id].add(site_id)
+        self._site_entries.setdefault(site_id, []).append(entry_id)
+        return (entry_id, self._entries[entry_id][0]) if created else None
+
+    def load(self, entries: Iterable[tuple[int, str, str, str | None]], version: int) -> None:
+        """Replace the whole index with `(site_id, 'site' | 'alternative', name, url)` entries."""
+        with self._lock:
+            self._entries, self._identities = {}, {}
+            self._entry_sites, self._site_entries = {}, {}
+            keys: list[tuple[str, int]] = []
+            for entry in entries:
+                added = self._add(*entry)
+                if added is not None:
+                    keys.extend((key, added[0]) for key in added[1])
+            keys.sort()
+            self._keys = keys
+            self.version = version
+
+    def update(self, site_ids: Iterable[int], entries: Iterable[tuple[int, str, str, str | None]],
+               from_version: int, to_version: int) -> bool:
+        """Replace the names of `site_ids` if the index reflects `from_version`.
+
+        Returns False, leaving the index stale, when it was not current.
+        """
+        with self._lock:
+            if self.version != from_version:
+                return False
+            removed: set[int] = set()
+            for site_id in site_ids:
+                for entry_id in self._site_entries.pop(site_id, ()):
+                    sites = self._entry_sites[entry_id]
+                    sites.discard(site_id)
+                    if not sites:
+                        removed.add(entry_id)
+            added = [item for item in (self._add(*entry) for entry in entries) if item is not None]
+            # An entry dropped and registered again in the same update was
+            # revived by `_add` and keeps its place in the list.
+            removed = {entry_id for entry_id in removed if not self._entry_sites[entry_id]}
+            if removed or added:
+                keys = list(self._keys)
+                for entry_id in removed:
+                    for key in self._entries[entry_id][0]:
+                        del keys[bisect.bisect_left(keys, (key, entry_id))]
+                for entry_id, entry_keys in added:
+                    for key in entry_keys:
+                        bisect.insort(keys, (key, entry_id))
+                self._keys = keys
+            for entry_id in removed:
+                self._identities.pop(self._entries.pop(entry_id)[3], None)
+                del self._entry_sites[entry_id]
+            self.version = to_version
+            return True
+
+    def search(self, prefix: str, limit: int = 10, scan: int = 50) -> list[dict[str, Any]]:
+        """Return up to `limit` payloads whose name starts with, or nearly starts with, `prefix`.
+
+        Names are ranked by the edit distance between the prefix and the
+        closest start of their key, tolerating one edit (two for prefixes
+        of six characters or more) after a first character that must be
+        right.  At equal distance, whole-name matches come before word
+        matches, sites before alternatives and shorter names first.  At
+        most `scan` keys are examined per matching branch, and the walk is
+        skipped when the exact prefix already yields `limit` names.
+        """
+        query = normalize_name(prefix)
+        if not query:
+            return []
+        keys = self._keys
+        entries = self._entries
+        max_distance = 0 if len(query) < 3 else 1 if len(query) < 6 else 2
+        ranked: dict[int, tuple[Any, ...]] = {}
+        self._rank_branch(keys, bisect.bisect_left(keys, (query,)), query, 0, scan, ranked)
+        if len(ranked) >= limit:
+            max_distance = 0
+        # Depth-first walk of the keys starting with the first character.
+        # `row[i]` is the edit distance between `query[:i]` and the branch.
+        first_row = list(range(len(query) + 1))
+        stack = [(query[0], self._next_row(first_row, query, query[0]))]
+        while stack:
+            branch, row = stack.pop()
+            start = bisect.bisect_left(keys, (branch,))
+            if row[-1] <= max_distance:
+                # The whole query matches the start of every key below this
+                # branch; longer branches are not explored further unless
+                # they may be closer.
+                if row[-1]:
+                    self._rank_branch(keys, start, branch, row[-1], scan, ranked)
+                if min(row) >= row[-1]:
+                    continue
+            position = start
+            depth = len(branch)
+            while position < len(keys) and keys[position][0].startswith(branch):
+                key = keys[position][0]
+                if len(key) == depth:
+                    position += 1
+                    continue
+                char = key[depth]
+                child_row = self._next_row(row, query, char)
+                if min(child_row) <= max_distance:
+                    stack.append((branch + char, child_row))
+                position = bisect.bisect_left(keys, (branch + chr(ord(char) + 1),), position)
+        best = heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1])
+        return [entry[1] for entry in (entries.get(entry_id) for entry_id, _ in best) if entry is not None]
+
+    def _rank_branch(self, keys: list[tuple[str, int]], start: int, branch: str, distance: int,
+                     scan: int, ranked: dict[int, tuple[Any, ...]]) -> None:
+        """Rank the first `scan` entries whose keys, from `keys[start]` on, start with `branch`."""
+        entries = self._entries
+        for key, entry_id in keys[start:start + scan]:
+            if not key.startswith(branch):
+                break
+            entry = entries.get(entry_id)
+            if entry is not None:
+                rank = (distance, key != entry[0][0], entry[2], len(entry[0][0]), key)
+                previous = ranked.get(entry_id)
+                if previous is None or rank < previous:
+                    ranked[entry_id] = rank
+
+    @staticmethod
+    def _next_row(row: list[int], query: str, char: str) -> list[int]:
+        """Extend a Levenshtein row of `query` against a branch by one character."""
+        next_row = [row[0] + 1]
+        for i, query_char in enumerate(query, 1):
+            next_row.append(min(row[i] + 1, next_row[i - 1] + 1, row[i - 1] + (query_char != char)))
+        return next_row
+
+
+class ConnectionPool:
+    """A bounded pool of reusable SQLite connections.
+
+    Connections are created lazily by `factory` (which also applies the
+    per-connection PRAGMAs) up to `size`; when all of them are in use,
+    `acquire` waits up to `timeout` seconds for one to be released and then
+    raises `sqlite3.OperationalError`.  Idle connections are reused in LIFO
+    order so that the most recently used one, with the warmest page cache,
+    is handed out first.  After a fork the child discards the connections
+    inherited from its parent, since SQLite handles must not cross
+    processes.
+    """
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int, timeout: float) -> None:
+        self._factory = factory
+        self._size = max(1, size)
+        self._timeout = timeout
+        self._idle: list[sqlite3.Connection] = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._idle = []
+            self._created = 0
+            self._pid = os.getpid()
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._condition:
+            self._check_fork()
+            if not self._idle and self._created >= self._size:
+                if not self._condition.wait_for(lambda: self._idle or self._created < self._size,
+                                                timeout=self._timeout):
+                    raise sqlite3.OperationalError('database connection pool exhausted')
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._factory()
+        except BaseException:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, db: sqlite3.Connection) -> None:
+        """Give a connection back, rolling back any transaction left open."""
+        try:
+            if db.in_transaction:
+                db.rollback()
+        except sqlite3.Error:
+            db.close()
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            return
+        with self._condition:
+            if self._pid != os.getpid():
+                return
+            self._idle.append(db)
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._condition:
+            for db in self._idle:
+                db.close()
+            self._created -= len(self._idle)
+            self._idle = []
+
+
+class WriteQueue:
+    """A bounded in-process queue drained in batches by a background thread.
+
+    `submit` never blocks: it returns False when `max_size` items are
+    already waiting, so callers can shed load instead of stalling.  The
+    writer thread waits for an item, collects up to `batch_size` of them
+    and hands the batch to `handler`, which is expected to write it in a
+    single transaction.  A failing batch is retried `retries` times before
+    it is logged and dropped.  `close` stops accepting items and waits for
+    the queue to drain.  Like `ConnectionPool` the queue is fork-safe: the
+    thread is started lazily, in the process that submits.
+    """
+
+    def __init__(self, handler: Callable[[list[Any]], None], max_size: int, batch_size: int,
+                 on_error: Callable[[BaseException, list[Any]], None], retries: int = 3) -> None:
+        self._handler = handler
+        self._on_error = on_error
+        self._batch_size = max(1, batch_size)
+        self._retries = retries
+        self._max_size = max(1, max_size)
+        self._queue: queue.Queue = queue.Queue(self._max_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pid = os.getpid()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self._max_size)
+                self._thread = None
+                self._closed = False
+                self._pid = os.getpid()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any) -> bool:
+        """Queue `item` for writing; return False if the queue is full or closed."""
+        self._ensure_thread()
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            for attempt in range(self._retries + 1):
+                try:
+                    self._handler(batch)
+                    break
+                except Exception as exc:
+                    if attempt == self._retries:
+                        self._on_error(exc, batch)
+                    else:
+                        time.sleep(0.1 * 2 ** attempt)
+            if stop:
+                return
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting items and wait up to `timeout` seconds for the queued ones to be written."""
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._closed = True
+        if thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # The sentinel is queued behind the pending items, so the writer
+        # flushes them all before exiting.  When the queue stays full it
+        # is not queued at all and the writer thread, a daemon, is left
+        # to the end of the process.
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+
+# Write queues flushed when the interpreter exits, with their drain
+# timeout.  The references are weak, so a discarded application (and
+# its connections) is not kept alive until then.
+open_write_queues: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+@atexit.register
+def close_write_queues() -> None:
+    """Flush the queued items of every live `WriteQueue` (see `open_write_queues`)."""
+    for write_queue, timeout in list(open_write_queues.items()):
+        write_queue.close(timeout)
+
+
+@lru_cache(maxsize=1024)
+def sql_fingerprint(sql: str) -> str:
+    """Return `sql` with literals replaced by `?` and whitespace collapsed.
+
+    Statements differing only in their constants, or in the length of an
+    `IN (...)` list, share a fingerprint, which keeps the number of
+    distinct SQL metrics bounded.
+    """
+    text = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    text = re.sub(r'\b\d+(?:\.\d+)?\b', '?', text)
+    text = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', text)
+    return ' '.join(text.split())
+
+
+class RequestProfile:
+    """Timings collected while serving one request, when profiling is enabled.
+
+    `phases` maps a phase name (`db`, `context`, `render`, ...) to the
+    seconds spent in it; `statements` holds one `[fingerprint, seconds,
+    rows]` entry per SQL statement, updated as its rows are fetched.
+    """
+
+    __slots__ = ('started', 'phases', 'statements', 'render_started')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.statements: list[list[Any]] = []
+        self.render_started = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+# Profile of the request being served in the current context, or None when
+# profiling is disabled or outside a request.
+current_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    'current_profile', default=None
+)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor recording the time and row count of its statements in `current_profile`.
+
+    Time spent executing and fetching is attributed to the statement, so
+    rows fetched lazily (e.g. by a streamed template) are accounted for.
+    """
+
+    _record: list[Any] | None = None
+
+    def execute(self, sql, parameters=()):
+        profile = current_profile.get()
+        if profile is None:
+            self._record = None
+            return super().execute(sql, parameters)
+        self._record = [sql_fingerprint(sql), 0.0, 0]
+        profile.statements.append(self._record)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record[1] += time.perf_counter() - started
+
+    def executemany(self, sql, seq_of_parameters):
+        profile = current_profile.get()
+        if profile is None:
+            self._record = None
+            return super().executemany(sql, seq_of_parameters)
+        self._record = [sql_fingerprint(sql), 0.0, 0]
+        profile.statements.append(self._record)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record[1] += time.perf_counter() - started
+            self._record[2] += max(self.rowcount, 0)
+
+    def _fetch(self, fetch, *args):
+        record = self._record
+        if record is None:
+            return fetch(*args)
+        started = time.perf_counter()
+        try:
+            result = fetch(*args)
+        finally:
+            record[1] += time.perf_counter() - started
+        if isinstance(result, list):
+            record[2] += len(result)
+        elif result is not None:
+            record[2] += 1
+        return result
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def __next__(self):
+        record = self._record
+        if record is None:
+            return super().__next__()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        finally:
+            record[1] += time.perf_counter() - started
+        record[2] += 1
+        return row
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors are `ProfiledCursor`s (used when `PROFILING` is on)."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class MetricsRegistry:
+    """Process-wide request and SQL metrics rendered in the Prometheus text format.
+
+    Request latencies are histograms labelled by route (the endpoint name,
+    which keeps cardinality bounded) and method.  SQL statements are
+    aggregated per fingerprint, up to `max_statements` distinct ones;
+    further fingerprints are counted under `other`.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, max_statements: int = 500) -> None:
+        self.max_statements = max_statements
+        self._requests: dict[tuple[str, str], list[Any]] = {}
+        self._phases: dict[tuple[str, str], float] = {}
+        self._statements: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, seconds: float, profile: RequestProfile) -> None:
+        with self._lock:
+            entry = self._requests.get((route, method))
+            if entry is None:
+                entry = self._requests[(route, method)] = [[0] * len(self.BUCKETS), 0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    entry[0][i] += 1
+            entry[1] += seconds
+            entry[2] += 1
+            for phase, phase_seconds in profile.phases.items():
+                self._phases[(route, phase)] = self._phases.get((route, phase), 0.0) + phase_seconds
+            for fingerprint, statement_seconds, rows in profile.statements:
+                if fingerprint not in self._statements and len(self._statements) >= self.max_statements:
+                    fingerprint = 'other'
+                stats = self._statements.setdefault(fingerprint, [0, 0.0, 0])
+                stats[0] += 1
+                stats[1] += statement_seconds
+                stats[2] += rows
+
+    def render(self) -> str:
+        def label(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+        lines = [
+            '# HELP stopidcheck_request_duration_seconds Request latency by route.',
+            '# TYPE stopidcheck_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            for (route, method), (buckets, total, count) in sorted(self._requests.items()):
+                labels = f'route="{label(route)}",method="{method}"'
+                for bound, value in zip(self.BUCKETS, buckets):
+                    lines.append(f'stopidcheck_request_duration_seconds_bucket{{{labels},le="{bound}"}} {value}')
+                lines.append(f'stopidcheck_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'stopidcheck_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+                lines.append(f'stopidcheck_request_duration_seconds_count{{{labels}}} {count}')
+            lines += [
+                '# HELP stopidcheck_request_phase_seconds_total Time spent per request phase.',
+                '# TYPE stopidcheck_request_phase_seconds_total counter',
+            ]
+            for (route, phase), total in sorted(self._phases.items()):
+                lines.append(f'stopidcheck_request_phase_seconds_total{{route="{label(route)}",phase="{phase}"}} {total:.6f}')
+            for name, index, kind, help_text in (
+                ('stopidcheck_sql_statements_total', 0, 'counter', 'SQL statements executed, by fingerprint.'),
+                ('stopidcheck_sql_duration_seconds_total', 1, 'counter', 'Time spent executing and fetching, by fingerprint.'),
+                ('stopidcheck_sql_rows_total', 2, 'counter', 'Rows fetched or written, by fingerprint.'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for fingerprint, stats in sorted(self._statements.items()):
+                    value = f'{stats[index]:.6f}' if index == 1 else str(stats[index])
+                    lines.append(f'{name}{{statement="{label(fingerprint)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def parse_rate_limit(spec: str | None) -> tuple[float, int] | None:
+    """Parse a limit written `"<count>/<seconds>"` into `(tokens per second, burst)`.
+
+    `"5/60"` allows bursts of 5 requests refilled at 5 per minute.  An
+    empty value or a count of 0 disables the limit (returns None).
+    """
+    if not spec:
+        return None
+    count, _, seconds = spec.partition('/')
+    burst = int(count)
+    if burst <= 0:
+        return None
+    return burst / float(seconds or 1), burst
+
+
+class MemoryRateLimiter:
+    """Per-key token buckets kept in process memory.
+
+    Each key maps to `[tokens, updated_at, full_at]` in an LRU-ordered
+    dict, `full_at` being the time its own limit refills it completely.
+    From then on the bucket is equivalent to a missing one, so such
+    buckets are evicted from the cold end, and the dict never holds more
+    than `max_keys` of them.  Every worker process
+    has its own buckets; see `SQLiteRateLimiter` to share them.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of `key`; return 0, or the seconds to wait when empty."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            left = tokens - 1 if tokens >= 1 else tokens
+            self._buckets[key] = [left, now, now + (burst - left) / rate]
+            self._buckets.move_to_end(key)
+            while self._buckets:
+                oldest_key, (_, _, full_at) = next(iter(self._buckets.items()))
+                if len(self._buckets) <= self.max_keys and now < full_at:
+                    break
+                del self._buckets[oldest_key]
+        return 0.0 if tokens >= 1 else (1 - tokens) / rate
+
+
+class SQLiteRateLimiter:
+    """Token buckets in a SQLite table, shared by every worker using the same file.
+
+    A bucket is refilled and debited by a single UPSERT statement, which
+    SQLite applies atomically, so concurrent processes cannot both take
+    the last token.  The table lives in its own database file, away from
+    the catalogue's write lock.  Buckets idle for longer than a day are
+    deleted every `cleanup_every` calls.
+    """
+
+    def __init__(self, path: str, cleanup_every: int = 1000) -> None:
+        self._path = path
+        self._cleanup_every = cleanup_every
+        self._calls = 0
+        self._pool = ConnectionPool(self._connect, 8, 10)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA journal_mode = WAL')
+        db.execute('PRAGMA synchronous = NORMAL')
+        db.execute('PRAGMA busy_timeout = 5000')
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID'''
+        )
+        return db
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of `key`; return 0, or the seconds to wait when empty."""
+        now = time.time()
+        db = self._pool.acquire()
+        try:
+            # The WHERE clause leaves an empty bucket untouched, in which
+            # case no row is returned.
+            row = db.execute(
+                '''INSERT INTO rate_limits (key, tokens, updated_at) VALUES (?1, ?3 - 1, ?4)
+                   ON CONFLICT (key) DO UPDATE SET
+                       tokens = MIN(?3, tokens + (?4 - updated_at) * ?2) - 1,
+                       updated_at = ?4
+                   WHERE MIN(?3, tokens + (?4 - updated_at) * ?2) >= 1
+                   RETURNING tokens''',
+                (key, rate, burst, now)
+            ).fetchone()
+            if row is not None:
+                wait = 0.0
+            else:
+                tokens, updated_at = db.execute(
+                    'SELECT tokens, updated_at FROM rate_limits WHERE key=?', (key,)
+                ).fetchone()
+                wait = (1 - min(burst, tokens + (now - updated_at) * rate)) / rate
+            self._calls += 1
+            if self._calls % self._cleanup_every == 0:
+                db.execute('DELETE FROM rate_limits WHERE updated_at < ?', (now - 86400,))
+            return max(wait, 0.0)
+        finally:
+            self._pool.release(db)
+
+
+def compress_body(data: bytes, encoding: str, level: int, brotli_quality: int) -> bytes:
+    """Compress a whole response body with `encoding` ('br' or 'gzip')."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, level, mtime=0)
+
+
+def compress_chunks(chunks: Iterable[str | bytes], encoding: str, level: int,
+                    brotli_quality: int, flush_size: int = 4096) -> Iterator[bytes]:
+    """Compress a streamed response body as it is produced.
+
+    The compressor is flushed whenever `flush_size` bytes of input have
+    accumulated, so that the client receives the page progressively,
+    which is the point of streaming, without paying a flush for each of
+    the many small pieces a streamed template yields.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        compress, finish = compressor.compress, compressor.flush
+
+        def flush() -> bytes:
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        pending = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk)
+            pending += len(chunk)
+            if pending >= flush_size:
+                data += flush()
+                pending = 0
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def snapshot_file_name(url: str) -> str:
+    """Return the path, relative to the snapshot directory, of the page served at `url`.
+
+    The directory tree mirrors the URLs: `/` is `index.html`, `/site/3` is
+    `site/3.html` and each query parameter becomes two path segments, so
+    `/sites?category=Adulte` is `sites/category/Adulte.html`.  Values are
+    percent-encoded so that they cannot name another directory.
+    """
+    parts = urllib.parse.urlsplit(url)
+    name = parts.path.strip('/') or 'index'
+    for key, value in urllib.parse.parse_qsl(parts.query):
+        name += f"/{urllib.parse.quote(key, safe='')}/{urllib.parse.quote(value, safe='')}"
+    return name + '.html'
+
+
+def write_snapshot_file(target: str, name: str, data: bytes) -> int:
+    """Write `data` to `target/name` with its `.gz` and `.br` variants; return the bytes written.
+
+    Each file is written under a temporary name and renamed, so a static
+    file server never reads a partial page.  The gzip stream carries no
+    timestamp, which keeps unchanged pages byte-identical across builds.
+    """
+    path = os.path.join(target, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    variants = [(path, data), (path + '.gz', gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append((path + '.br', brotli.compress(data)))
+    for variant_path, content in variants:
+        tmp_path = f'{variant_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fh:
+            fh.write(content)
+        os.replace(tmp_path, variant_path)
+    return sum(len(content) for _, content in variants)
+
+
+def remove_snapshot_file(target: str, name: str) -> None:
+    """Delete a page of the snapshot and its compressed variants, if present."""
+    for suffix in ('', '.gz', '.br'):
+        try:
+            os.remove(os.path.join(target, name + suffix))
+        except FileNotFoundError:
+            pass
+
+
+# State of a `flask snapshot build` worker process: the application whose
+# pages it renders and the snapshot directory (see `init_snapshot_worker`).
+snapshot_worker: dict[str, Any] = {}
+
+
+def init_snapshot_worker(app: Flask, target: str) -> None:
+    """Process-pool initializer: remember the application inherited through fork()."""
+    snapshot_worker['app'] = app
+    snapshot_worker['target'] = target
+
+
+def render_snapshot_pages(urls: Sequence[str]) -> tuple[int, int]:
+    """Render `urls` through the application and write them to the snapshot.
+
+    Pages go through the test client, so they are exactly what the live
+    application serves.  Returns `(pages, bytes written)`.
+    """
+    app = snapshot_worker['app']
+    target = snapshot_worker['target']
+    client = app.test_client()
+    written = 0
+    for url in urls:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url}: HTTP {response.status_code}')
+        written += write_snapshot_file(target, snapshot_file_name(url), response.get_data())
+    return len(urls), written
+
+
+def describe_link(status: int | None, error: str | None, age_gate: str | None) -> dict[str, str]:
+    """Classify a `link_checks` row as `{'state', 'label'}` for the site pages.
+
+    A page showing an age-gate marker, or withheld for legal reasons
+    (451), is `gated`; refusals that usually target robots (401, 403,
+    429) are `blocked`; network errors and other error statuses are
+    `broken`.
+    """
+    if error is not None:
+        state, detail = 'broken', None
+    elif age_gate is not None or status == 451:
+        state, detail = 'gated', None
+    elif status in (401, 403, 429):
+        state, detail = 'blocked', status
+    elif status >= 400:
+        state, detail = 'broken', status
+    else:
+        state, detail = 'ok', None
+    label = LINK_STATE_LABELS[state]
+    return {'state': state, 'label': f'{label} ({detail})' if detail else label}
+
+
+def interleave_hosts(urls: Iterable[str]) -> list[str]:
+    """Order `urls` round-robin across their hosts.
+
+    Consecutive URLs then hit different hosts, so the per-host limit of
+    `check_links` rarely holds up its workers.
+    """
+    by_host: dict[str, list[str]] = {}
+    for url in urls:
+        try:
+            host = urllib.parse.urlsplit(url).hostname or ''
+        except ValueError:
+            # Malformed; `check_link` reports it.
+            host = ''
+        by_host.setdefault(host, []).append(url)
+    return [url for batch in itertools.zip_longest(*by_host.values()) for url in batch if url is not None]
+
+
+async def read_http_response(reader: asyncio.StreamReader, max_bytes: int
+                             ) -> tuple[int, dict[str, str], bytes]:
+    """Read an HTTP/1.1 response: `(status, headers, first max_bytes of the body)`.
+
+    Header names are lower-cased.  Chunked bodies are decoded; the rest
+    of a long body is left unread, the connection being closed anyway.
+    """
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    version, _, rest = head[0].partition(' ')
+    if not version.startswith('HTTP/'):
+        raise ValueError('invalid response')
+    status = int(rest.split(' ', 1)[0])
+    headers = {}
+    for line in head[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    body = b''
+    if status < 200 or status in (204, 304):
+        return status, headers, body
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while len(body) < max_bytes:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                break
+            chunk = await reader.readexactly(min(size, max_bytes - len(body)))
+            body += chunk
+            if len(chunk) < size:
+                break
+            await reader.readexactly(2)
+    else:
+        length = headers.get('content-length')
+        remaining = min(int(length), max_bytes) if length and length.isdigit() else max_bytes
+        while remaining > 0:
+            chunk = await reader.read(remaining)
+            if not chunk:
+                break
+            body += chunk
+            remaining -= len(chunk)
+    return status, headers, body
+
+
+async def check_link(url: str, previous: Mapping[str, Any] | None, host_limits: dict[str, asyncio.Semaphore],
+                     per_host: int, timeout: float, max_bytes: int, user_agent: str,
+                     ssl_context: ssl.SSLContext, max_redirects: int = 5) -> dict[str, Any]:
+    """Probe one URL with GET and return its `link_checks` row.
+
+    Redirects are followed up to `max_redirects` hops.  The request for
+    the address the previous check ended on is made conditional with the
+    validators it returned (`If-None-Match`, `If-Modified-Since`); a 304
+    keeps the previous status and age-gate marker.  At most `per_host`
+    requests run against one host at a time, and each hop must answer
+    within `timeout` seconds.  Failures are reported in the `error`
+    column, never raised.
+    """
+    result = {'url': url, 'status': None, 'error': None, 'final_url': url, 'latency_ms': 0,
+              'age_gate': None, 'etag': None, 'last_modified': None, 'checked_at': time.time()}
+    current = url
+    elapsed = 0.0
+    try:
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(current)
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise ValueError(f'unsupported URL: {current}')
+            host = parts.hostname.encode('idna').decode('ascii')
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            lines = [
+                f"GET {parts.path or '/'}{'?' + parts.query if parts.query else ''} HTTP/1.1",
+                f'Host: {host}' + (f':{parts.port}' if parts.port else ''),
+                f'User-Agent: {user_agent}',
+                'Accept: text/html,*/*;q=0.8',
+                'Accept-Encoding: identity',
+                'Connection: close',
+            ]
+            if previous is not None and current == previous['final_url']:
+                if previous['etag']:
+                    lines.append(f"If-None-Match: {previous['etag']}")
+                if previous['last_modified']:
+                    lines.append(f"If-Modified-Since: {previous['last_modified']}")
+            limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+            async with limit:
+                started = time.perf_counter()
+
+                async def request() -> tuple[int, dict[str, str], bytes]:
+                    reader, writer = await asyncio.open_connection(
+                        host, port, ssl=ssl_context if parts.scheme == 'https' else None,
+                        server_hostname=host if parts.scheme == 'https' else None,
+                    )
+                    try:
+                        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+                        return await read_http_response(reader, max_bytes)
+                    finally:
+                        writer.close()
+
+                status, headers, body = await asyncio.wait_for(request(), timeout)
+                elapsed += time.perf_counter() - started
+            if status in (301, 302, 303, 307, 308) and headers.get('location'):
+                current = urllib.parse.urljoin(current, headers['location'])
+                continue
+            result['final_url'] = current
+            result['etag'] = headers.get('etag')
+            result['last_modified'] = headers.get('last-modified')
+            if status == 304 and previous is not None:
+                result['status'] = previous['status']
+                result['age_gate'] = previous['age_gate']
+                result['etag'] = result['etag'] or previous['etag']
+                result['last_modified'] = result['last_modified'] or previous['last_modified']
+            else:
+                result['status'] = status
+                marker = AGE_GATE_PATTERN.search(current + ' ' + body.decode('utf-8', 'replace'))
+                result['age_gate'] = marker.group(0).lower() if marker else None
+            break
+        else:
+            result['error'] = 'too many redirects'
+    except asyncio.TimeoutError:
+        result['error'] = 'timeout'
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'[:200]
+    result['latency_ms'] = round(elapsed * 1000)
+    return result
+
+
+async def check_links(urls: Sequence[str], previous: Mapping[str, Mapping[str, Any]], concurrency: int,
+                      per_host: int, timeout: float, max_bytes: int, user_agent: str
+                      ) -> AsyncIterator[dict[str, Any]]:
+    """Probe `urls` concurrently and yield their `link_checks` rows as they complete.
+
+    `concurrency` worker tasks take the URLs in `interleave_hosts` order
+    and run `check_link` on each, so memory use does not grow with the
+    number of URLs.  `previous` maps URLs to their last stored row.
+    """
+    pending = iter(interleave_hosts(urls))
+    results: asyncio.Queue = asyncio.Queue()
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    ssl_context = ssl.create_default_context()
+
+    async def worker() -> None:
+        for url in pending:
+            results.put_nowait(await check_link(url, previous.get(url), host_limits, per_host,
+                                                timeout, max_bytes, user_agent, ssl_context))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(urls)))]
+    try:
+        for _ in range(len(urls)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
 
 
 def create_app(test_config: dict | None = None) -> Flask:
@@ -48,6 +1893,102 @@ def create_app(test_config: dict | None = None) -> Flask:
         DATABASE=os.path.join(app.root_path, 'data', 'sites.db'),
         ADMIN_USER=os.environ.get('ADMIN_USER', 'admin'),
         ADMIN_PASSWORD=os.environ.get('ADMIN_PASSWORD', 'password'),
+        # Apply pending schema migrations at startup (otherwise run
+        # `flask db upgrade`).
+        DB_AUTO_MIGRATE=os.environ.get('DB_AUTO_MIGRATE', '1') == '1',
+        # Number of sites per page on /sites, and the upper bound accepted
+        # for the `per_page` query parameter.
+        SITES_PAGE_SIZE=int(os.environ.get('SITES_PAGE_SIZE', 50)),
+        SITES_MAX_PAGE_SIZE=int(os.environ.get('SITES_MAX_PAGE_SIZE', 500)),
+        # Stream /sites with stream_template instead of rendering it in one
+        # piece.  Streamed pages can afford a larger page size.
+        SITES_STREAMING=os.environ.get('SITES_STREAMING', '0') == '1',
+        SITES_STREAM_PAGE_SIZE=int(os.environ.get('SITES_STREAM_PAGE_SIZE', 500)),
+        # SQLite connection pools and per-connection tuning.  The read-only
+        # pool serves the public pages; the read-write pool serves writers.
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE', 4)),
+        DB_READ_POOL_SIZE=int(os.environ.get('DB_READ_POOL_SIZE', 16)),
+        DB_POOL_TIMEOUT=float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        DB_BUSY_TIMEOUT_MS=int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000)),
+        DB_CACHE_SIZE_KIB=int(os.environ.get('DB_CACHE_SIZE_KIB', 16384)),
+        DB_MMAP_SIZE=int(os.environ.get('DB_MMAP_SIZE', 64 * 1024 * 1024)),
+        # Rendered-page cache for the public routes: maximum number of
+        # entries (0 disables it) and lifetime in seconds.
+        PAGE_CACHE_SIZE=int(os.environ.get('PAGE_CACHE_SIZE', 512)),
+        PAGE_CACHE_TTL=float(os.environ.get('PAGE_CACHE_TTL', 300)),
+        # Per-request timings in a Server-Timing header and a /metrics
+        # endpoint (off by default), and how many of the slowest statements
+        # are detailed in the header.
+        PROFILING=os.environ.get('PROFILING', '0') == '1',
+        PROFILING_SQL_DETAILS=int(os.environ.get('PROFILING_SQL_DETAILS', 3)),
+        # Number of site detail payloads kept in memory (0 disables).
+        SITE_DETAIL_CACHE_SIZE=int(os.environ.get('SITE_DETAIL_CACHE_SIZE', 4096)),
+        # Number of filter combinations whose narrowed facet counts are
+        # kept in memory (0 disables).
+        FACET_COUNT_CACHE_SIZE=int(os.environ.get('FACET_COUNT_CACHE_SIZE', 1024)),
+        # Maximum number of hosts accepted by one /api/lookup request.
+        LOOKUP_MAX_HOSTS=int(os.environ.get('LOOKUP_MAX_HOSTS', 1000)),
+        # Suggestions per page of the moderation queue.
+        ADMIN_PAGE_SIZE=int(os.environ.get('ADMIN_PAGE_SIZE', 100)),
+        # Minimum trigram similarity of names (see `name_similarity`) for a
+        # new suggestion to be merged into a pending one.
+        SUGGESTION_NAME_SIMILARITY=float(os.environ.get('SUGGESTION_NAME_SIMILARITY', 0.8)),
+        # Asynchronous /suggest: enable the write queue, its capacity, the
+        # number of suggestions written per transaction, the Retry-After
+        # value (seconds) sent with 503 when it is full, and how long to
+        # wait for it to drain at shutdown.
+        SUGGEST_QUEUE=os.environ.get('SUGGEST_QUEUE', '0') == '1',
+        SUGGEST_QUEUE_SIZE=int(os.environ.get('SUGGEST_QUEUE_SIZE', 1000)),
+        SUGGEST_BATCH_SIZE=int(os.environ.get('SUGGEST_BATCH_SIZE', 100)),
+        SUGGEST_RETRY_AFTER=int(os.environ.get('SUGGEST_RETRY_AFTER', 5)),
+        SUGGEST_DRAIN_TIMEOUT=float(os.environ.get('SUGGEST_DRAIN_TIMEOUT', 10)),
+        # Per-client limits on form submissions, as "<requests>/<seconds>"
+        # (empty or 0 disables), and where the token buckets live: "memory"
+        # (per process) or "sqlite" (RATE_LIMIT_DATABASE, shared by all
+        # workers; next to the database by default).
+        RATE_LIMIT_SUGGEST=os.environ.get('RATE_LIMIT_SUGGEST', '10/600'),
+        RATE_LIMIT_LOGIN=os.environ.get('RATE_LIMIT_LOGIN', '5/300'),
+        RATE_LIMIT_BACKEND=os.environ.get('RATE_LIMIT_BACKEND', 'memory'),
+        RATE_LIMIT_DATABASE=os.environ.get('RATE_LIMIT_DATABASE'),
+        # Number of reverse proxies in front of the application whose
+        # X-Forwarded-For / X-Forwarded-Proto headers are trusted (0: none,
+        # the client address is the peer of the connection).  Behind a
+        # proxy it must be set, or every client shares the proxy's address
+        # and its rate-limit buckets.
+        TRUSTED_PROXIES=int(os.environ.get('TRUSTED_PROXIES', 0)),
+        # Offline domain set: target false-positive rate, directory holding
+        # the generated artifacts (next to the database by default) and how
+        # many versions are kept for deltas.
+        DOMAIN_SET_FP_RATE=float(os.environ.get('DOMAIN_SET_FP_RATE', 1e-6)),
+        DOMAIN_SET_DIR=os.environ.get('DOMAIN_SET_DIR'),
+        DOMAIN_SET_KEEP=int(os.environ.get('DOMAIN_SET_KEEP', 20)),
+        # Output directory of `flask snapshot build` (next to the database
+        # by default).
+        SNAPSHOT_DIR=os.environ.get('SNAPSHOT_DIR'),
+        # gzip/brotli compression of the responses: on/off, smallest body
+        # worth compressing (bytes), gzip level and brotli quality.
+        COMPRESSION=os.environ.get('COMPRESSION', '1') == '1',
+        COMPRESSION_MIN_SIZE=int(os.environ.get('COMPRESSION_MIN_SIZE', 500)),
+        COMPRESSION_LEVEL=int(os.environ.get('COMPRESSION_LEVEL', 6)),
+        COMPRESSION_BROTLI_QUALITY=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5)),
+        # Directory of the on-disk Jinja bytecode cache (unset: templates are
+        # compiled in memory by each process).
+        TEMPLATE_CACHE_DIR=os.environ.get('TEMPLATE_CACHE_DIR'),
+        # `flask links check`: simultaneous requests, simultaneous requests
+        # per host, seconds allowed per request and body bytes searched for
+        # an age-gate marker.
+        LINK_CHECK_CONCURRENCY=int(os.environ.get('LINK_CHECK_CONCURRENCY', 200)),
+        LINK_CHECK_PER_HOST=int(os.environ.get('LINK_CHECK_PER_HOST', 2)),
+        LINK_CHECK_TIMEOUT=float(os.environ.get('LINK_CHECK_TIMEOUT', 10)),
+        LINK_CHECK_MAX_BYTES=int(os.environ.get('LINK_CHECK_MAX_BYTES', 65536)),
+        LINK_CHECK_USER_AGENT=os.environ.get('LINK_CHECK_USER_AGENT', 'StopIDCheck-LinkChecker/1.0'),
+        # Minimum delay, in seconds, between two checks for catalogue
+        # changes made by other worker processes (0: on every request).
+        CACHE_SYNC_INTERVAL=float(os.environ.get('CACHE_SYNC_INTERVAL', 1.0)),
+        # Build the indexes, compile the templates and fill the filter-data
+        # and site caches in `create_app`, before the first request (see
+        # `warm_up`; never for the `flask` commands).
+        WARMUP=os.environ.get('WARMUP', '1') == '1',
     )
     # If a test configuration is provided, override defaults.  This is
     # useful when writing unit tests.
@@ -57,190 +1998,833 @@ def create_app(test_config: dict | None = None) -> Flask:
     # Ensure that the directory for the database exists.  This call is
     # idempotent; if the directory already exists nothing happens.
     os.makedirs(os.path.dirname(app.config['DATABASE']), exist_ok=True)
+    if not app.config['DOMAIN_SET_DIR']:
+        app.config['DOMAIN_SET_DIR'] = os.path.join(os.path.dirname(app.config['DATABASE']), 'domain-sets')
+    if not app.config['SNAPSHOT_DIR']:
+        app.config['SNAPSHOT_DIR'] = os.path.join(os.path.dirname(app.config['DATABASE']), 'snapshot')
+    if not app.config['RATE_LIMIT_DATABASE']:
+        app.config['RATE_LIMIT_DATABASE'] = os.path.join(os.path.dirname(app.config['DATABASE']), 'ratelimit.db')
+    if app.config['TRUSTED_PROXIES']:
+        # request.remote_addr (used by `rate_limited`) and request.scheme
+        # then come from the headers set by the trusted proxies.
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'],
+                                x_proto=app.config['TRUSTED_PROXIES'])
+    if app.config['TEMPLATE_CACHE_DIR']:
+        # Compiled templates are stored on disk, keyed by name and checksum
+        # of their source, so a new process (or a new deploy with unchanged
+        # templates) loads them instead of compiling them again.
+        os.makedirs(app.config['TEMPLATE_CACHE_DIR'], exist_ok=True)
+        app.jinja_options = {**app.jinja_options,
+                             'bytecode_cache': FileSystemBytecodeCache(app.config['TEMPLATE_CACHE_DIR'])}
+
+    # ------------------------------------------------------------------
+    # Database helper functions
+    #
+    # The following helper functions wrap access to the SQLite database.
+    # Connections are long-lived and shared through two bounded pools: a
+    # read-write pool for code that modifies data and a read-only pool for
+    # the public pages.  Using g (Flask's application context) ensures that
+    # each request reuses the same connection and hands it back to its pool
+    # after the request finishes.
+    def configure_connection(db: sqlite3.Connection) -> sqlite3.Connection:
+        """Apply the per-connection settings once, when a pooled connection is created.
+
+        WAL mode lets readers proceed while `suggest` or the admin commit;
+        with WAL, `synchronous=NORMAL` is durable across application crashes
+        and avoids an fsync per commit.  The page cache, memory-mapped I/O
+        and in-memory temporary tables (used by sorting) are sized through
+        the `DB_*` configuration values.
+        """
+        # Rows will behave like dicts so we can access columns by name.
+        db.row_factory = sqlite3.Row
+        db.execute(f"PRAGMA busy_timeout = {int(app.config['DB_BUSY_TIMEOUT_MS'])}")
+        db.execute('PRAGMA synchronous = NORMAL')
+        db.execute(f"PRAGMA cache_size = {-int(app.config['DB_CACHE_SIZE_KIB'])}")
+        db.execute(f"PRAGMA mmap_size = {int(app.config['DB_MMAP_SIZE'])}")
+        db.execute('PRAGMA temp_store = MEMORY')
+        return db
+
+    # With profiling on, connections time their statements (see `ProfiledCursor`).
+    connection_class = ProfiledConnection if app.config['PROFILING'] else sqlite3.Connection
+
+    def open_write_connection() -> sqlite3.Connection:
+        db = sqlite3.connect(
+            app.config['DATABASE'],
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=connection_class,
+        )
+        # The journal mode is persistent in the database file; setting it
+        # on every new writer is a no-op once WAL is active.
+        db.execute('PRAGMA journal_mode = WAL')
+        return configure_connection(db)
+
+    def open_read_connection() -> sqlite3.Connection:
+        uri = 'file:' + urllib.parse.quote(os.path.abspath(app.config['DATABASE'])) + '?mode=ro'
+        db = sqlite3.connect(
+            uri,
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=connection_class,
+        )
+        return configure_connection(db)
+
+    write_pool = ConnectionPool(open_write_connection, app.config['DB_POOL_SIZE'],
+                                app.config['DB_POOL_TIMEOUT'])
+    read_pool = ConnectionPool(open_read_connection, app.config['DB_READ_POOL_SIZE'],
+                               app.config['DB_POOL_TIMEOUT'])
+
+    def acquire_connection(pool: ConnectionPool) -> sqlite3.Connection:
+        """Take a connection from `pool`, recording the wait as the `db` phase when profiling."""
+        profile = current_profile.get()
+        if profile is None:
+            return pool.acquire()
+        started = time.perf_counter()
+        try:
+            return pool.acquire()
+        finally:
+            profile.add('db', time.perf_counter() - started)
+
+    def get_db() -> sqlite3.Connection:
+        """Return the read-write connection of the current context.
+
+        When called for the first time in a request this function takes a
+        connection from the read-write pool and stores it on the `g` object
+        so subsequent calls in the same request return the same connection.
+        See https://flask.palletsprojects.com/en/latest/appcontext/ for
+        details about the application context.
+        """
+        if 'db' not in g:
+            g.db = acquire_connection(write_pool)
+        return g.db
+
+    def get_read_db() -> sqlite3.Connection:
+        """Return the read-only connection of the current context.
+
+        Public GET routes use this connection (opened with `mode=ro`) so that
+        they never take part in write locking.
+        """
+        if 'read_db' not in g:
+            g.read_db = acquire_connection(read_pool)
+        return g.read_db
+
+    @app.teardown_appcontext
+    def close_db(exception: Exception | None) -> None:
+        """Return the database connections to their pools at the end of the request.
+
+        Flask automatically calls functions decorated with
+        `@app.teardown_appcontext` when the application context is torn down.
+        We remove the connections from `g` and release them, which rolls
+        back anything left uncommitted.  This prevents connections and
+        transactions from leaking between requests.
+        """
+        db = g.pop('db', None)
+        if db is not None:
+            write_pool.release(db)
+        read_db = g.pop('read_db', None)
+        if read_db is not None:
+            read_pool.release(read_db)
+
+    def init_search_index(db: sqlite3.Connection) -> None:
+        """Create the FTS5 full-text index over the searchable site columns.
+
+        `sites_fts` is an external-content FTS5 table: it stores only the
+        inverted index and reads column values back from `sites`.  The
+        `unicode61` tokenizer with `remove_diacritics 2` folds case and
+        accents so that "verification" matches "Vérification".  Three
+        triggers keep the index in sync with every INSERT, UPDATE and DELETE
+        on `sites`, whichever code path issues them (seeding, approval of a
+        suggestion, manual edits).  When the index is created against an
+        existing database it is rebuilt from the current rows.
+        """
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sites_fts'"
+        ).fetchone()
+        if exists:
+            return
+        columns = ', '.join(SEARCH_COLUMNS)
+        new_values = ', '.join(f'new.{col}' for col in SEARCH_COLUMNS)
+        old_values = ', '.join(f'old.{col}' for col in SEARCH_COLUMNS)
+        db.execute(
+            f'''CREATE VIRTUAL TABLE sites_fts USING fts5(
+                {columns},
+                content='sites',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )'''
+        )
+        db.execute(
+            f'''CREATE TRIGGER sites_fts_ai AFTER INSERT ON sites BEGIN
+                INSERT INTO sites_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END'''
+        )
+        db.execute(
+            f'''CREATE TRIGGER sites_fts_ad AFTER DELETE ON sites BEGIN
+                INSERT INTO sites_fts (sites_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END'''
+        )
+        db.execute(
+            f'''CREATE TRIGGER sites_fts_au AFTER UPDATE OF {columns} ON sites BEGIN
+                INSERT INTO sites_fts (sites_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO sites_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END'''
+        )
+        db.execute("INSERT INTO sites_fts (sites_fts) VALUES ('rebuild')")
+
+    def init_facet_tables(db: sqlite3.Connection) -> None:
+        """Create the junction tables used for category, country and verification filters.
+
+        `sites.category`, `sites.country` and `sites.verification_type` keep
+        their human-readable text for display, but filtering on them with
+        `LIKE` cannot use an index and produces false positives ('US'
+        matches 'AUS').  Each value is therefore also stored as one row per
+        site in `site_categories`, `site_countries` and
+        `site_verification_methods`.  The tables are keyed by value first
+        so that a filter is a primary-key range scan, with a secondary index
+        on `site_id` for rewrites and deletions.  A trigger removes the rows
+        of a deleted site.  On an existing database the tables are
+        backfilled by splitting the current column values.
+        """
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='site_countries'"
+        ).fetchone()
+        if exists:
+            return
+        for table, column in FACET_TABLES:
+            db.execute(
+                f'''CREATE TABLE {table} (
+                    {column} TEXT NOT NULL,
+                    site_id INTEGER NOT NULL,
+                    PRIMARY KEY ({column}, site_id),
+                    FOREIGN KEY (site_id) REFERENCES sites(id)
+                ) WITHOUT ROWID'''
+            )
+            db.execute(f'CREATE INDEX idx_{table}_site ON {table} (site_id)')
+        db.execute(
+            '''CREATE TRIGGER site_facets_ad AFTER DELETE ON sites BEGIN
+                DELETE FROM site_categories WHERE site_id = old.id;
+                DELETE FROM site_countries WHERE site_id = old.id;
+                DELETE FROM site_verification_methods WHERE site_id = old.id;
+            END'''
+        )
+        rows = db.execute('SELECT id, category, country, verification_type FROM sites').fetchall()
+        sync_site_facets(db, [(row['id'], dict(row)) for row in rows])
+
+    def sync_site_facets(db: sqlite3.Connection, sites: Iterable[tuple[int, Mapping[str, Any]]]) -> None:
+        """Rewrite the junction rows of `(site_id, site)` pairs from their text columns.
+
+        Must be called by every code path that inserts a site or changes
+        its category, country or verification type.  Each table is
+        rewritten with one `executemany` per statement.  The caller is
+        responsible for committing.
+        """
+        sites = list(sites)
+        splitters = {
+            'site_categories': lambda site: split_values(site.get('category')),
+            'site_countries': lambda site: split_values(site.get('country')),
+            'site_verification_methods': lambda site: match_verification_methods(site.get('verification_type')),
+        }
+        for table, column in FACET_TABLES:
+            db.executemany(f'DELETE FROM {table} WHERE site_id=?', [(site_id,) for site_id, _ in sites])
+            db.executemany(
+                f'INSERT INTO {table} ({column}, site_id) VALUES (?, ?)',
+                [(value, site_id) for site_id, site in sites for value in splitters[table](site)]
+            )
+
+    def init_severity_columns(db: sqlite3.Connection) -> None:
+        """Add and backfill the precomputed severity columns on older databases.
+
+        `severity_label`, `severity_class` and `severity_rank` hold the
+        result of `compute_severity` for each row so that list and detail
+        views, the `?severity=` filter and severity ordering work in SQL
+        without evaluating the rules per row and per request.  Databases
+        created before these columns existed are altered in place and every
+        row is backfilled once.
+        """
+        columns = {row['name'] for row in db.execute('PRAGMA table_info(sites)')}
+        if 'severity_rank' not in columns:
+            for column, column_type in (('severity_label', 'TEXT'), ('severity_class', 'TEXT'),
+                                        ('severity_rank', 'INTEGER')):
+                db.execute(f'ALTER TABLE sites ADD COLUMN {column} {column_type}')
+            rows = db.execute('SELECT id, status, country FROM sites').fetchall()
+            db.executemany(
+                'UPDATE sites SET severity_label=?, severity_class=?, severity_rank=? WHERE id=?',
+                [(*severity_columns(row), row['id']) for row in rows]
+            )
+        db.execute('CREATE INDEX IF NOT EXISTS idx_sites_severity ON sites (severity_rank, name)')
+
+    def init_url_key_column(db: sqlite3.Connection) -> None:
+        """Add and backfill `sites.url_key` (see `normalize_url`) on older databases.
+
+        The indexed key identifies a site independently of the spelling of
+        its URL; bulk imports upsert on it.
+        """
+        columns = {row['name'] for row in db.execute('PRAGMA table_info(sites)')}
+        if 'url_key' not in columns:
+            db.execute('ALTER TABLE sites ADD COLUMN url_key TEXT')
+            rows = db.execute('SELECT id, url FROM sites').fetchall()
+            db.executemany('UPDATE sites SET url_key=? WHERE id=?',
+                           [(normalize_url(row['url']), row['id']) for row in rows])
+        db.execute('CREATE INDEX IF NOT EXISTS idx_sites_url_key ON sites (url_key)')
+
+    def init_suggestion_keys(db: sqlite3.Connection) -> None:
+        """Add the duplicate-detection columns and indexes of `suggestions`.
+
+        `url_key` (see `normalize_url`) is indexed for exact matches and
+        `name_key` (see `normalize_name`) is covered by `suggestion_names`,
+        an external-content FTS5 table with the `trigram` tokenizer that
+        finds pending suggestions sharing trigrams with a new name.  Like
+        `sites_fts` it is kept in sync by triggers.  `submission_count`
+        counts the submissions merged into a suggestion.  Older databases
+        are migrated and backfilled.
+        """
+        columns = {row['name'] for row in db.execute('PRAGMA table_info(suggestions)')}
+        if 'url_key' not in columns:
+            db.execute('ALTER TABLE suggestions ADD COLUMN url_key TEXT')
+            db.execute('ALTER TABLE suggestions ADD COLUMN name_key TEXT')
+            db.execute('ALTER TABLE suggestions ADD COLUMN submission_count INTEGER NOT NULL DEFAULT 1')
+            rows = db.execute('SELECT id, name, url FROM suggestions').fetchall()
+            db.executemany('UPDATE suggestions SET url_key=?, name_key=? WHERE id=?',
+                           [(normalize_url(row['url']), normalize_name(row['name']), row['id'])
+                            for row in rows])
+        db.execute('CREATE INDEX IF NOT EXISTS idx_suggestions_url_key ON suggestions (url_key)')
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='suggestion_names'"
+        ).fetchone()
+        if exists:
+            return
+        db.execute(
+            '''CREATE VIRTUAL TABLE suggestion_names USING fts5(
+                name_key, content='suggestions', content_rowid='id', tokenize='trigram'
+            )'''
+        )
+        db.execute(
+            '''CREATE TRIGGER suggestion_names_ai AFTER INSERT ON suggestions BEGIN
+                INSERT INTO suggestion_names (rowid, name_key) VALUES (new.id, new.name_key);
+            END'''
+        )
+        db.execute(
+            '''CREATE TRIGGER suggestion_names_ad AFTER DELETE ON suggestions BEGIN
+                INSERT INTO suggestion_names (suggestion_names, rowid, name_key) VALUES ('delete', old.id, old.name_key);
+            END'''
+        )
+        db.execute(
+            '''CREATE TRIGGER suggestion_names_au AFTER UPDATE OF name_key ON suggestions BEGIN
+                INSERT INTO suggestion_names (suggestion_names, rowid, name_key) VALUES ('delete', old.id, old.name_key);
+                INSERT INTO suggestion_names (rowid, name_key) VALUES (new.id, new.name_key);
+            END'''
+        )
+        db.execute("INSERT INTO suggestion_names (suggestion_names) VALUES ('rebuild')")
+
+    def find_pending_duplicate(db: sqlite3.Connection, url_key: str, name_key: str) -> sqlite3.Row | None:
+        """Return the pending suggestion a new one duplicates, if any.
+
+        A suggestion duplicates another when their (non-empty) URL keys are equal, or
+        when their names reach `SUGGESTION_NAME_SIMILARITY`.  Candidates
+        for the latter are the suggestions sharing the most trigrams with
+        the name, read from `suggestion_names`; only they are scored.
+        """
+        # An empty key (an unparseable URL) matches nothing.
+        row = db.execute('SELECT * FROM suggestions WHERE url_key=? ORDER BY id LIMIT 1',
+                         (url_key,)).fetchone() if url_key else None
+        if row is not None or not name_key:
+            return row
+        if len(name_key) < 3:
+            # Too short for the trigram index: only an identical name matches.
+            return db.execute('SELECT * FROM suggestions WHERE name_key=? ORDER BY id LIMIT 1',
+                              (name_key,)).fetchone()
+        # Name keys are alphanumeric, so the trigrams need no escaping.
+        query = ' OR '.join(f'"{trigram}"' for trigram in sorted(name_trigrams(name_key)))
+        candidates = db.execute(
+            '''SELECT suggestions.* FROM suggestion_names
+               JOIN suggestions ON suggestions.id = suggestion_names.rowid
+               WHERE suggestion_names MATCH ? ORDER BY suggestion_names.rank LIMIT 20''',
+            (query,)
+        ).fetchall()
+        threshold = app.config['SUGGESTION_NAME_SIMILARITY']
+        scored = [(name_similarity(name_key, row['name_key']), -row['id'], row) for row in candidates]
+        best = max(scored, default=None, key=lambda item: item[:2])
+        return best[2] if best is not None and best[0] >= threshold else None
+
+    def record_suggestions(db: sqlite3.Connection,
+                           suggestions: Sequence[Mapping[str, Any]]) -> list[tuple[str, int]]:
+        """Store visitor suggestions unless they duplicate known data.
+
+        Returns one result per suggestion: `('listed', site_id)` when a
+        published site already has the same URL key, `('merged',
+        suggestion_id)` when the suggestion was folded into a pending
+        duplicate (see `find_pending_duplicate`), whose `submission_count`
+        is incremented, and `('created', suggestion_id)` otherwise.  The
+        checks and the writes of the whole batch run in one IMMEDIATE
+        transaction, so concurrent submissions of the same site cannot
+        both create a row and duplicates within the batch are merged too.
+        """
+        results = []
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            for suggestion in suggestions:
+                url_key = normalize_url(suggestion['url'])
+                name_key = normalize_name(suggestion['name'])
+                site = db.execute('SELECT id FROM sites WHERE url_key=? LIMIT 1',
+                                  (url_key,)).fetchone() if url_key else None
+                if site is not None:
+                    results.append(('listed', site['id']))
+                    continue
+                duplicate = find_pending_duplicate(db, url_key, name_key)
+                if duplicate is not None:
+                    db.execute('UPDATE suggestions SET submission_count = submission_count + 1 WHERE id=?',
+                               (duplicate['id'],))
+                    results.append(('merged', duplicate['id']))
+                    continue
+                cursor = db.execute(
+                    '''INSERT INTO suggestions (name, url, category, verification_type, country,
+                                              description, alternatives_json, url_key, name_key)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (suggestion['name'], suggestion['url'], suggestion['category'],
+                     suggestion['verification_type'], suggestion['country'],
+                     suggestion['description'], suggestion['alternatives_json'], url_key, name_key)
+                )
+                results.append(('created', cursor.lastrowid))
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return results
+
+    def write_suggestion_batch(suggestions: list[Mapping[str, Any]]) -> None:
+        """Write a batch from `suggestion_queue` on a pooled connection."""
+        db = write_pool.acquire()
+        try:
+            record_suggestions(db, suggestions)
+        finally:
+            write_pool.release(db)
+
+    def log_dropped_suggestions(exc: BaseException, suggestions: list[Mapping[str, Any]]) -> None:
+        """Report a batch that could not be written after all retries."""
+        app.logger.error('dropped %d queued suggestions: %s', len(suggestions), exc,
+                         exc_info=(type(exc), exc, exc.__traceback__))
+
+    # Optional asynchronous mode of /suggest (SUGGEST_QUEUE): submissions
+    # are acknowledged at once and written in batches by one background
+    # thread, so bursts of public traffic do not contend for the SQLite
+    # write lock.  Queued suggestions are flushed when the process exits.
+    suggestion_queue = WriteQueue(write_suggestion_batch, app.config['SUGGEST_QUEUE_SIZE'],
+                                  app.config['SUGGEST_BATCH_SIZE'], log_dropped_suggestions)
+    open_write_queues[suggestion_queue] = app.config['SUGGEST_DRAIN_TIMEOUT']
+
+    def insert_sites(db: sqlite3.Connection, sites: Sequence[Mapping[str, Any]]) -> list[int]:
+        """Insert sites with their derived columns and junction rows; return their IDs.
+
+        Each row is inserted with `RETURNING id`, so the IDs are those of
+        the rows written here even when another connection inserts sites
+        at the same time.  Missing optional fields are stored as empty
+        strings.  The caller is responsible for committing and for
+        publishing the change with `data_changed`.
+        """
+        if not sites:
+            return []
+        columns = SITE_COLUMNS + SITE_DERIVED_COLUMNS
+        sql = f'''INSERT INTO sites ({', '.join(columns)})
+                  VALUES ({', '.join('?' * len(columns))}) RETURNING id'''
+        site_ids = [db.execute(sql, site_row_values(site)).fetchone()[0] for site in sites]
+        sync_site_facets(db, zip(site_ids, sites))
+        return site_ids
+
+    def insert_site(db: sqlite3.Connection, site: Mapping[str, Any]) -> int:
+        """Insert a single site (see `insert_sites`) and return its ID."""
+        return insert_sites(db, [site])[0]
+
+    def insert_alternatives(db: sqlite3.Connection,
+                            alternatives: Iterable[tuple[int, Mapping[str, Any]]]) -> None:
+        """Insert `(site_id, alternative)` pairs with a single `executemany`.
+
+        Alternatives use the `{name, url, description}` shape of
+        `suggestions.alternatives_json` and of the JSON API.
+        """
+        db.executemany(
+            '''INSERT INTO alternatives (site_id, alt_name, alt_url, alt_description)
+               VALUES (?, ?, ?, ?)''',
+            [(site_id, alt['name'], alt['url'], alt.get('description') or '')
+             for site_id, alt in alternatives]
+        )
+
+    def upsert_sites(db: sqlite3.Connection, sites: list[Mapping[str, Any]]) -> tuple[int, int, list[int]]:
+        """Insert or update a batch of sites matched on their normalised URL.
+
+        New sites go through `insert_sites`.  For an existing site, only
+        the columns present in the record are written: the others keep
+        their stored values, so a partial record (a CSV with a few
+        columns, say) does not blank the rest of the site.  The updates,
+        the junction rows and, for records that carry an `alternatives`
+        list, the replacement of their alternatives each run once per
+        batch through `executemany`.  Records without a name or URL are
+        skipped.  Returns `(inserted, updated, site_ids)`; the caller
+        opens the transaction (with `BEGIN IMMEDIATE`, so the existing
+        keys cannot change before the writes) and commits.
+        """
+        records: dict[str, dict[str, Any]] = {}
+        for site in sites:
+            if not (site.get('name') and site.get('url')):
+                continue
+            key = normalize_url(site['url'])
+            if key:
+                # Later records with the same key win, field by field, as
+                # they would when applied one by one.
+                records[key] = {**records.get(key, {}), **site}
+        if not records:
+            return 0, 0, []
+        keys = list(records)
+        existing = {}
+        # By chunks of 500, below SQLite's limit on bound parameters
+        # whatever `--batch-size` is.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update((row['url_key'], row) for row in db.execute(
+                f"SELECT id, url_key, {', '.join(SITE_COLUMNS)} FROM sites WHERE url_key IN ({placeholders}) "
+                'ORDER BY id DESC', chunk
+            ))
+        new_keys = [key for key in keys if key not in existing]
+        site_ids = dict(zip(new_keys, insert_sites(db, [records[key] for key in new_keys])))
+        updated = {}
+        for key in keys:
+            if key in existing:
+                row = existing[key]
+                site_ids[key] = row['id']
+                updated[key] = {**{column: row[column] for column in SITE_COLUMNS},
+                                **{column: records[key][column] for column in SITE_COLUMNS
+                                   if column in records[key]}}
+        columns = SITE_COLUMNS + SITE_DERIVED_COLUMNS
+        db.executemany(
+            f"UPDATE sites SET {', '.join(f'{column}=?' for column in columns)} WHERE id=?",
+            [(*site_row_values(site), site_ids[key]) for key, site in updated.items()]
+        )
+        sync_site_facets(db, [(site_ids[key], site) for key, site in updated.items()])
+        with_alternatives = [key for key in keys if records[key].get('alternatives') is not None]
+        if with_alternatives:
+            db.executemany('DELETE FROM alternatives WHERE site_id=?',
+                           [(site_ids[key],) for key in with_alternatives])
+            insert_alternatives(db, [(site_ids[key], alt) for key in with_alternatives
+                                     for alt in records[key]['alternatives']])
+        return len(new_keys), len(updated), [site_ids[key] for key in keys]
+
+    def create_base_tables(db: sqlite3.Connection) -> None:
+        """Create the `sites`, `alternatives` and `suggestions` tables.
+
+        New databases get the current columns directly; the later
+        migrations check for them before altering an older table.
+        """
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS sites (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                description TEXT,
+                verification_type TEXT,
+                context TEXT,
+                date_in_effect TEXT,
+                status TEXT,
+                country TEXT,
+                sources TEXT,
+                severity_label TEXT,
+                severity_class TEXT,
+                severity_rank INTEGER,
+                url_key TEXT
+            )'''
+        )
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS alternatives (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site_id INTEGER NOT NULL,
+                alt_name TEXT NOT NULL,
+                alt_url TEXT NOT NULL,
+                alt_description TEXT,
+                FOREIGN KEY (site_id) REFERENCES sites(id)
+            )'''
+        )
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS suggestions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                verification_type TEXT,
+                country TEXT,
+                description TEXT,
+                alternatives_json TEXT,
+                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                url_key TEXT,
+                name_key TEXT,
+                submission_count INTEGER NOT NULL DEFAULT 1
+            )'''
+        )
+        # Keyset pagination of /sites walks this index in (name, id) order.
+        db.execute('CREATE INDEX IF NOT EXISTS idx_sites_name ON sites (name)')
+
+    def add_lookup_indexes(db: sqlite3.Connection) -> None:
+        """Index the columns the application filters and sorts on.
+
+        `alternatives(site_id)` serves the per-site alternatives lookups,
+        `sites(category)` the category lists, and `suggestions(submitted_at)`
+        the moderation queue, walked newest first.
+        """
+        db.execute('CREATE INDEX IF NOT EXISTS idx_alternatives_site_id ON alternatives (site_id)')
+        db.execute('CREATE INDEX IF NOT EXISTS idx_sites_category ON sites (category)')
+        db.execute('CREATE INDEX IF NOT EXISTS idx_suggestions_submitted_at ON suggestions (submitted_at)')
+
+    def init_facet_counts(db: sqlite3.Connection) -> None:
+        """Create the `facet_counts` table holding the number of sites per facet value.
+
+        The filter drop-downs show how many sites each value yields.
+        Counting them on every page view would cost one aggregate over each
+        junction table, so the counts are materialized as one row per
+        `(facet, value)` and kept current by triggers: every row inserted
+        into or deleted from a junction table, and every site inserted,
+        deleted or re-ranked, adjusts a single primary-key row.  Since
+        `sync_site_facets` rewrites the junction rows of edited sites and
+        `site_facets_ad` removes those of deleted sites, no write path has to
+        maintain the counts itself.  Values whose count drops to zero are
+        removed.  Severity counts are keyed by `severity_rank`.  The table
+        is backfilled from the current data.
+        """
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS facet_counts (
+                facet TEXT NOT NULL,
+                value TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (facet, value)
+            ) WITHOUT ROWID'''
+        )
+
+        def increment(value: str, facet: str) -> str:
+            return (f"INSERT INTO facet_counts (facet, value, count) SELECT '{facet}', {value}, 1 "
+                    f'WHERE {value} IS NOT NULL ON CONFLICT (facet, value) DO UPDATE SET count = count + 1;')
+
+        def decrement(value: str, facet: str) -> str:
+            return (f"UPDATE facet_counts SET count = count - 1 WHERE facet = '{facet}' AND value = {value}; "
+                    f"DELETE FROM facet_counts WHERE facet = '{facet}' AND value = {value} AND count <= 0;")
+
+        for name, (table, column) in zip(FACET_NAMES, FACET_TABLES):
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {table}_counts_ai AFTER INSERT ON {table} BEGIN '
+                       f'{increment("new." + column, name)} END')
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {table}_counts_ad AFTER DELETE ON {table} BEGIN '
+                       f'{decrement("old." + column, name)} END')
+        db.execute('CREATE TRIGGER IF NOT EXISTS sites_severity_counts_ai AFTER INSERT ON sites BEGIN '
+                   f'{increment("new.severity_rank", "severity")} END')
+        db.execute('CREATE TRIGGER IF NOT EXISTS sites_severity_counts_ad AFTER DELETE ON sites BEGIN '
+                   f'{decrement("old.severity_rank", "severity")} END')
+        db.execute('CREATE TRIGGER IF NOT EXISTS sites_severity_counts_au AFTER UPDATE OF severity_rank ON sites '
+                   'WHEN old.severity_rank IS NOT new.severity_rank BEGIN '
+                   f'{decrement("old.severity_rank", "severity")} '
+                   f'{increment("new.severity_rank", "severity")} END')
+        db.execute('DELETE FROM facet_counts')
+        for name, (table, column) in zip(FACET_NAMES, FACET_TABLES):
+            db.execute(f"INSERT INTO facet_counts (facet, value, count) "
+                       f"SELECT '{name}', {column}, COUNT(*) FROM {table} GROUP BY {column}")
+        db.execute("INSERT INTO facet_counts (facet, value, count) "
+                   "SELECT 'severity', severity_rank, COUNT(*) FROM sites "
+                   "WHERE severity_rank IS NOT NULL GROUP BY severity_rank")
+
+    def create_change_log(db: sqlite3.Connection) -> None:
+        """Create `data_changes`, the log through which processes share catalogue changes.
+
+        Each published change is a generation number with one row per
+        changed site, or a single row with a NULL `site_id` for a bulk
+        change (see `data_changed` and `sync_caches`).
+        """
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS data_changes (
+                generation INTEGER NOT NULL,
+                site_id INTEGER
+            )'''
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS idx_data_changes_generation ON data_changes (generation)')
 
-    # ------------------------------------------------------------------
-    # Database helper functions
-    #
-    # The following helper functions wrap access to the SQLite database.
-    # Using g (Flask's application context) ensures that each request
-    # reuses the same database connection and that it is closed cleanly
-    # after the request finishes.
-    def get_db() -> sqlite3.Connection:
-        """Open a new database connection if none exists for the current context.
+    def create_link_checks(db: sqlite3.Connection) -> None:
+        """Create `link_checks`, the last result of `flask links check` for each URL.
 
-        When called for the first time in a request this function creates
-        a new connection to the SQLite database file and configures it to
-        return rows as dictionaries.  The connection is stored on the
-        `g` object so subsequent calls in the same request return the same
-        connection.  See https://flask.palletsprojects.com/en/latest/appcontext/
-        for details about the application context.
+        Rows are keyed by URL, so a link shared by several sites or
+        alternatives is probed once.  `status` is the HTTP status of the
+        page finally reached (`final_url`), or NULL with `error` set when
+        none was; `age_gate` is the marker found on it (see
+        `AGE_GATE_PATTERN`); `etag` and `last_modified` make the next
+        check conditional; `checked_at` is a Unix time.
         """
-        if 'db' not in g:
-            g.db = sqlite3.connect(
-                app.config['DATABASE'],
-                detect_types=sqlite3.PARSE_DECLTYPES
-            )
-            # Rows will behave like dicts so we can access columns by name.
-            g.db.row_factory = sqlite3.Row
-        return g.db
+        db.execute(
+            '''CREATE TABLE IF NOT EXISTS link_checks (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                error TEXT,
+                final_url TEXT NOT NULL,
+                latency_ms INTEGER NOT NULL,
+                age_gate TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL
+            ) WITHOUT ROWID'''
+        )
 
-    @app.teardown_appcontext
-    def close_db(exception: Exception | None) -> None:
-        """Close the database connection at the end of the request.
+    # Ordered schema migrations.  `PRAGMA user_version` stores how many of
+    # them a database has applied; `upgrade_db` runs the missing ones.
+    # Append new entries at the end and never reorder or remove existing
+    # ones.  The early entries predate the migration runner and are
+    # idempotent, so databases created before it (at version 0) upgrade
+    # cleanly.
+    MIGRATIONS: tuple[tuple[str, Callable[[sqlite3.Connection], None]], ...] = (
+        ('base tables', create_base_tables),
+        ('precomputed severity', init_severity_columns),
+        ('normalised URL key', init_url_key_column),
+        ('full-text search index', init_search_index),
+        ('facet junction tables', init_facet_tables),
+        ('suggestion duplicate detection', init_suggestion_keys),
+        ('lookup indexes', add_lookup_indexes),
+        ('materialized facet counts', init_facet_counts),
+        ('cross-process change log', create_change_log),
+        ('link health checks', create_link_checks),
+    )
 
-        Flask automatically calls functions decorated with
-        `@app.teardown_appcontext` when the application context is torn down.
-        We remove the connection from `g` and close it if it exists.  This
-        prevents connections from leaking between requests.
+    def upgrade_db(db: sqlite3.Connection, log: Callable[[str], None] | None = None) -> tuple[int, int]:
+        """Apply the pending `MIGRATIONS`; return the schema versions before and after.
+
+        A current database costs a single PRAGMA read.  Each migration runs
+        in its own IMMEDIATE transaction together with the update of
+        `user_version`, so a failure leaves the database at the previous
+        version, and processes starting together apply each step once.
         """
-        db = g.pop('db', None)
-        if db is not None:
-            db.close()
+        start = db.execute('PRAGMA user_version').fetchone()[0]
+        if start >= len(MIGRATIONS):
+            return start, start
+        for version, (description, migrate) in enumerate(MIGRATIONS, start=1):
+            if version <= start:
+                continue
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                if db.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    # Applied by another process in the meantime.
+                    db.rollback()
+                    continue
+                migrate(db)
+                db.execute(f'PRAGMA user_version = {version}')
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+            if log is not None:
+                log(f'{version}: {description}')
+        return start, len(MIGRATIONS)
+
+    def seed_sample_data(db: sqlite3.Connection) -> None:
+        """Insert a few well-known web sites and their alternatives to demonstrate the application."""
+        sample_sites: List[Dict[str, Any]] = [
+            {
+                'name': 'Pornhub',
+                'url': 'https://www.pornhub.com',
+                'category': 'Adulte',
+                'description': 'Plateforme de vidéos pour adultes populaire.',
+                'verification_type': 'Selfie vidéo ou pièce d’identité via un prestataire',
+                'context': 'Conformité à la loi française 2024 ; blocage complet en France en signe de protestation.',
+                'date_in_effect': 'juillet 2024',
+                'status': 'Bloqué en France ; accessible sans vérification hors France',
+                'country': 'FR',
+                'sources': 'Politico.eu, TF1 Info, AP News'
+            },
+            {
+                'name': 'Reddit',
+                'url': 'https://www.reddit.com',
+                'category': 'Réseaux sociaux',
+                'description': 'Forum communautaire regroupant des discussions sur des milliers de sujets.',
+                'verification_type': 'Vérification d’âge via service tiers (Persona) – scan d’une pièce d’identité ou selfie vidéo',
+                'context': 'Conformité à l’Online Safety Act 2023 (R.-Uni)',
+                'date_in_effect': 'juillet 2024',
+                'status': 'Vérification requise au Royaume‑Uni seulement',
+                'country': 'UK',
+                'sources': 'Tom’s Guide'
+            },
+            {
+                'name': 'Spotify',
+                'url': 'https://www.spotify.com',
+                'category': 'Streaming',
+                'description': 'Service de streaming musical et de podcasts.',
+                'verification_type': 'Contrôle d’âge via Yoti pour certains clips 18+',
+                'context': 'Volonté de respecter les réglementations sur le contenu adulte',
+                'date_in_effect': '2024',
+                'status': 'Vérification appliquée de manière sélective pour les clips 18+',
+                'country': 'International',
+                'sources': 'Tom’s Guide'
+            },
+            {
+                'name': 'X (Twitter)',
+                'url': 'https://twitter.com',
+                'category': 'Réseaux sociaux',
+                'description': 'Réseau social de micro‑blogging.',
+                'verification_type': 'Demande d’identité ou de carte bancaire pour accéder à certains contenus sensibles',
+                'context': 'Déploiement progressif en réponse aux lois britanniques',
+                'date_in_effect': '2024',
+                'status': 'Implémenté au Royaume‑Uni ; tests dans d’autres régions',
+                'country': 'UK',
+                'sources': 'Tom’s Guide'
+            }
+        ]
+        site_ids = dict(zip((site['name'] for site in sample_sites), insert_sites(db, sample_sites)))
+        porn_id = site_ids['Pornhub']
+        reddit_id = site_ids['Reddit']
+        spotify_id = site_ids['Spotify']
+        twitter_id = site_ids['X (Twitter)']
+        sample_alts = [
+            {'site_id': porn_id, 'alt_name': 'YouPorn', 'alt_url': 'https://www.youporn.com', 'alt_description': 'Site de vidéos pour adultes accessible sans vérification intrusive (confirmation 18+ classique).'},
+            {'site_id': porn_id, 'alt_name': 'SpankBang', 'alt_url': 'https://spankbang.com', 'alt_description': 'Plateforme pour adultes offrant un contenu similaire, sans pièce d’identité requise.'},
+            {'site_id': reddit_id, 'alt_name': 'Lemmy', 'alt_url': 'https://join-lemmy.org', 'alt_description': 'Alternative open‑source fédérée à Reddit ; pas de vérification centrale.'},
+            {'site_id': reddit_id, 'alt_name': 'Kbin', 'alt_url': 'https://kbin.social', 'alt_description': 'Alternative communautaire aux forums, sans demande d’ID.'},
+            {'site_id': spotify_id, 'alt_name': 'Bandcamp', 'alt_url': 'https://bandcamp.com', 'alt_description': 'Plateforme de musique indépendante avec simple confirmation 18+ pour les contenus explicites.'},
+            {'site_id': spotify_id, 'alt_name': 'SoundCloud', 'alt_url': 'https://soundcloud.com', 'alt_description': 'Service de streaming audio orienté vers les créateurs ; pas de contrôle d’identité généralisé.'},
+            {'site_id': twitter_id, 'alt_name': 'Mastodon', 'alt_url': 'https://mastodon.social', 'alt_description': 'Réseau social décentralisé où chaque instance peut définir ses règles.'}
+        ]
+        insert_alternatives(db, [
+            (alt['site_id'], {'name': alt['alt_name'], 'url': alt['alt_url'], 'description': alt['alt_description']})
+            for alt in sample_alts
+        ])
+        db.commit()
 
-    def init_db() -> None:
-        """Initialise the database schema and insert a few sample entries.
+    def init_db() -> bool:
+        """Bring the database schema up to date and seed a new database.
 
-        Executing this function will create the `sites`, `alternatives` and
-        `suggestions` tables if they do not already exist.  A handful of
-        well‑known web sites are inserted into the `sites` table on the
-        first run to demonstrate the application.  Running this function
-        repeatedly is safe because it checks whether the `sites` table is
-        empty before seeding the sample data.
+        The schema is upgraded by `upgrade_db` unless `DB_AUTO_MIGRATE` is
+        off, in which case `flask db upgrade` must be run after deploying a
+        new version.  A database created by this call (schema version 0
+        and no sites) receives the sample entries of `seed_sample_data`.
+        Returns whether the schema is current.
         """
         db = get_db()
-        with db:
-            # Create the core tables.  If a table already exists the IF NOT
-            # EXISTS clause prevents an error from being raised.
-            db.execute(
-                '''CREATE TABLE IF NOT EXISTS sites (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    description TEXT,
-                    verification_type TEXT,
-                    context TEXT,
-                    date_in_effect TEXT,
-                    status TEXT,
-                    country TEXT,
-                    sources TEXT
-                )'''
-            )
-            db.execute(
-                '''CREATE TABLE IF NOT EXISTS alternatives (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    site_id INTEGER NOT NULL,
-                    alt_name TEXT NOT NULL,
-                    alt_url TEXT NOT NULL,
-                    alt_description TEXT,
-                    FOREIGN KEY (site_id) REFERENCES sites(id)
-                )'''
-            )
-            db.execute(
-                '''CREATE TABLE IF NOT EXISTS suggestions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    verification_type TEXT,
-                    country TEXT,
-                    description TEXT,
-                    alternatives_json TEXT,
-                    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )'''
-            )
-            # Seed sample data on first run
-            count = db.execute('SELECT COUNT(*) FROM sites').fetchone()[0]
-            if count == 0:
-                sample_sites: List[Dict[str, Any]] = [
-                    {
-                        'name': 'Pornhub',
-                        'url': 'https://www.pornhub.com',
-                        'category': 'Adulte',
-                        'description': 'Plateforme de vidéos pour adultes populaire.',
-                        'verification_type': 'Selfie vidéo ou pièce d’identité via un prestataire',
-                        'context': 'Conformité à la loi française 2024 ; blocage complet en France en signe de protestation.',
-                        'date_in_effect': 'juillet 2024',
-                        'status': 'Bloqué en France ; accessible sans vérification hors France',
-                        'country': 'FR',
-                        'sources': 'Politico.eu, TF1 Info, AP News'
-                    },
-                    {
-                        'name': 'Reddit',
-                        'url': 'https://www.reddit.com',
-                        'category': 'Réseaux sociaux',
-                        'description': 'Forum communautaire regroupant des discussions sur des milliers de sujets.',
-                        'verification_type': 'Vérification d’âge via service tiers (Persona) – scan d’une pièce d’identité ou selfie vidéo',
-                        'context': 'Conformité à l’Online Safety Act 2023 (R.-Uni)',
-                        'date_in_effect': 'juillet 2024',
-                        'status': 'Vérification requise au Royaume‑Uni seulement',
-                        'country': 'UK',
-                        'sources': 'Tom’s Guide'
-                    },
-                    {
-                        'name': 'Spotify',
-                        'url': 'https://www.spotify.com',
-                        'category': 'Streaming',
-                        'description': 'Service de streaming musical et de podcasts.',
-                        'verification_type': 'Contrôle d’âge via Yoti pour certains clips 18+',
-                        'context': 'Volonté de respecter les réglementations sur le contenu adulte',
-                        'date_in_effect': '2024',
-                        'status': 'Vérification appliquée de manière sélective pour les clips 18+',
-                        'country': 'International',
-                        'sources': 'Tom’s Guide'
-                    },
-                    {
-                        'name': 'X (Twitter)',
-                        'url': 'https://twitter.com',
-                        'category': 'Réseaux sociaux',
-                        'description': 'Réseau social de micro‑blogging.',
-                        'verification_type': 'Demande d’identité ou de carte bancaire pour accéder à certains contenus sensibles',
-                        'context': 'Déploiement progressif en réponse aux lois britanniques',
-                        'date_in_effect': '2024',
-                        'status': 'Implémenté au Royaume‑Uni ; tests dans d’autres régions',
-                        'country': 'UK',
-                        'sources': 'Tom’s Guide'
-                    }
-                ]
-                # Bulk insert the sample sites
-                for site in sample_sites:
-                    db.execute(
-                        '''INSERT INTO sites
-                            (name, url, category, description, verification_type, context, date_in_effect, status, country, sources)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                        (
-                            site['name'], site['url'], site['category'], site['description'],
-                            site['verification_type'], site['context'], site['date_in_effect'],
-                            site['status'], site['country'], site['sources']
-                        )
-                    )
-                # Commit before inserting alternatives to reference the generated IDs
-                db.commit()
-                # Retrieve the IDs for the inserted sites
-                porn_id = db.execute('SELECT id FROM sites WHERE name=?', ('Pornhub',)).fetchone()['id']
-                reddit_id = db.execute('SELECT id FROM sites WHERE name=?', ('Reddit',)).fetchone()['id']
-                spotify_id = db.execute('SELECT id FROM sites WHERE name=?', ('Spotify',)).fetchone()['id']
-                twitter_id = db.execute('SELECT id FROM sites WHERE name=?', ('X (Twitter)',)).fetchone()['id']
-                sample_alts = [
-                    {'site_id': porn_id, 'alt_name': 'YouPorn', 'alt_url': 'https://www.youporn.com', 'alt_description': 'Site de vidéos pour adultes accessible sans vérification intrusive (confirmation 18+ classique).'},
-                    {'site_id': porn_id, 'alt_name': 'SpankBang', 'alt_url': 'https://spankbang.com', 'alt_description': 'Plateforme pour adultes offrant un contenu similaire, sans pièce d’identité requise.'},
-                    {'site_id': reddit_id, 'alt_name': 'Lemmy', 'alt_url': 'https://join-lemmy.org', 'alt_description': 'Alternative open‑source fédérée à Reddit ; pas de vérification centrale.'},
-                    {'site_id': reddit_id, 'alt_name': 'Kbin', 'alt_url': 'https://kbin.social', 'alt_description': 'Alternative communautaire aux forums, sans demande d’ID.'},
-                    {'site_id': spotify_id, 'alt_name': 'Bandcamp', 'alt_url': 'https://bandcamp.com', 'alt_description': 'Plateforme de musique indépendante avec simple confirmation 18+ pour les contenus explicites.'},
-                    {'site_id': spotify_id, 'alt_name': 'SoundCloud', 'alt_url': 'https://soundcloud.com', 'alt_description': 'Service de streaming audio orienté vers les créateurs ; pas de contrôle d’identité généralisé.'},
-                    {'site_id': twitter_id, 'alt_name': 'Mastodon', 'alt_url': 'https://mastodon.social', 'alt_description': 'Réseau social décentralisé où chaque instance peut définir ses règles.'}
-                ]
-                for alt in sample_alts:
-                    db.execute(
-                        '''INSERT INTO alternatives (site_id, alt_name, alt_url, alt_description)
-                           VALUES (?, ?, ?, ?)''',
-                        (alt['site_id'], alt['alt_name'], alt['alt_url'], alt['alt_description'])
-                    )
-                db.commit()
+        current = db.execute('PRAGMA user_version').fetchone()[0]
+        if current >= len(MIGRATIONS):
+            return True
+        if not app.config['DB_AUTO_MIGRATE']:
+            app.logger.warning('database schema is at version %d of %d; run `flask db upgrade`',
+                               current, len(MIGRATIONS))
+            return False
+        start, _ = upgrade_db(db)
+        if start == 0 and db.execute('SELECT COUNT(*) FROM sites').fetchone()[0] == 0:
+            seed_sample_data(db)
+        return True
+
+    @app.cli.group('db')
+    def db_cli() -> None:
+        """Manage the database schema."""
+
+    @db_cli.command('upgrade')
+    def db_upgrade_command() -> None:
+        """Apply the pending schema migrations."""
+        start, end = upgrade_db(get_db(), log=lambda line: click.echo(f'applied migration {line}'))
+        if start == end:
+            click.echo(f'schema is up to date (version {end})')
+        else:
+            click.echo(f'schema upgraded from version {start} to {end}')
 
     # Initialise database when the application starts
     with app.app_context():
-        init_db()
+        schema_current = init_db()
 
     # ------------------------------------------------------------------
     # Helper functions and context processors
@@ -249,6 +2833,699 @@ def create_app(test_config: dict | None = None) -> Flask:
     # dropdowns, we define a few helper functions and inject data into the
     # template context.  These helpers are available in all templates.
 
+    # Application-level data version.  Every code path that changes the
+    # published catalogue calls `bump_data_version()` after committing;
+    # caches tag their entries with the version they were built from and
+    # treat any other version as stale.
+    # `modified_at` is served as the Last-Modified date of cached pages.
+    data_state: dict[str, Any] = {'version': 0, 'modified_at': utc_now()}
+    data_lock = threading.Lock()
+
+    def bump_data_version() -> int:
+        """Mark all cached catalogue data as stale and return the new version."""
+        with data_lock:
+            data_state['version'] += 1
+            data_state['modified_at'] = utc_now()
+            return data_state['version']
+
+    def data_changed(db: sqlite3.Connection, site_ids: Iterable[int] | None = ()) -> None:
+        """Publish a committed change to the catalogue.
+
+        Refreshes the caches of this process (see `refresh_caches`) and,
+        when sites changed, appends the change to the `data_changes` log so
+        that the other worker processes apply it too (see `sync_caches`).
+        `site_ids` lists the sites inserted, edited or deleted, or whose
+        alternatives changed; `None` means too many sites changed to list
+        them.  Call it after `db.commit()`.
+        """
+        site_ids = None if site_ids is None else list(site_ids)
+        refresh_caches(db, site_ids)
+        if site_ids == []:
+            return
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            generation = db.execute('SELECT COALESCE(MAX(generation), 0) + 1 FROM data_changes').fetchone()[0]
+            db.executemany('INSERT INTO data_changes (generation, site_id) VALUES (?, ?)',
+                           [(generation, site_id) for site_id in (site_ids if site_ids is not None else [None])])
+            db.execute('DELETE FROM data_changes WHERE generation <= ?', (generation - DATA_CHANGES_KEEP,))
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        with sync_lock:
+            # Unless another process published in the meantime, this
+            # process is up to date with the log.
+            if sync_state['generation'] == generation - 1:
+                sync_state['generation'] = generation
+
+    def refresh_caches(db: sqlite3.Connection, site_ids: list[int] | None) -> None:
+        """Bring the caches of this process up to date after a committed change.
+
+        Bumps the data version, which invalidates the version-tagged caches,
+        drops the cached detail payloads of the sites in `site_ids` and
+        patches the in-memory indexes for them so they do not have to be
+        rebuilt from scratch.  `None` means too many sites changed to patch
+        them: every detail payload is dropped and the indexes are left
+        stale and reloaded on next use.
+        """
+        new_version = bump_data_version()
+        with data_lock:
+            if site_ids is None:
+                site_detail_cache.clear()
+            else:
+                for site_id in site_ids:
+                    site_detail_cache.discard(site_id)
+        if site_ids is None:
+            return
+        if site_ids:
+            rows, alternatives = load_site_payloads(db, site_ids)
+            domain_index.update(site_ids, domain_entries(rows, alternatives),
+                                new_version - 1, new_version)
+            name_index.update(site_ids, name_entries(rows, alternatives), new_version - 1, new_version)
+        else:
+            domain_index.update((), (), new_version - 1, new_version)
+            name_index.update((), (), new_version - 1, new_version)
+
+    # Position of this process in the `data_changes` log, and the
+    # connection used to watch the database for commits of other processes.
+    sync_state: dict[str, Any] = {'generation': 0, 'data_version': None, 'checked': 0.0,
+                                  'pid': None, 'connection': None}
+    sync_lock = threading.Lock()
+
+    def sync_caches() -> None:
+        """Apply the catalogue changes published by other processes to the caches of this one.
+
+        Every worker keeps its own caches, so an approval handled by one
+        worker must reach the others.  At most every `CACHE_SYNC_INTERVAL`
+        seconds, a request first reads `PRAGMA data_version` on a dedicated
+        connection, which changes only when another connection has
+        committed; this costs no disk access.  Only then is the
+        `data_changes` log read past the last applied generation, and the
+        sites it names are refreshed with `refresh_caches`.  If some
+        generations were already pruned from the log, or a bulk change was
+        published, every cache is dropped instead.  A single thread checks
+        at a time; the others do not wait for it.
+        """
+        now = time.monotonic()
+        if now - sync_state['checked'] < app.config['CACHE_SYNC_INTERVAL']:
+            return
+        if not sync_lock.acquire(blocking=False):
+            return
+        try:
+            sync_state['checked'] = now
+            if sync_state['pid'] != os.getpid():
+                # SQLite handles must not cross fork(): open our own.
+                sync_state['connection'] = open_read_connection()
+                sync_state['pid'] = os.getpid()
+                sync_state['data_version'] = None
+            db = sync_state['connection']
+            data_version = db.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == sync_state['data_version']:
+                return
+            sync_state['data_version'] = data_version
+            changes = db.execute(
+                'SELECT generation, site_id FROM data_changes WHERE generation > ? ORDER BY generation',
+                (sync_state['generation'],)
+            ).fetchall()
+            if not changes:
+                return
+            site_ids = {site_id for _, site_id in changes}
+            complete = changes[0][0] == sync_state['generation'] + 1 and None not in site_ids
+            refresh_caches(db, sorted(site_ids) if complete else None)
+            sync_state['generation'] = changes[-1][0]
+        finally:
+            sync_lock.release()
+
+    @app.before_request
+    def sync_caches_before_request() -> None:
+        sync_caches()
+
+    # Detail payloads of single sites (see `get_site_detail`), kept across
+    # data version bumps and invalidated per site by `data_changed`.
+    site_detail_cache = LRUCache(app.config['SITE_DETAIL_CACHE_SIZE'])
+
+    def get_site_detail(site_id: int) -> dict[str, Any] | None:
+        """Return `{'site': {...}, 'alternatives': [...]}` for a site, or None if it does not exist.
+
+        The site and its alternatives are read with one LEFT JOIN, which
+        finds the alternatives through `idx_alternatives_site_id`.
+        Payloads are kept in `site_detail_cache`; a payload read while a
+        change was being published is served but not cached, since it may
+        predate the change (the check and `data_changed`'s invalidation are
+        serialised by `data_lock`).  Alternatives have the `{name, url,
+        description}` shape of the JSON API; `links` maps the checked URLs
+        of the site and its alternatives to `describe_link` results.
+        """
+        detail = site_detail_cache.get(site_id, 0)
+        if detail is not None:
+            return detail
+        version = data_state['version']
+        rows = get_read_db().execute(
+            '''SELECT sites.*, alternatives.alt_name, alternatives.alt_url, alternatives.alt_description
+               FROM sites LEFT JOIN alternatives ON alternatives.site_id = sites.id
+               WHERE sites.id = ? ORDER BY alternatives.id''',
+            (site_id,)
+        ).fetchall()
+        if not rows:
+            return None
+        site_columns = [key for key in rows[0].keys() if not key.startswith('alt_')]
+        detail = {
+            'site': {column: rows[0][column] for column in site_columns},
+            'alternatives': [
+                {'name': row['alt_name'], 'url': row['alt_url'], 'description': row['alt_description']}
+                for row in rows if row['alt_name'] is not None
+            ],
+        }
+        detail['links'] = site_links(detail, load_link_states(get_read_db(), detail_urls(detail)))
+        with data_lock:
+            if data_state['version'] == version:
+                site_detail_cache.set(site_id, detail, 0)
+        return detail
+
+    def detail_urls(detail: Mapping[str, Any]) -> list[str]:
+        """Return the URLs of a site detail payload: the site's, then its alternatives'."""
+        return [detail['site']['url']] + [alt['url'] for alt in detail['alternatives']]
+
+    def site_links(detail: Mapping[str, Any], states: Mapping[str, dict[str, str]]) -> dict[str, dict[str, str]]:
+        """Pick the link states of a site detail payload out of `states`."""
+        return {url: states[url] for url in detail_urls(detail) if url in states}
+
+    def load_link_states(db: sqlite3.Connection, urls: Sequence[str] | None = None) -> dict[str, dict[str, str]]:
+        """Return `describe_link` results keyed by URL, for `urls` or every checked link."""
+        if urls is None:
+            rows = db.execute('SELECT url, status, error, age_gate FROM link_checks')
+        else:
+            urls = list(dict.fromkeys(url for url in urls if url))
+            rows = itertools.chain.from_iterable(
+                db.execute(
+                    f"SELECT url, status, error, age_gate FROM link_checks WHERE url IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for chunk in (urls[start:start + 500] for start in range(0, len(urls), 500))
+            )
+        return {row['url']: describe_link(row['status'], row['error'], row['age_gate']) for row in rows}
+
+    filter_cache: dict[str, tuple[int, dict[str, Any]]] = {}
+
+    def get_filter_data() -> dict[str, Any]:
+        """Return the filter drop-down values, reading the database only when stale.
+
+        Categories, countries and the number of sites per facet value come
+        from the `facet_counts` table in a single primary-key scan, and are
+        kept in `filter_cache` until the data version changes.  The cached
+        payload is replaced as a whole, never mutated, so concurrent
+        requests always see a consistent snapshot.
+        """
+        version = data_state['version']
+        cached = filter_cache.get('entry')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        db = get_read_db()
+        counts = collect_facet_counts(db.execute('SELECT facet, value, count FROM facet_counts'))
+        country_set = set(counts['country'])
+        # Add a few generic regions
+        country_set.update({'International', 'UE', 'EU'})
+        data = {'categories': sorted(counts['category']), 'countries': sorted(country_set),
+                'facet_counts': counts}
+        filter_cache['entry'] = (version, data)
+        return data
+
+    facet_count_cache = LRUCache(app.config['FACET_COUNT_CACHE_SIZE'])
+
+    def get_facet_counts(db: sqlite3.Connection, args: MultiDict) -> dict[str, dict[str, int]]:
+        """Return the facet counts narrowed by the filters in `args`.
+
+        Without an active filter these are the stored global counts of
+        `get_filter_data`.  Otherwise the counts come from the single
+        statement of `build_facet_count_query` and are kept in
+        `facet_count_cache`, keyed by the filter parameters only, so that
+        paging through or re-sorting a filtered listing reuses them until
+        the data version changes.
+        """
+        facet_query = build_facet_count_query(args)
+        if facet_query is None:
+            return get_filter_data()['facet_counts']
+        version = data_state['version']
+        key = tuple((name, tuple(sorted(value for value in args.getlist(name) if value)))
+                    for name in ('q',) + FACET_NAMES)
+        counts = facet_count_cache.get(key, version)
+        if counts is None:
+            counts = collect_facet_counts(db.execute(*facet_query))
+            facet_count_cache.set(key, counts, version)
+        return counts
+
+    domain_index = DomainIndex()
+
+    def load_site_payloads(db: sqlite3.Connection, site_ids: list[int] | None = None
+                           ) -> tuple[list[sqlite3.Row], dict[int, list[dict[str, Any]]]]:
+        """Read the sites (all of them, or `site_ids`) and their alternatives for the in-memory indexes."""
+        if site_ids is None:
+            rows = db.execute('SELECT * FROM sites').fetchall()
+            alt_rows = db.execute('SELECT * FROM alternatives ORDER BY id')
+        else:
+            placeholders = ','.join('?' * len(site_ids))
+            rows = db.execute(f'SELECT * FROM sites WHERE id IN ({placeholders})', site_ids).fetchall()
+            alt_rows = db.execute(
+                f'SELECT * FROM alternatives WHERE site_id IN ({placeholders}) ORDER BY id', site_ids
+            )
+        alternatives: dict[int, list[dict[str, Any]]] = {}
+        for alt in alt_rows:
+            alternatives.setdefault(alt['site_id'], []).append({
+                'name': alt['alt_name'],
+                'url': alt['alt_url'],
+                'description': alt['alt_description'],
+            })
+        return rows, alternatives
+
+    def domain_entries(rows: Iterable[sqlite3.Row], alternatives: dict[int, list[dict[str, Any]]]
+                       ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield the `(host, payload)` pairs stored in the domain index."""
+        for row in rows:
+            payload = {field: row[field] for field in LOOKUP_FIELDS}
+            payload['alternatives'] = alternatives.get(row['id'], [])
+            yield normalize_host(row['url']), payload
+
+    def get_domain_index() -> DomainIndex:
+        """Return the domain index, reloading it from the database if it is stale."""
+        version = data_state['version']
+        if domain_index.version != version:
+            rows, alternatives = load_site_payloads(get_read_db())
+            domain_index.load(domain_entries(rows, alternatives), version)
+        return domain_index
+
+    name_index = NameIndex()
+
+    def name_entries(rows: Iterable[sqlite3.Row], alternatives: dict[int, list[dict[str, Any]]]
+                     ) -> Iterator[tuple[int, str, str, str | None]]:
+        """Yield the `(site_id, kind, name, url)` entries stored in the name index."""
+        for row in rows:
+            yield row['id'], 'site', row['name'], row['url']
+            for alt in alternatives.get(row['id'], []):
+                yield row['id'], 'alternative', alt['name'], alt['url']
+
+    def get_name_index() -> NameIndex:
+        """Return the name index, reloading it from the database if it is stale."""
+        version = data_state['version']
+        if name_index.version != version:
+            rows, alternatives = load_site_payloads(get_read_db())
+            name_index.load(name_entries(rows, alternatives), version)
+        return name_index
+
+    def warm_up() -> None:
+        """Prepare this process for its first requests.
+
+        The domain and name indexes are built from a single read of the
+        catalogue, every template is compiled (and written to the bytecode
+        cache when `TEMPLATE_CACHE_DIR` is set), the filter data is
+        loaded, and the detail payloads of the newest sites, up to
+        `SITE_DETAIL_CACHE_SIZE`, are put in `site_detail_cache` from the
+        same read.  Processes forked from a preloaded application inherit
+        the warmed caches.  Everything here would otherwise be loaded on
+        first use.
+        """
+        version = data_state['version']
+        db = get_read_db()
+        rows, alternatives = load_site_payloads(db)
+        domain_index.load(domain_entries(rows, alternatives), version)
+        name_index.load(name_entries(rows, alternatives), version)
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+        get_filter_data()
+        size = app.config['SITE_DETAIL_CACHE_SIZE']
+        link_states = load_link_states(db) if size else {}
+        for row in rows[-size:] if size else ():
+            detail = {'site': dict(row), 'alternatives': alternatives.get(row['id'], [])}
+            detail['links'] = site_links(detail, link_states)
+            site_detail_cache.set(row['id'], detail, 0)
+
+    # Not before the schema has been upgraded (see `init_db`).
+    if schema_current:
+        with app.app_context():
+            # Changes logged from now on are not in the caches, whether
+            # they are filled below or on first use.
+            sync_state['generation'] = get_read_db().execute(
+                'SELECT COALESCE(MAX(generation), 0) FROM data_changes'
+            ).fetchone()[0]
+            # Warm up so that the first requests are fast, but only when the
+            # application is loaded to serve: the `flask` commands load it
+            # inside a click context and need none of these caches.
+            if app.config['WARMUP'] and click.get_current_context(silent=True) is None:
+                warm_up()
+
+    domain_set_state: dict[str, tuple[int, bytes, int, str]] = {}
+    domain_set_lock = threading.Lock()
+    domain_set_deltas = LRUCache(64)
+
+    def build_domain_set(db: sqlite3.Connection) -> tuple[bytes, int, str]:
+        """Write the domain-set artifact for the current `sites` table to disk.
+
+        Artifacts are content-addressed: the version is a digest of the
+        hash array, so an unchanged catalogue maps to the file already on
+        disk and nothing is rewritten.  The newest `DOMAIN_SET_KEEP` files
+        are kept to serve deltas from older versions.  Returns
+        `(version, width, path)`.
+        """
+        hosts = {normalize_host(row[0]) for row in db.execute('SELECT url FROM sites')}
+        hosts.discard('')
+        width = domain_set_width(len(hosts), app.config['DOMAIN_SET_FP_RATE'])
+        hashes = sorted({domain_hash(host, width) for host in hosts})
+        version = hashlib.sha256(bytes([width]) + b''.join(hashes)).digest()[:16]
+        directory = app.config['DOMAIN_SET_DIR']
+        path = os.path.join(directory, version.hex() + '.bin')
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as fh:
+                fh.write(encode_domain_set(hashes, width, version))
+            os.replace(tmp_path, path)
+            artifacts = sorted(
+                (entry for entry in os.scandir(directory) if entry.name.endswith('.bin')),
+                key=lambda entry: entry.stat().st_mtime, reverse=True
+            )
+            for entry in artifacts[app.config['DOMAIN_SET_KEEP']:]:
+                if entry.path != path:
+                    os.remove(entry.path)
+        return version, width, path
+
+    def get_domain_set() -> tuple[bytes, int, str]:
+        """Return the current artifact, regenerating it only after a data change."""
+        data_version = data_state['version']
+        with domain_set_lock:
+            entry = domain_set_state.get('current')
+            if entry is None or entry[0] != data_version or not os.path.exists(entry[3]):
+                entry = (data_version, *build_domain_set(get_read_db()))
+                domain_set_state['current'] = entry
+        return entry[1:]
+
+    @app.cli.group('domain-set')
+    def domain_set_cli() -> None:
+        """Manage the offline domain-set artifact served by /api/domain-set."""
+
+    @domain_set_cli.command('build')
+    def domain_set_build_command() -> None:
+        """Generate the artifact for the current catalogue (no-op if unchanged)."""
+        version, width, path = build_domain_set(get_db())
+        click.echo(f'{path}: version {version.hex()}, {width}-byte hashes, '
+                   f'{os.path.getsize(path)} bytes')
+
+    @app.cli.group('sites')
+    def sites_cli() -> None:
+        """Bulk import and export of the site catalogue."""
+
+    def read_site_records(stream, fmt: str) -> Iterator[dict[str, Any]]:
+        """Yield site records from a CSV, JSON (array) or NDJSON text stream.
+
+        All three formats are read incrementally (a JSON array through
+        `iter_json_array`).  In CSV files the optional `alternatives`
+        column holds the JSON list of alternatives; an empty cell leaves
+        the existing alternatives of the site untouched.
+        """
+        if fmt == 'csv':
+            for row in csv.DictReader(stream):
+                alternatives = (row.pop('alternatives', None) or '').strip()
+                if alternatives:
+                    row['alternatives'] = json.loads(alternatives)
+                yield row
+        elif fmt == 'json':
+            yield from iter_json_array(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+    @sites_cli.command('import')
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'json', 'ndjson']),
+                  help='Input format (default: from the file extension, else NDJSON).')
+    @click.option('--batch-size', default=1000, show_default=True, type=click.IntRange(1),
+                  help='Records per transaction.')
+    def sites_import_command(source, fmt: str | None, batch_size: int) -> None:
+        """Insert or update sites from SOURCE ('-' for stdin), matched on their normalised URL.
+
+        Records are read as a stream and written in transactions of
+        `--batch-size` records, so an interrupted import keeps the batches
+        already committed and can simply be run again.
+        """
+        if fmt is None:
+            extension = os.path.splitext(source.name)[1].lower().lstrip('.')
+            fmt = extension if extension in ('csv', 'json') else 'ndjson'
+        db = get_db()
+        inserted = updated = 0
+        started = time.perf_counter()
+        batch: list[dict[str, Any]] = []
+        records = read_site_records(source, fmt)
+        while True:
+            batch.clear()
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    break
+            if not batch:
+                break
+            with db:
+                db.execute('BEGIN IMMEDIATE')
+                batch_inserted, batch_updated, _ = upsert_sites(db, batch)
+            inserted += batch_inserted
+            updated += batch_updated
+        data_changed(db, None)
+        elapsed = time.perf_counter() - started
+        total = inserted + updated
+        click.echo(f'{inserted} sites added, {updated} updated in {elapsed:.2f}s '
+                   f'({total / elapsed if elapsed else 0:.0f} rows/s)')
+
+    @sites_cli.command('export')
+    @click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+    def sites_export_command(target) -> None:
+        """Write the catalogue as NDJSON to TARGET (default: stdout).
+
+        One line per site with the editable columns and its alternatives,
+        the format `flask sites import` reads back.  Sites and alternatives
+        are read from two cursors walked in `site_id` order and merged, so
+        memory use does not grow with the catalogue.
+        """
+        db = get_read_db()
+        alternatives = db.execute(
+            'SELECT site_id, alt_name, alt_url, alt_description FROM alternatives ORDER BY site_id, id'
+        )
+        pending = alternatives.fetchone()
+        for row in db.execute(f"SELECT id, {', '.join(SITE_COLUMNS)} FROM sites ORDER BY id"):
+            site_alternatives = []
+            while pending is not None and pending['site_id'] <= row['id']:
+                if pending['site_id'] == row['id']:
+                    site_alternatives.append({
+                        'name': pending['alt_name'],
+                        'url': pending['alt_url'],
+                        'description': pending['alt_description'],
+                    })
+                pending = alternatives.fetchone()
+            record = {column: row[column] for column in SITE_COLUMNS}
+            record['alternatives'] = site_alternatives
+            target.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def snapshot_build_key() -> str:
+        """Digest of the code, templates and static files the snapshot pages depend on.
+
+        A different key means every page may render differently, so the
+        next build is a full one.
+        """
+        digest = hashlib.sha256()
+        paths = [os.path.abspath(__file__)]
+        for folder in (os.path.join(app.root_path, app.template_folder), app.static_folder):
+            for root, _, files in os.walk(folder):
+                paths.extend(os.path.join(root, name) for name in files)
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, app.root_path).encode())
+            with open(path, 'rb') as fh:
+                digest.update(hashlib.sha256(fh.read()).digest())
+        return digest.hexdigest()
+
+    def snapshot_fingerprints(db: sqlite3.Connection) -> dict[str, str]:
+        """Return a digest of each site row, its alternatives and their link states, keyed by site ID."""
+        rows, alternatives = load_site_payloads(db)
+        link_states = load_link_states(db)
+        fingerprints = {}
+        for row in rows:
+            detail = {'site': row, 'alternatives': alternatives.get(row['id'], [])}
+            fingerprints[str(row['id'])] = hashlib.sha256(json.dumps(
+                [list(row), detail['alternatives'], site_links(detail, link_states)],
+                default=str, ensure_ascii=False
+            ).encode()).hexdigest()
+        return fingerprints
+
+    @app.cli.group('snapshot')
+    def snapshot_cli() -> None:
+        """Prebuild the public pages as static files."""
+
+    @snapshot_cli.command('build')
+    @click.argument('target', required=False, type=click.Path(file_okay=False))
+    @click.option('--jobs', default=os.cpu_count() or 1, show_default=True, type=click.IntRange(1),
+                  help='Rendering processes.')
+    @click.option('--full', is_flag=True, help='Re-render every page even if its rows did not change.')
+    def snapshot_build_command(target: str | None, jobs: int, full: bool) -> None:
+        """Render the home page, the listings and every site page into TARGET (default: SNAPSHOT_DIR).
+
+        Besides `index.html` and `static/`, the snapshot holds the first page
+        of `/sites` and of each category and country listing, and one page
+        per site (see `snapshot_file_name`), each with precompressed `.gz`
+        and, when the `brotli` module is installed, `.br` variants.
+
+        `snapshot.json` records a digest of every site row with its
+        alternatives.  The next build re-renders only the pages of the sites
+        whose digest changed and removes those of deleted sites.  The home
+        page and the listings show catalogue-wide counts, so they are
+        re-rendered whenever any row changed.  A change of the code,
+        templates or static files triggers a full build.  Pages are rendered
+        by a pool of `--jobs` forked processes.
+        """
+        target = target or app.config['SNAPSHOT_DIR']
+        manifest_path = os.path.join(target, 'snapshot.json')
+        started = time.perf_counter()
+        db = get_read_db()
+        build_key = snapshot_build_key()
+        fingerprints = snapshot_fingerprints(db)
+        previous: dict[str, Any] = {}
+        if not full and os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as fh:
+                previous = json.load(fh)
+            if previous.get('build_key') != build_key:
+                previous = {}
+        old_sites = previous.get('sites', {})
+        changed = [site_id for site_id, digest in fingerprints.items() if old_sites.get(site_id) != digest]
+        deleted = [site_id for site_id in old_sites if site_id not in fingerprints]
+        counts = get_filter_data()['facet_counts']
+        with app.test_request_context():
+            site_urls = [url_for('view_site', site_id=int(site_id)) for site_id in changed]
+            listing_urls = [url_for('index'), url_for('list_sites')]
+            listing_urls += [url_for('list_sites', category=value) for value in sorted(counts['category'])]
+            listing_urls += [url_for('list_sites', country=value) for value in sorted(counts['country'])]
+            deleted_urls = [url_for('view_site', site_id=int(site_id)) for site_id in deleted]
+        if previous and not changed and not deleted:
+            click.echo(f'{target}: up to date ({len(fingerprints)} sites)')
+            return
+        os.makedirs(target, exist_ok=True)
+        urls = listing_urls + site_urls
+        written = 0
+        for root, _, files in os.walk(app.static_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, 'rb') as fh:
+                    written += write_snapshot_file(
+                        target, os.path.join('static', os.path.relpath(path, app.static_folder)), fh.read()
+                    )
+        if jobs > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            # The workers inherit the application object, which cannot be
+            # pickled for a spawned process.
+            jobs = 1
+        if jobs == 1:
+            init_snapshot_worker(app, target)
+            results = [render_snapshot_pages(urls)]
+        else:
+            chunk_size = max(1, min(200, len(urls) // (jobs * 4)))
+            chunks = [urls[start:start + chunk_size] for start in range(0, len(urls), chunk_size)]
+            with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context('fork'),
+                                     initializer=init_snapshot_worker, initargs=(app, target)) as pool:
+                results = list(pool.map(render_snapshot_pages, chunks))
+        pages = sum(result[0] for result in results)
+        written += sum(result[1] for result in results)
+        listing_files = [snapshot_file_name(url) for url in listing_urls]
+        stale = set(previous.get('listings', ())) - set(listing_files)
+        for name in [snapshot_file_name(url) for url in deleted_urls] + sorted(stale):
+            remove_snapshot_file(target, name)
+        tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'build_key': build_key, 'sites': fingerprints, 'listings': listing_files}, fh)
+        os.replace(tmp_path, manifest_path)
+        elapsed = time.perf_counter() - started
+        click.echo(f'{target}: {pages} pages rendered ({len(site_urls)} sites), {len(deleted_urls) + len(stale)} '
+                   f'removed, {written} bytes written in {elapsed:.2f}s with {jobs} processes'
+                   + ('' if brotli is not None else ' (brotli not installed: no .br files)'))
+
+    @app.cli.group('links')
+    def links_cli() -> None:
+        """Check the health of the site and alternative links."""
+
+    @links_cli.command('check')
+    @click.option('--concurrency', type=click.IntRange(1),
+                  help='Simultaneous requests (default: LINK_CHECK_CONCURRENCY).')
+    @click.option('--per-host', type=click.IntRange(1),
+                  help='Simultaneous requests per host (default: LINK_CHECK_PER_HOST).')
+    @click.option('--timeout', type=click.FloatRange(0, min_open=True),
+                  help='Seconds allowed per request (default: LINK_CHECK_TIMEOUT).')
+    @click.option('--older-than', default=0.0, show_default=True, type=click.FloatRange(0),
+                  help='Only check links last checked more than this many hours ago.')
+    def links_check_command(concurrency: int | None, per_host: int | None, timeout: float | None,
+                            older_than: float) -> None:
+        """Probe every site and alternative URL and store the results in `link_checks`.
+
+        URLs are fetched concurrently by `check_links` and the results are
+        written as they arrive, in transactions of 500, so an interrupted
+        run keeps what it checked and `--older-than` lets the next one skip
+        it.  Sites whose link states changed are then published with
+        `data_changed`, which refreshes their pages in every worker, and
+        the rows of URLs no longer in the catalogue are deleted.
+        """
+        db = get_db()
+        urls = [row[0] for row in db.execute(
+            "SELECT url FROM sites WHERE url <> '' UNION SELECT alt_url FROM alternatives WHERE alt_url <> ''"
+        )]
+        previous = {row['url']: dict(row) for row in db.execute('SELECT * FROM link_checks')}
+        cutoff = time.time() - older_than * 3600
+        urls = [url for url in urls if url not in previous or previous[url]['checked_at'] <= cutoff]
+        states = {'ok': 0, 'gated': 0, 'blocked': 0, 'broken': 0}
+        changed: list[str] = []
+        started = time.perf_counter()
+
+        def save(batch: list[dict[str, Any]]) -> None:
+            with db:
+                db.executemany(
+                    '''INSERT OR REPLACE INTO link_checks
+                           (url, status, error, final_url, latency_ms, age_gate, etag, last_modified, checked_at)
+                       VALUES (:url, :status, :error, :final_url, :latency_ms, :age_gate, :etag,
+                               :last_modified, :checked_at)''',
+                    batch
+                )
+            batch.clear()
+
+        async def run() -> None:
+            batch: list[dict[str, Any]] = []
+            async for result in check_links(
+                urls, previous,
+                concurrency or app.config['LINK_CHECK_CONCURRENCY'],
+                per_host or app.config['LINK_CHECK_PER_HOST'],
+                timeout or app.config['LINK_CHECK_TIMEOUT'],
+                app.config['LINK_CHECK_MAX_BYTES'], app.config['LINK_CHECK_USER_AGENT'],
+            ):
+                state = describe_link(result['status'], result['error'], result['age_gate'])
+                states[state['state']] += 1
+                old = previous.get(result['url'])
+                if old is None or describe_link(old['status'], old['error'], old['age_gate']) != state:
+                    changed.append(result['url'])
+                batch.append(result)
+                if len(batch) >= 500:
+                    save(batch)
+            save(batch)
+
+        asyncio.run(run())
+        with db:
+            db.execute('''DELETE FROM link_checks WHERE url NOT IN
+                          (SELECT url FROM sites UNION SELECT alt_url FROM alternatives)''')
+        site_ids: set[int] = set()
+        for start in range(0, len(changed), 500):
+            chunk = changed[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            site_ids.update(row[0] for row in db.execute(
+                f'''SELECT id FROM sites WHERE url IN ({placeholders})
+                    UNION SELECT site_id FROM alternatives WHERE alt_url IN ({placeholders})''',
+                chunk + chunk
+            ))
+        if site_ids:
+            data_changed(db, sorted(site_ids))
+        elapsed = time.perf_counter() - started
+        click.echo(f'{len(urls)} links checked in {elapsed:.1f}s '
+                   f'({len(urls) / elapsed if elapsed else 0:.0f}/s): '
+                   + ', '.join(f'{count} {state}' for state, count in states.items())
+                   + f'; {len(site_ids)} sites updated')
+
     @app.context_processor
     def inject_filter_data():
         """Inject lists of filter values and a flag helper into the template context.
@@ -260,130 +3537,267 @@ def create_app(test_config: dict | None = None) -> Flask:
         - countries: list of unique country codes encountered in the
           database, plus a few common regions.  Display order is
           alphabetical.
+        - severity_levels: the `SEVERITY_LEVELS` table for the severity
+          filter.
+        - facet_counts: number of sites per value of each filter, keyed by
+          the filter parameter (`category`, `country`, `verification_type`,
+          `severity`).  `list_sites` overrides it with counts narrowed by
+          the active filters (see `get_facet_counts`).
         - flag_emoji: function mapping a country code string to one or
           more flag emojis.  Multiple country codes separated by commas
           will return all relevant flags.
-        """
-        db = get_db()
-        # Collect distinct categories from the DB for filters and forms
-        cat_rows = db.execute('SELECT DISTINCT category FROM sites').fetchall()
-        categories = sorted({row['category'] for row in cat_rows})
-        # Predefine common verification keywords used across the site entries
-        verification_types = [
-            'Pièce d’identité', 'Selfie', 'Selfie vidéo', 'Estimation faciale',
-            'Carte bancaire', 'Numéro de téléphone', 'Yoti', 'Persona',
-            'Veriff', 'FaceTec', 'Stripe', 'k‑iD', 'Pas d’ID requis'
-        ]
-        # Collect unique country codes from DB.  Split by commas and strip spaces.
-        country_set: set[str] = set()
-        for row in db.execute('SELECT country FROM sites').fetchall():
-            if row['country']:
-                for code in row['country'].split(','):
-                    country_set.add(code.strip())
-        # Add a few generic regions
-        country_set.update({'International', 'UE', 'EU'})
-        countries = sorted(country_set)
-
-        def flag_emoji(country_string: str) -> str:
-            """Return flag emoji(s) for a comma-separated country code string.
-
-            Supports ISO country codes like 'FR' (🇫🇷), 'UK' (🇬🇧),
-            'AU' (🇦🇺), 'US' (🇺🇸) as well as 'UE'/'EU' (🇪🇺).  If multiple
-            codes are provided they will be concatenated with spaces.
-            If a code is unknown, it returns an empty string for that code.
-            """
-            if not country_string:
-                return ''
-            mapping = {
-                'FR': '🇫🇷',
-                'UK': '🇬🇧',
-                'AU': '🇦🇺',
-                'US': '🇺🇸',
-                'EU': '🇪🇺',
-                'UE': '🇪🇺',
-                'UK, FR': '🇬🇧 🇫🇷',
-                'FR, UK': '🇫🇷 🇬🇧',
-                'International': '🌍'
-            }
-            # If the entire string matches a mapping, return it directly
-            if country_string in mapping:
-                return mapping[country_string]
-            # Otherwise parse each code individually
-            flags: list[str] = []
-            for code in country_string.split(','):
-                code = code.strip()
-                if code in mapping:
-                    flags.append(mapping[code])
-                else:
-                    # Build Unicode flag for 2-letter code if possible
-                    if len(code) == 2 and code.isalpha():
-                        # Convert letters to regional indicator symbols
-                        base = ord('🇦') - ord('A')
-                        flag_chars = ''.join(chr(base + ord(ch.upper())) for ch in code)
-                        flags.append(flag_chars)
-            return ' '.join(flags)
 
+        The lists are served from `get_filter_data()`, so rendering a page
+        costs no database query unless the catalogue changed since the
+        previous render.
+        """
+        profile = current_profile.get()
+        if profile is None:
+            filter_data = get_filter_data()
+        else:
+            started = time.perf_counter()
+            filter_data = get_filter_data()
+            profile.add('context', time.perf_counter() - started)
         return dict(
-            categories=categories,
-            verification_types=verification_types,
-            countries=countries,
+            categories=filter_data['categories'],
+            verification_types=VERIFICATION_TYPES,
+            countries=filter_data['countries'],
+            severity_levels=SEVERITY_LEVELS,
+            facet_counts=filter_data['facet_counts'],
             flag_emoji=flag_emoji,
         )
 
-    def compute_severity(site_row: sqlite3.Row) -> tuple[str, str]:
-        """Compute a severity label and a corresponding CSS class based on site data.
+    page_cache = LRUCache(app.config['PAGE_CACHE_SIZE'], app.config['PAGE_CACHE_TTL'])
 
-        Severity levels:
-            - low (green): optional verification, not restricted to a single country
-            - medium (yellow): verification planned or experimental, or
-              mandatory but limited to certain content types
-            - high (orange): mandatory verification or geo‑blocking in specific regions
-            - very-high (red): strict mandatory verification combined with blocking
+    def cached_page(view_func):
+        """Decorator caching the rendered response of a public page.
 
-        The function returns a tuple (label, css_class).
+        Responses are keyed by endpoint, URL parameters and the normalised
+        query string, and tagged with the data version they were rendered
+        from, so a bump of the version (approval or deletion of a
+        suggestion) invalidates every cached page at once.  Each response
+        carries a strong ETag and a Last-Modified date; a conditional GET
+        matching the cached entry is answered with 304 without touching the
+        database or the templates.
+
+        Pages that depend on the visitor's session (a logged-in admin sees
+        extra navigation links, pending flash messages are rendered once)
+        and streamed responses bypass the cache.
         """
-        status = (site_row['status'] or '').lower()
-        country = (site_row['country'] or '').lower()
-        # Default values
-        label = 'Moyen'
-        css_class = 'severity-medium'
-        # Determine if verification is optional (facultatif) or required (obligatoire)
-        is_optional = any(word in status for word in ['facultatif', 'facultative', 'optionnel', 'optionnelle', 'optionnelle', 'optionnelle'])
-        is_mandatory = any(word in status for word in ['obligatoire', 'requise', 'vérification requise', 'mandatory', 'requis'])
-        is_blocked = any(word in status for word in ['bloqué', 'blocage', 'non accessible', 'blocage complet'])
-        # Determine if the country list implies global or local scope
-        # Consider multiple codes or explicit 'international' as global
-        country_codes = [c.strip() for c in country.split(',') if c.strip()]
-        is_global = False
-        if not country_codes or any(code in ['international', 'global', 'monde'] for code in country_codes):
-            is_global = True
-        elif len(country_codes) > 1:
-            is_global = True
-        # Compute severity according to rules
-        if is_blocked:
-            label = 'Très élevé'
-            css_class = 'severity-very-high'
-        elif is_mandatory:
-            # Mandatory verification.  If it applies globally or multiple regions, severity very high
-            if is_global:
-                label = 'Très élevé'
-                css_class = 'severity-very-high'
+        from functools import wraps
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            if (not app.config['PAGE_CACHE_SIZE'] or request.method != 'GET'
+                    or session.get('logged_in') or '_flashes' in session):
+                return view_func(*args, **kwargs)
+            key = (request.endpoint, tuple(sorted(kwargs.items())), normalize_args(request.args))
+            version = data_state['version']
+            entry = page_cache.get(key, version)
+            if entry is None:
+                response = app.make_response(view_func(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = (body, response.mimetype, hashlib.blake2b(body, digest_size=16).hexdigest())
+                page_cache.set(key, entry, version)
+            body, mimetype, etag = entry
+            response = app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.last_modified = data_state['modified_at']
+            # Browsers and proxies may store the page but must revalidate it,
+            # which the ETag makes cheap.
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+
+    if app.config['RATE_LIMIT_BACKEND'] == 'sqlite':
+        rate_limiter = SQLiteRateLimiter(app.config['RATE_LIMIT_DATABASE'])
+    else:
+        rate_limiter = MemoryRateLimiter()
+
+    def rate_limited(limit_name: str):
+        """Decorator throttling POST requests to a view per client IP address.
+
+        `limit_name` selects the `RATE_LIMIT_<NAME>` setting.  Each client
+        and route has its own token bucket in `rate_limiter`; an empty
+        bucket is answered with 429 and a Retry-After header before the
+        view runs, so throttled requests cost no database access and no
+        template rendering.
+        """
+        from functools import wraps
+        limit = parse_rate_limit(app.config[f'RATE_LIMIT_{limit_name.upper()}'])
+
+        def decorator(view_func):
+            if limit is None:
+                return view_func
+
+            @wraps(view_func)
+            def wrapper(*args, **kwargs):
+                if request.method == 'POST':
+                    wait = rate_limiter.consume(f'{limit_name}:{request.remote_addr}', *limit)
+                    if wait:
+                        return app.response_class(
+                            'Trop de tentatives, veuillez réessayer plus tard.\n', 429,
+                            mimetype='text/plain', headers={'Retry-After': str(math.ceil(wait))}
+                        )
+                return view_func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Response compression (COMPRESSION=1)
+
+    compressed_cache = LRUCache(app.config['PAGE_CACHE_SIZE'])
+
+    if app.config['COMPRESSION']:
+        @app.after_request
+        def compress_response(response):
+            """Compress HTML, JSON and text responses with brotli or gzip.
+
+            Brotli is preferred when the client accepts it and the `brotli`
+            module is installed.  Bodies under `COMPRESSION_MIN_SIZE` are
+            sent as they are, since the headers would outweigh the gain, as
+            are file responses (static files and domain-set artifacts are
+            left to the web server, or precompressed by `flask snapshot
+            build`).  Streamed responses are compressed chunk by chunk.
+            The compressed bodies of pages served by `cached_page` are kept
+            in `compressed_cache` under their ETag, which is weakened since
+            the bytes on the wire differ from the ones it was computed
+            from; weak ETags still validate conditional requests.
+            """
+            if (response.status_code < 200 or response.status_code in (204, 304)
+                    or response.direct_passthrough or 'Content-Encoding' in response.headers
+                    or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+                return response
+            response.vary.add('Accept-Encoding')
+            accepted = request.accept_encodings
+            if brotli is not None and accepted['br']:
+                encoding = 'br'
+            elif accepted['gzip']:
+                encoding = 'gzip'
             else:
-                label = 'Élevé'
-                css_class = 'severity-high'
-        elif is_optional:
-            # Optional verification.  If global scope, severity low; if localized, medium
-            if is_global:
-                label = 'Faible'
-                css_class = 'severity-low'
+                return response
+            level = app.config['COMPRESSION_LEVEL']
+            quality = app.config['COMPRESSION_BROTLI_QUALITY']
+            if response.is_streamed:
+                response.response = compress_chunks(response.response, encoding, level, quality)
+                response.headers.pop('Content-Length', None)
             else:
-                label = 'Moyen'
-                css_class = 'severity-medium'
-        else:
-            # Unknown or planned/experimental status; treat as medium
-            label = 'Moyen'
-            css_class = 'severity-medium'
-        return label, css_class
+                if response.content_length is not None and response.content_length < app.config['COMPRESSION_MIN_SIZE']:
+                    return response
+                etag, weak = response.get_etag()
+                body = compressed_cache.get((etag, encoding), 0) if etag and not weak else None
+                if body is None:
+                    data = response.get_data()
+                    if len(data) < app.config['COMPRESSION_MIN_SIZE']:
+                        return response
+                    body = compress_body(data, encoding, level, quality)
+                    if etag and not weak:
+                        compressed_cache.set((etag, encoding), body, 0)
+                response.set_data(body)
+                if etag:
+                    response.set_etag(etag, weak=True)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+    # ------------------------------------------------------------------
+    # Opt-in instrumentation (PROFILING=1)
+    #
+    # Each request gets a `RequestProfile` collecting the time spent
+    # acquiring connections (`db`), running SQL (per statement, through
+    # `ProfiledConnection`), building the template context (`context`) and
+    # rendering templates (`render`).  The timings are returned in a
+    # Server-Timing header and aggregated in `/metrics`.  When profiling is
+    # off none of these hooks is registered and connections are plain
+    # `sqlite3.Connection`s; the remaining cost is one context variable
+    # lookup per connection acquisition and per rendered page.
+
+    if app.config['PROFILING']:
+        metrics = MetricsRegistry()
+
+        def server_timing_desc(text: str) -> str:
+            text = text.encode('ascii', 'replace').decode('ascii')
+            return text.replace('\\', '\\\\').replace('"', '\\"')
+
+        @app.before_request
+        def start_profile() -> None:
+            g.profile_token = current_profile.set(RequestProfile())
+
+        def profile_stream(chunks: Iterable[Any], profile: RequestProfile) -> Iterator[Any]:
+            """Yield `chunks` with `profile` as the current profile.
+
+            The request has been torn down (and `current_profile` reset) by
+            the time a streamed body is generated, so the statements and
+            rendering it runs would otherwise go unrecorded.
+            """
+            token = current_profile.set(profile)
+            try:
+                yield from chunks
+            finally:
+                try:
+                    current_profile.reset(token)
+                except ValueError:
+                    # Closed from another context (by the garbage collector).
+                    pass
+
+        @app.after_request
+        def finish_profile(response):
+            """Report the profile in Server-Timing and record it in the metrics.
+
+            A streamed body is generated after this hook, once the headers
+            are sent: its Server-Timing header only covers the work done
+            before the first byte (and says so), and the request is
+            recorded in the metrics when the response is closed, with the
+            SQL and rendering time of the whole body.
+            """
+            profile = current_profile.get()
+            if profile is None:
+                return response
+            elapsed = time.perf_counter() - profile.started
+            timings = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in profile.phases.items()]
+            statements = profile.statements
+            timings.append(f'sql;dur={sum(st[1] for st in statements) * 1000:.2f};desc="queries: {len(statements)}"')
+            slowest = sorted(statements, key=lambda st: st[1], reverse=True)[:app.config['PROFILING_SQL_DETAILS']]
+            for i, (fingerprint, seconds, rows) in enumerate(slowest, start=1):
+                timings.append(f'sql-{i};dur={seconds * 1000:.2f};'
+                               f'desc="{server_timing_desc(fingerprint[:120])} ({rows} rows)"')
+            timings.append(f'total;dur={elapsed * 1000:.2f}')
+            route, method = request.endpoint or 'unmatched', request.method
+            if response.is_streamed:
+                timings.append('streamed;desc="partial: the body is not included"')
+                response.response = profile_stream(response.response, profile)
+                response.call_on_close(
+                    lambda: metrics.observe(route, method, time.perf_counter() - profile.started, profile)
+                )
+            else:
+                metrics.observe(route, method, elapsed, profile)
+            response.headers['Server-Timing'] = ', '.join(timings)
+            return response
+
+        @app.teardown_request
+        def end_profile(exception: BaseException | None) -> None:
+            token = g.pop('profile_token', None)
+            if token is not None:
+                current_profile.reset(token)
+
+        def template_started(sender, template, context, **extra) -> None:
+            profile = current_profile.get()
+            if profile is not None:
+                profile.render_started = time.perf_counter()
+
+        def template_finished(sender, template, context, **extra) -> None:
+            profile = current_profile.get()
+            if profile is not None and profile.render_started:
+                profile.add('render', time.perf_counter() - profile.render_started)
+                profile.render_started = 0.0
+
+        before_render_template.connect(template_started, app, weak=False)
+        template_rendered.connect(template_finished, app, weak=False)
+
+        @app.route('/metrics')
+        def metrics_endpoint():
+            """Expose the request and SQL metrics of this process in the Prometheus text format."""
+            return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
 
     # ------------------------------------------------------------------
     # Routes
@@ -393,22 +3807,23 @@ def create_app(test_config: dict | None = None) -> Flask:
     # defined in the templates/ directory.
 
     @app.route('/')
+    @cached_page
     def index() -> str:
         """Render the home page with search and category overview.
 
         The home page provides a high‑level introduction and an entry point
         to search the database.  It also displays a list of recently added
-        sites and the list of unique categories present in the database.
+        sites and the list of unique categories present in the database;
+        the latter comes from the context processor (`get_filter_data`),
+        so the page needs no query of its own for it.
         """
-        db = get_db()
-        # Retrieve categories for the filter list.  DISTINCT ensures each
-        # category appears only once.
-        categories = [row['category'] for row in db.execute('SELECT DISTINCT category FROM sites ORDER BY category')]
+        db = get_read_db()
         # Retrieve the five most recent sites by descending id (i.e. order of insertion)
         recent_sites = db.execute('SELECT * FROM sites ORDER BY id DESC LIMIT 5').fetchall()
-        return render_template('index.html', categories=categories, recent_sites=recent_sites)
+        return render_template('index.html', recent_sites=recent_sites)
 
     @app.route('/sites')
+    @cached_page
     def list_sites() -> str:
         """Display all sites with optional multi‑filtering and search.
 
@@ -416,107 +3831,94 @@ def create_app(test_config: dict | None = None) -> Flask:
 
         - `category`: one or more categories selected via a multi‑select.
         - `verification_type`: one or more verification keywords (e.g. "Pièce d’identité",
-          "Selfie").  The filter matches rows whose `verification_type` contains
-          any of the selected keywords.
-        - `country`: one or more country codes; matches rows where the `country`
-          field contains any selected code.
-        - `q`: free‑text search term applied across several columns (name,
-          description, verification_type, context, country, sources).
+          "Selfie").  The filter matches rows whose `verification_type` mentions
+          any of the selected keywords (see `site_verification_methods`).
+        - `country`: one or more country codes; matches rows listing any of
+          the selected codes exactly (see `site_countries`).
+        - `q`: free‑text search term looked up in the `sites_fts` full-text
+          index (name, description, verification_type, context, country,
+          sources).  Matching is case- and accent-insensitive.
+        - `severity`: one or more severity levels (`low`, `medium`, `high`,
+          `very-high`), matched against the indexed `severity_rank` column.
+        - `sort`: `severity` to list the most intrusive sites first.
+        - `after` / `before`: pagination cursors taken from the "next" and
+          "previous" links; `per_page` overrides the configured page size.
 
-        The resulting rows are ordered alphabetically by name and enhanced with
-        a computed severity label and CSS class.  These values are used in
-        the template to display coloured severity indicators.
+        The resulting rows are ordered alphabetically by name, or by BM25
+        relevance when a search term is given, and split into pages with
+        keyset pagination (see `paginate_query`).  Each row carries its
+        stored severity label and CSS class, used in the template to
+        display coloured severity indicators.  The filter drop-downs show
+        the number of sites each value yields given the other active filters
+        (see `get_facet_counts`).  When `SITES_STREAMING` is
+        enabled the page is rendered with `stream_template`.
         """
-        db = get_db()
-        # Parse multi‑select parameters.  Flask returns a list for each key if
-        # multiple values are provided.
-        categories = request.args.getlist('category')
-        verifs = request.args.getlist('verification_type')
-        countries = request.args.getlist('country')
-        query = request.args.get('q')
-
-        sql = 'SELECT * FROM sites'
-        params: list[str] = []
-        conditions: list[str] = []
-        # Filter by categories (exact match)
-        if categories:
-            placeholders = ','.join('?' * len(categories))
-            conditions.append(f'category IN ({placeholders})')
-            params.extend(categories)
-        # Filter by verification keywords: match if any keyword appears in
-        # verification_type column.  We construct OR conditions.
-        if verifs:
-            like_conditions = []
-            for keyword in verifs:
-                like_conditions.append('verification_type LIKE ?')
-                params.append(f'%{keyword}%')
-            conditions.append('(' + ' OR '.join(like_conditions) + ')')
-        # Filter by countries: match if any selected code appears in the
-        # country column (which may contain comma‑separated values).
-        if countries:
-            country_conditions = []
-            for code in countries:
-                country_conditions.append('country LIKE ?')
-                params.append(f'%{code}%')
-            conditions.append('(' + ' OR '.join(country_conditions) + ')')
-        # Free text search
-        if query:
-            conditions.append('(' + ' OR '.join([
-                'name LIKE ?', 'description LIKE ?', 'verification_type LIKE ?',
-                'context LIKE ?', 'country LIKE ?', 'sources LIKE ?'
-            ]) + ')')
-            like_expr = f'%{query}%'
-            params.extend([like_expr] * 6)
-        if conditions:
-            sql += ' WHERE ' + ' AND '.join(conditions)
-        sql += ' ORDER BY name'
-        rows = db.execute(sql, params).fetchall()
-        # Compute severity for each row and convert to dict for easier use in Jinja
-        sites = []
-        for row in rows:
-            label, css_class = compute_severity(row)
-            # Convert row to dict and attach severity fields
-            d = dict(row)
-            d['severity_label'] = label
-            d['severity_class'] = css_class
-            sites.append(d)
-        # Selected filters for template to persist selections
-        selected = {
-            'category': categories,
-            'verification_type': verifs,
-            'country': countries
-        }
-        return render_template('site_list.html', sites=sites, selected=selected, query=query)
+        sql, params, sort_keys = build_site_query(request.args)
+        streaming = app.config['SITES_STREAMING']
+        page_size = app.config['SITES_STREAM_PAGE_SIZE' if streaming else 'SITES_PAGE_SIZE']
+        per_page = request.args.get('per_page', type=int)
+        if per_page:
+            page_size = max(1, min(per_page, app.config['SITES_MAX_PAGE_SIZE']))
+        # A streamed response is still being generated after the request
+        # context has been torn down (releasing `g.read_db`), so it holds a
+        # pooled connection of its own until the response is closed.
+        db = read_pool.acquire() if streaming else get_read_db()
+        try:
+            page = paginate_query(db, sql, params, sort_keys, page_size,
+                                  after=request.args.get('after'), before=request.args.get('before'))
+            # Selected filters for template to persist selections, and the
+            # arguments carried over by the pagination links.
+            selected = {
+                'category': request.args.getlist('category'),
+                'verification_type': request.args.getlist('verification_type'),
+                'country': request.args.getlist('country'),
+                'severity': request.args.getlist('severity'),
+            }
+            page_args = {key: values for key, values in request.args.lists() if key not in ('after', 'before')}
+            context = dict(selected=selected, query=request.args.get('q'), sort=request.args.get('sort'),
+                           page=page, page_args=page_args, facet_counts=get_facet_counts(db, request.args))
+            if streaming:
+                # Rows are pulled from the SQLite cursor while the template is
+                # being sent, so the first results arrive before the query has
+                # been fully read.  The connection goes back to the pool when
+                # the server closes the response, even if the body was never
+                # iterated.
+                response = app.response_class(stream_template('site_list.html', sites=page, **context))
+                response.call_on_close(lambda: read_pool.release(db))
+                return response
+        except BaseException:
+            if streaming:
+                read_pool.release(db)
+            raise
+        return render_template('site_list.html', sites=list(page), **context)
 
     @app.route('/site/<int:site_id>')
+    @cached_page
     def view_site(site_id: int) -> str:
         """Display details of a single site along with its alternatives.
 
-        A single site is looked up by primary key.  If no site is found
-        matching the given ID we abort with a 404.  Alternatives are
-        fetched via a simple join on the `alternatives` table.
+        The site and its alternatives come from `get_site_detail`.  If no
+        site is found matching the given ID we abort with a 404.
         """
-        db = get_db()
-        site_row = db.execute('SELECT * FROM sites WHERE id=?', (site_id,)).fetchone()
-        if site_row is None:
+        detail = get_site_detail(site_id)
+        if detail is None:
             return render_template('404.html'), 404
-        # Compute severity for this site to display indicator on detail page
-        severity_label, severity_class = compute_severity(site_row)
-        # Convert to dict and attach severity
-        site = dict(site_row)
-        site['severity_label'] = severity_label
-        site['severity_class'] = severity_class
-        alternatives = db.execute('SELECT * FROM alternatives WHERE site_id=?', (site_id,)).fetchall()
-        return render_template('site_detail.html', site=site, alternatives=alternatives)
+        return render_template('site_detail.html', site=detail['site'], alternatives=detail['alternatives'],
+                               links=detail['links'])
 
     @app.route('/suggest', methods=['GET', 'POST'])
+    @rate_limited('suggest')
     def suggest() -> str:
         """Handle the form allowing visitors to suggest new entries.
 
         On GET requests the form is rendered.  On POST the submitted data
         are validated for minimal completeness and stored into the
-        `suggestions` table as JSON for the alternatives.  The admin can
-        later review and publish these suggestions.
+        `suggestions` table as JSON for the alternatives (see
+        `record_suggestions`).  The admin can later review and publish
+        these suggestions.  With `SUGGEST_QUEUE` the suggestion is handed
+        to `suggestion_queue` instead and the visitor is answered at once;
+        when the queue is full the form is returned with 503 and a
+        Retry-After header.
         """
         if request.method == 'POST':
             # Retrieve basic fields from the form.  We normalise whitespace to
@@ -546,31 +3948,249 @@ def create_app(test_config: dict | None = None) -> Flask:
             # At least one category is required, as well as name and URL.
             if not (name and url and category_list):
                 flash('Veuillez remplir les champs obligatoires (nom, url, catégorie).', 'error')
+            elif not is_site_url(url):
+                flash('Veuillez indiquer une adresse de site valide (par exemple https://exemple.fr).', 'error')
             else:
-                db = get_db()
-                import json
                 # Join selected values with commas for storage.  The admin and
                 # list views split these strings back into separate tokens.
-                category = ', '.join(category_list)
-                verification_type = ', '.join(verification_list)
-                country = ', '.join(country_list)
-                db.execute(
-                    '''INSERT INTO suggestions (name, url, category, verification_type, country, description, alternatives_json)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                    (name, url, category, verification_type, country, description, json.dumps(alternatives_list))
-                )
-                db.commit()
-                flash('Merci pour votre suggestion ! Elle sera revue par un administrateur.', 'success')
+                suggestion = {
+                    'name': name,
+                    'url': url,
+                    'category': ', '.join(category_list),
+                    'verification_type': ', '.join(verification_list),
+                    'country': ', '.join(country_list),
+                    'description': description,
+                    'alternatives_json': json.dumps(alternatives_list),
+                }
+                if app.config['SUGGEST_QUEUE']:
+                    # Duplicates are detected later, by the writer thread.
+                    if not suggestion_queue.submit(suggestion):
+                        flash('Trop de suggestions en cours de traitement, veuillez réessayer dans quelques instants.', 'error')
+                        response = make_response(render_template('suggest.html'), 503)
+                        response.headers['Retry-After'] = str(app.config['SUGGEST_RETRY_AFTER'])
+                        return response
+                    outcome = 'created'
+                else:
+                    [(outcome, _)] = record_suggestions(get_db(), [suggestion])
+                if outcome == 'listed':
+                    flash('Ce site est déjà référencé dans le catalogue, merci !', 'success')
+                elif outcome == 'merged':
+                    flash('Merci ! Ce site a déjà été suggéré : votre signalement a été ajouté à la suggestion en attente.', 'success')
+                else:
+                    flash('Merci pour votre suggestion ! Elle sera revue par un administrateur.', 'success')
                 return redirect(url_for('index'))
         # Render the suggestion form with available filter values for the drop‑downs.
         return render_template('suggest.html')
 
+    # ------------------- JSON API --------------------------------------
+    # Read-only JSON endpoints for the browser extension and partner
+    # integrations.  They share the filtering and keyset pagination of
+    # `list_sites` and go through the same page cache.
+
+    def parse_api_fields() -> list[str]:
+        """Return the fields requested with `?fields=`, or all of them.
+
+        Raises ValueError naming the first unknown field.
+        """
+        raw = request.args.get('fields')
+        if not raw:
+            return list(API_FIELDS)
+        fields = [field.strip() for field in raw.split(',') if field.strip()]
+        for field in fields:
+            if field not in API_FIELDS:
+                raise ValueError(field)
+        return fields
+
+    def serialize_sites(db: sqlite3.Connection, rows: Iterable[sqlite3.Row],
+                        fields: list[str]) -> list[dict[str, Any]]:
+        """Project site rows onto `fields`, attaching alternatives if requested.
+
+        The alternatives of all rows are fetched with a single `IN (...)`
+        query and grouped by site, rather than one query per site.
+        """
+        rows = list(rows)
+        columns = [field for field in fields if field != 'alternatives']
+        sites = [{column: row[column] for column in columns} for row in rows]
+        if 'alternatives' in fields:
+            by_site: dict[int, list[dict[str, Any]]] = {row['id']: [] for row in rows}
+            if by_site:
+                placeholders = ','.join('?' * len(by_site))
+                for alt in db.execute(
+                    f'''SELECT site_id, alt_name, alt_url, alt_description FROM alternatives
+                       WHERE site_id IN ({placeholders}) ORDER BY id''',
+                    list(by_site)
+                ):
+                    by_site[alt['site_id']].append({
+                        'name': alt['alt_name'],
+                        'url': alt['alt_url'],
+                        'description': alt['alt_description'],
+                    })
+            for site, row in zip(sites, rows):
+                site['alternatives'] = by_site[row['id']]
+        return sites
+
+    @app.route('/api/sites')
+    @cached_page
+    def api_list_sites():
+        """Return sites as JSON.
+
+        Accepts the same filters as `list_sites` plus:
+
+        - `fields`: comma-separated list of fields to return (see
+          `API_FIELDS`); `alternatives` embeds the alternatives of each site.
+        - `ids`: comma-separated site IDs for a batch lookup.  Filters and
+          pagination are ignored and sites are returned in the order given;
+          unknown IDs are skipped.
+        - `after` / `before` / `per_page`: keyset pagination, as on `/sites`.
+          The response carries `next` and `prev` cursors (or null).
+        """
+        try:
+            fields = parse_api_fields()
+        except ValueError as exc:
+            return jsonify(error=f'unknown field: {exc}'), 400
+        db = get_read_db()
+        max_page_size = app.config['SITES_MAX_PAGE_SIZE']
+        if 'ids' in request.args:
+            try:
+                ids = list(dict.fromkeys(int(part) for part in request.args['ids'].split(',') if part.strip()))
+            except ValueError:
+                return jsonify(error='ids must be a comma-separated list of integers'), 400
+            if len(ids) > max_page_size:
+                return jsonify(error=f'at most {max_page_size} ids per request'), 400
+            rows: list[sqlite3.Row] = []
+            if ids:
+                placeholders = ','.join('?' * len(ids))
+                by_id = {row['id']: row for row in db.execute(
+                    f'SELECT * FROM sites WHERE id IN ({placeholders})', ids
+                )}
+                rows = [by_id[site_id] for site_id in ids if site_id in by_id]
+            return jsonify(sites=serialize_sites(db, rows, fields))
+        sql, params, sort_keys = build_site_query(request.args)
+        page_size = app.config['SITES_PAGE_SIZE']
+        per_page = request.args.get('per_page', type=int)
+        if per_page:
+            page_size = max(1, min(per_page, max_page_size))
+        page = paginate_query(db, sql, params, sort_keys, page_size,
+                              after=request.args.get('after'), before=request.args.get('before'))
+        sites = serialize_sites(db, page, fields)
+        return jsonify(sites=sites, next=page.next_cursor, prev=page.prev_cursor)
+
+    @app.route('/api/sites/<int:site_id>')
+    @cached_page
+    def api_view_site(site_id: int):
+        """Return a single site as JSON; supports `fields` like `api_list_sites`."""
+        try:
+            fields = parse_api_fields()
+        except ValueError as exc:
+            return jsonify(error=f'unknown field: {exc}'), 400
+        detail = get_site_detail(site_id)
+        if detail is None:
+            return jsonify(error='site not found'), 404
+        site = {field: detail['site'][field] for field in fields if field != 'alternatives'}
+        if 'alternatives' in fields:
+            site['alternatives'] = detail['alternatives']
+        return jsonify(site)
+
+    @app.route('/api/lookup', methods=['GET', 'POST'])
+    def api_lookup():
+        """Tell whether visited hosts belong to listed sites, with their alternatives.
+
+        `GET /api/lookup?host=www.reddit.com` returns `{host, sites}` for one
+        host.  Several `host` parameters, or a `POST` with a JSON body
+        `{"hosts": [...]}`, return `{results: {host: sites}}` for up to
+        `LOOKUP_MAX_HOSTS` hosts.  Hosts may be given as bare names or full
+        URLs; `www.` and any subdomain of a listed site match it.  Answers
+        come from the in-memory `DomainIndex` without a database query
+        (unless the index must first be reloaded after a data change).
+        """
+        if request.method == 'POST':
+            payload = request.get_json(silent=True) or {}
+            hosts = payload.get('hosts') if isinstance(payload, dict) else None
+            if not isinstance(hosts, list) or not all(isinstance(host, str) for host in hosts):
+                return jsonify(error='expected a JSON body {"hosts": [...]}'), 400
+        else:
+            hosts = request.args.getlist('host')
+            if not hosts:
+                return jsonify(error='missing host parameter'), 400
+        if len(hosts) > app.config['LOOKUP_MAX_HOSTS']:
+            return jsonify(error=f"at most {app.config['LOOKUP_MAX_HOSTS']} hosts per request"), 400
+        index = get_domain_index()
+        results = {host: index.lookup(normalize_host(host)) for host in hosts}
+        if request.method == 'GET' and len(hosts) == 1:
+            return jsonify(host=hosts[0], sites=results[hosts[0]])
+        return jsonify(results=results)
+
+    @app.route('/api/suggest')
+    def api_suggest():
+        """Autocomplete site and alternative names for the search box.
+
+        `GET /api/suggest?prefix=redit` returns `{prefix, results}` with up
+        to `limit` (10, at most 50) `{type, name, url}` entries, `type`
+        being `site` (with its `id`) or `alternative`.  Names starting with
+        the prefix, or with any of its words, come first, followed by names
+        within one or two typing errors (see `NameIndex.search`).  Answers
+        come from the in-memory `NameIndex`, never from SQLite (unless the
+        index must first be reloaded after a bulk change).
+        """
+        prefix = request.args.get('prefix', '')
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        return jsonify(prefix=prefix, results=get_name_index().search(prefix, limit))
+
+    @app.route('/api/domain-set')
+    def api_domain_set():
+        """Serve every listed domain as a compact binary set for offline matching.
+
+        The body is a sorted array of truncated SHA-256 hashes of the
+        normalised hosts (see `encode_domain_set`), sized for the
+        `DOMAIN_SET_FP_RATE` false-positive rate, so clients can check the
+        sites they visit locally without revealing their browsing history.
+        The version is returned in the ETag and the `X-Domain-Set-Version`
+        header.  Clients that already hold a version pass it as `?since=`
+        and receive 304 Not Modified when it is the current one, a delta
+        (see `encode_domain_set_delta`) when that version is still on disk
+        and uses the same hash width, or the full set otherwise;
+        `X-Domain-Set-Kind` says which.
+        """
+        version, width, path = get_domain_set()
+        since = request.args.get('since', '')
+        if since == version.hex():
+            response = app.response_class(status=304)
+            response.set_etag(version.hex())
+            response.headers['X-Domain-Set-Version'] = version.hex()
+            return response
+        base_path = os.path.join(app.config['DOMAIN_SET_DIR'], since + '.bin')
+        if re.fullmatch(r'[0-9a-f]{32}', since) and os.path.exists(base_path):
+            key = (since, version.hex())
+            body = domain_set_deltas.get(key, 0)
+            if body is None:
+                with open(base_path, 'rb') as fh:
+                    base_width, base_version, base_hashes = decode_domain_set(fh.read())
+                if base_width == width:
+                    with open(path, 'rb') as fh:
+                        _width, _version, hashes = decode_domain_set(fh.read())
+                    old, new = set(base_hashes), set(hashes)
+                    body = encode_domain_set_delta(sorted(new - old), sorted(old - new), width,
+                                                   base_version, version)
+                    domain_set_deltas.set(key, body, 0)
+            if body is not None:
+                response = app.response_class(body, mimetype='application/octet-stream')
+                response.set_etag(f'{since}-{version.hex()}')
+                response.headers['X-Domain-Set-Kind'] = 'delta'
+                response.headers['X-Domain-Set-Version'] = version.hex()
+                return response.make_conditional(request)
+        response = send_file(path, mimetype='application/octet-stream', etag=False, conditional=False)
+        response.set_etag(version.hex())
+        response.headers['X-Domain-Set-Kind'] = 'full'
+        response.headers['X-Domain-Set-Version'] = version.hex()
+        return response.make_conditional(request)
+
     # ------------------- Admin routes ------------------------------------
     # A very simple authentication mechanism protects the admin area.
     # In a real application you should implement proper password hashing
     # and avoid storing credentials in plain text.
 
     @app.route('/login', methods=['GET', 'POST'])
+    @rate_limited('login')
     def login() -> str:
         """Render and process the login form for the administrator.
 
@@ -607,52 +4227,164 @@ def create_app(test_config: dict | None = None) -> Flask:
     @app.route('/admin')
     @login_required
     def admin_dashboard() -> str:
-        """Display pending suggestions for the administrator to review."""
+        """Display one page of pending suggestions for the administrator to review.
+
+        The queue is keyset-paginated, newest first, like `/sites` (see
+        `paginate_query`), with `ADMIN_PAGE_SIZE` suggestions per page.
+        """
         db = get_db()
-        suggestions = db.execute('SELECT * FROM suggestions ORDER BY submitted_at DESC').fetchall()
-        return render_template('admin.html', suggestions=suggestions)
+        page = paginate_query(
+            # The cursor carries the raw text timestamp: the column itself is
+            # converted to a datetime by the connection's PARSE_DECLTYPES.
+            db, 'SELECT *, CAST(submitted_at AS TEXT) AS submitted_key FROM suggestions WHERE 1', [],
+            [('submitted_at', 'submitted_key', True), ('id', 'id', True)],
+            app.config['ADMIN_PAGE_SIZE'],
+            after=request.args.get('after'), before=request.args.get('before'),
+        )
+        pending = db.execute('SELECT COUNT(*) FROM suggestions').fetchone()[0]
+        return render_template('admin.html', suggestions=list(page), page=page, pending=pending)
+
+    def moderate_suggestions(db: sqlite3.Connection, suggestion_ids: Sequence[int],
+                             approve: bool) -> list[dict[str, Any]]:
+        """Approve or reject suggestions in one transaction and publish the change.
+
+        The transaction starts with `BEGIN IMMEDIATE`, before the pending
+        suggestions and the published URL keys are read, so two
+        moderators (or two workers) handling the same suggestions are
+        serialised: the second one finds them gone from the queue and
+        reports them as `not_found` instead of publishing them twice.
+        The suggestions are taken off the queue by the `DELETE … RETURNING`
+        that reads them.  Approved ones become sites through a single
+        `insert_sites` call and their alternatives through a single
+        `insert_alternatives` call.  A suggestion whose URL key (see `normalize_url`)
+        is already published, or approved earlier in the same batch, is
+        removed from the queue without creating a second site.  Returns one
+        result per requested ID, in request order: `{'id', 'status'}` where
+        status is `approved` (with the new `site_id`), `duplicate` (with
+        the `site_id` of the existing site), `rejected`, or `not_found` for
+        IDs no longer pending.
+        """
+        suggestion_ids = list(dict.fromkeys(suggestion_ids))
+        suggestions: dict[int, sqlite3.Row] = {}
+        site_ids: dict[int, int] = {}
+        duplicates: dict[int, int] = {}
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            # Take the suggestions off the queue as they are read: only the
+            # rows this statement deleted are moderated here.  Stay well
+            # below SQLite's limit on bound parameters.
+            for start in range(0, len(suggestion_ids), 500):
+                chunk = suggestion_ids[start:start + 500]
+                for row in db.execute(
+                    f"DELETE FROM suggestions WHERE id IN ({','.join('?' * len(chunk))}) RETURNING *", chunk
+                ).fetchall():
+                    suggestions[row['id']] = row
+            found = [suggestion_id for suggestion_id in suggestion_ids if suggestion_id in suggestions]
+            if approve and found:
+                url_keys = {suggestion_id: normalize_url(suggestions[suggestion_id]['url'])
+                            for suggestion_id in found}
+                unique_keys = list(dict.fromkeys(url_keys.values()))
+                listed: dict[str, int] = {}
+                for start in range(0, len(unique_keys), 500):
+                    chunk = unique_keys[start:start + 500]
+                    for row in db.execute(
+                        f"SELECT id, url_key FROM sites WHERE url_key IN ({','.join('?' * len(chunk))}) ORDER BY id DESC",
+                        chunk
+                    ):
+                        listed[row['url_key']] = row['id']
+                to_insert = []
+                for suggestion_id in found:
+                    if url_keys[suggestion_id] not in listed:
+                        listed[url_keys[suggestion_id]] = 0
+                        to_insert.append(suggestion_id)
+                new_ids = insert_sites(db, [dict(suggestions[suggestion_id]) for suggestion_id in to_insert])
+                site_ids = dict(zip(to_insert, new_ids))
+                for suggestion_id, site_id in site_ids.items():
+                    listed[url_keys[suggestion_id]] = site_id
+                duplicates = {suggestion_id: listed[url_keys[suggestion_id]]
+                              for suggestion_id in found if suggestion_id not in site_ids}
+                insert_alternatives(db, [
+                    (site_ids[suggestion_id], alt)
+                    for suggestion_id in to_insert
+                    for alt in json.loads(suggestions[suggestion_id]['alternatives_json'] or '[]')
+                ])
+        if site_ids:
+            # Rejections leave the published catalogue, and its caches, as is.
+            data_changed(db, site_ids.values())
+        results = []
+        for suggestion_id in suggestion_ids:
+            if suggestion_id not in suggestions:
+                results.append({'id': suggestion_id, 'status': 'not_found'})
+            elif suggestion_id in duplicates:
+                results.append({'id': suggestion_id, 'status': 'duplicate', 'site_id': duplicates[suggestion_id]})
+            elif approve:
+                results.append({'id': suggestion_id, 'status': 'approved', 'site_id': site_ids[suggestion_id]})
+            else:
+                results.append({'id': suggestion_id, 'status': 'rejected'})
+        return results
+
+    def moderation_response(approve: bool):
+        """Apply a batch moderation request and answer it.
+
+        IDs come from the `ids` form fields of the dashboard or from a JSON
+        body `{"ids": [...]}`.  JSON requests get the per-item results as
+        JSON; form submissions are redirected back to the same page of the
+        queue with a summary message.
+        """
+        payload = request.get_json(silent=True) if request.is_json else None
+        raw_ids = payload.get('ids') if isinstance(payload, dict) else request.form.getlist('ids')
+        try:
+            suggestion_ids = [int(value) for value in raw_ids or ()]
+        except (TypeError, ValueError):
+            suggestion_ids = None
+        if not suggestion_ids:
+            if request.is_json:
+                return jsonify(error='ids must be a non-empty list of suggestion IDs'), 400
+            flash('Aucune suggestion sélectionnée.', 'error')
+            return redirect(url_for('admin_dashboard', **request.args))
+        results = moderate_suggestions(get_db(), suggestion_ids, approve)
+        if request.is_json:
+            return jsonify(results=results)
+        counts = {status: sum(result['status'] == status for result in results)
+                  for status in ('approved', 'duplicate', 'rejected', 'not_found')}
+        verb = 'approuvée(s) et publiée(s)' if approve else 'supprimée(s)'
+        flash(f"{counts['approved'] + counts['rejected']} suggestion(s) {verb}.", 'success')
+        if counts['duplicate']:
+            flash(f"{counts['duplicate']} suggestion(s) déjà présente(s) dans le catalogue, retirée(s) de la file.", 'success')
+        if counts['not_found']:
+            flash(f"{counts['not_found']} suggestion(s) introuvable(s), déjà traitée(s) ?", 'error')
+        return redirect(url_for('admin_dashboard', **request.args))
+
+    @app.route('/admin/suggestions/approve', methods=['POST'])
+    @login_required
+    def approve_suggestions():
+        """Publish a batch of suggestions (see `moderation_response`)."""
+        return moderation_response(approve=True)
+
+    @app.route('/admin/suggestions/reject', methods=['POST'])
+    @login_required
+    def reject_suggestions():
+        """Discard a batch of suggestions (see `moderation_response`)."""
+        return moderation_response(approve=False)
 
     @app.route('/admin/approve/<int:suggestion_id>')
     @login_required
     def approve_suggestion(suggestion_id: int) -> str:
         """Publish a suggestion: move it into the main tables and remove it."""
-        db = get_db()
-        suggestion = db.execute('SELECT * FROM suggestions WHERE id=?', (suggestion_id,)).fetchone()
-        if suggestion is None:
+        [result] = moderate_suggestions(get_db(), [suggestion_id], approve=True)
+        if result['status'] == 'not_found':
             flash('Suggestion introuvable.', 'error')
-            return redirect(url_for('admin_dashboard'))
-        import json
-        # Insert the site
-        db.execute(
-            '''INSERT INTO sites (name, url, category, description, verification_type, context, date_in_effect, status, country, sources)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                suggestion['name'], suggestion['url'], suggestion['category'], suggestion['description'],
-                suggestion['verification_type'], '', '', '', suggestion['country'], ''
-            )
-        )
-        site_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
-        # Insert alternatives
-        alts = json.loads(suggestion['alternatives_json']) if suggestion['alternatives_json'] else []
-        for alt in alts:
-            db.execute(
-                '''INSERT INTO alternatives (site_id, alt_name, alt_url, alt_description)
-                   VALUES (?, ?, ?, ?)''',
-                (site_id, alt['name'], alt['url'], alt.get('description', ''))
-            )
-        # Delete suggestion
-        db.execute('DELETE FROM suggestions WHERE id=?', (suggestion_id,))
-        db.commit()
-        flash('Suggestion approuvée et ajoutée à la base.', 'success')
+        elif result['status'] == 'duplicate':
+            flash('Ce site est déjà dans le catalogue : la suggestion a été retirée.', 'success')
+        else:
+            flash('Suggestion approuvée et ajoutée à la base.', 'success')
         return redirect(url_for('admin_dashboard'))
 
     @app.route('/admin/delete/<int:suggestion_id>')
     @login_required
     def delete_suggestion(suggestion_id: int) -> str:
         """Discard a suggestion without publishing it."""
-        db = get_db()
-        db.execute('DELETE FROM suggestions WHERE id=?', (suggestion_id,))
-        db.commit()
+        moderate_suggestions(get_db(), [suggestion_id], approve=False)
         flash('Suggestion supprimée.', 'success')
         return redirect(url_for('admin_dashboard'))
 
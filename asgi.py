@@ -0,0 +1,18 @@
+"""ASGI entry point, for servers such as uvicorn or hypercorn.
+
+The application itself is WSGI: it runs behind asgiref's adapter, which
+hands every request to a thread pool.  asgiref is listed in
+requirements.txt; the server is installed separately (`pip install
+uvicorn`), for example:
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers $WEB_CONCURRENCY
+
+gunicorn with wsgi.py (see gunicorn.conf.py) is the recommended setup: it
+avoids the adapter and loads the application once before forking workers.
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from wsgi import app as wsgi_app
+
+app = WsgiToAsgi(wsgi_app)
@@ -0,0 +1,309 @@
+"""
+Benchmark harness for the StopIDCheck application.
+
+The script generates a synthetic catalogue of the requested size (French
+text, multi-country strings, 0 to 10 alternatives per site), loads it with
+`flask sites import` into a scratch database, and drives an application
+built with `create_app(test_config=...)` through the Flask test client.
+Each scenario sends a fixed number of requests after a short warm-up and
+reports latency percentiles and throughput; the results are written as
+JSON so that runs can be archived and compared.
+
+Usage:
+
+    python bench.py --sizes 1000,100000 --output bench.json
+    python bench.py --sizes 1000 --baseline bench.json   # exit status 1 on regression
+
+Generated catalogues are deterministic for a given size and `--seed` and
+are kept in `--workdir` (bench-data/ by default), so later runs skip the
+generation; each run works on a copy of the cached database because the
+suggestion and approval scenarios write to it.  A catalogue of 1M sites
+needs a few GB of disk space and several minutes to generate.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+from app import SEVERITY_LEVELS, VERIFICATION_TYPES, create_app
+
+# Vocabulary of the generated catalogue.
+CATEGORIES = ('Adulte', 'Réseaux sociaux', 'Streaming', 'Jeux vidéo', 'Forums',
+              'Rencontres', 'Achats en ligne', 'Paris sportifs')
+COUNTRIES = ('FR', 'UK', 'US', 'AU', 'DE', 'IT', 'ES', 'IE', 'International')
+NAME_PARTS = ('Vidéo', 'Ciné', 'Forum', 'Social', 'Jeux', 'Flux', 'Musique', 'Rencontre',
+              'Club', 'Marché', 'Pari', 'Photo', 'Actu', 'Débat', 'Tchat', 'Zone')
+NAME_SUFFIXES = ('Plus', 'Direct', 'Hub', 'Land', 'Express', 'Net', 'Live', 'Max', 'Pro', 'TV')
+DESCRIPTION_SUBJECTS = ('Plateforme', 'Service', 'Communauté', 'Application', 'Site', 'Réseau')
+DESCRIPTION_TOPICS = ('de vidéos', 'de discussions', 'de musique en ligne', 'de jeux multijoueurs',
+                      'de rencontres', 'de paris sportifs', 'de petites annonces', 'de photos')
+DESCRIPTION_DETAILS = ('très populaire en Europe', 'destiné aux adultes', 'financé par la publicité',
+                       'ouvert à tous', 'réservé aux abonnés', 'en forte croissance',
+                       'disponible sur mobile et ordinateur', 'fondé en 2012')
+STATUSES = ('Vérification requise au Royaume‑Uni seulement', 'Vérification obligatoire',
+            'Bloqué en France ; accessible sans vérification hors France',
+            'Vérification facultative', 'Vérification appliquée de manière sélective',
+            'Tests en cours', 'Blocage complet après vérification refusée')
+CONTEXTS = ('Conformité à la loi française 2024', 'Online Safety Act 2023 (R.-Uni)',
+            'Digital Services Act', 'Politique interne de protection des mineurs',
+            'Lois des États américains sur la vérification d’âge')
+DATES = ('janvier 2024', 'juillet 2024', 'mars 2025', '2023', '2024', 'septembre 2025')
+SOURCES = ('Politico.eu', 'TF1 Info', 'AP News', 'Tom’s Guide', 'Le Monde', 'BBC News', 'Numerama')
+
+
+def generate_sites(count: int, seed: int) -> Iterator[dict[str, Any]]:
+    """Yield `count` deterministic synthetic site records in the NDJSON import format."""
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f'{rng.choice(NAME_PARTS)}{rng.choice(NAME_SUFFIXES)} {i}'
+        verification = ' ou '.join(rng.sample(VERIFICATION_TYPES, rng.randint(1, 3)))
+        yield {
+            'name': name,
+            'url': f'https://www.site{i}.example/',
+            'category': ', '.join(rng.sample(CATEGORIES, rng.randint(1, 2))),
+            'description': (f'{rng.choice(DESCRIPTION_SUBJECTS)} {rng.choice(DESCRIPTION_TOPICS)} '
+                            f'{rng.choice(DESCRIPTION_DETAILS)}.'),
+            'verification_type': f'{verification} via un prestataire',
+            'context': rng.choice(CONTEXTS),
+            'date_in_effect': rng.choice(DATES),
+            'status': rng.choice(STATUSES),
+            'country': ', '.join(rng.sample(COUNTRIES, rng.choice((1, 1, 1, 2, 3)))),
+            'sources': ', '.join(rng.sample(SOURCES, rng.randint(1, 3))),
+            'alternatives': [
+                {
+                    'name': f'Alternative {i}-{j}',
+                    'url': f'https://alt{j}.site{i}.example',
+                    'description': f'{rng.choice(DESCRIPTION_SUBJECTS)} {rng.choice(DESCRIPTION_TOPICS)} sans pièce d’identité.',
+                }
+                for j in range(rng.randint(0, 10))
+            ],
+        }
+
+
+def build_catalogue(workdir: str, count: int, seed: int) -> str:
+    """Return the path of a database holding the synthetic catalogue, generating it if needed."""
+    path = os.path.join(workdir, f'catalogue-{count}-{seed}.db')
+    if os.path.exists(path):
+        return path
+    os.makedirs(workdir, exist_ok=True)
+    ndjson_path = os.path.join(workdir, f'catalogue-{count}-{seed}.ndjson')
+    with open(ndjson_path, 'w', encoding='utf-8') as fh:
+        for site in generate_sites(count, seed):
+            fh.write(json.dumps(site, ensure_ascii=False) + '\n')
+    tmp_path = path + '.tmp'
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+    app = create_app({'DATABASE': tmp_path, 'DOMAIN_SET_DIR': os.path.join(workdir, 'domain-sets'),
+                      'WARMUP': False})
+    result = app.test_cli_runner().invoke(args=['sites', 'import', ndjson_path, '--batch-size', '5000'])
+    if result.exit_code != 0:
+        raise RuntimeError(f'import failed: {result.output}') from result.exception
+    print(f'  {result.output.strip()}', file=sys.stderr)
+    # Drop the sample sites seeded in the new database and fold the WAL
+    # into the file, so that the cached catalogue is a single file.
+    db = sqlite3.connect(tmp_path)
+    db.execute("DELETE FROM sites WHERE url_key NOT LIKE '%.example'")
+    db.execute('DELETE FROM alternatives WHERE site_id NOT IN (SELECT id FROM sites)')
+    db.commit()
+    db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    db.close()
+    os.replace(tmp_path, path)
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+    os.remove(ndjson_path)
+    return path
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(send: Callable[[int], int], requests: int, warmup: int) -> dict[str, Any]:
+    """Call `send(i)` `warmup + requests` times and summarise the timed calls.
+
+    `send` performs one request and returns its HTTP status; statuses of
+    400 and above are counted as errors.
+    """
+    for i in range(warmup):
+        send(i)
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(warmup, warmup + requests):
+        t0 = time.perf_counter()
+        status = send(i)
+        latencies.append(time.perf_counter() - t0)
+        if status >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': round(requests / elapsed, 1) if elapsed else None,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+    }
+
+
+def filter_scenarios(rng: random.Random) -> Iterator[tuple[str, Callable[[], dict[str, Any]]]]:
+    """Yield a `/sites` scenario for every combination of the list filters."""
+    filters: dict[str, Callable[[], Any]] = {
+        'category': lambda: rng.choice(CATEGORIES),
+        'country': lambda: rng.sample(COUNTRIES, rng.randint(1, 2)),
+        'verification_type': lambda: rng.choice(VERIFICATION_TYPES),
+        'severity': lambda: rng.choice(list(SEVERITY_LEVELS)),
+    }
+    for size in range(len(filters) + 1):
+        for combination in itertools.combinations(filters, size):
+            def make_args(combination=combination) -> dict[str, Any]:
+                return {name: filters[name]() for name in combination}
+            yield 'sites[' + '+'.join(combination) + ']', make_args
+
+
+def benchmark_size(count: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario against a fresh copy of the catalogue of `count` sites."""
+    print(f'catalogue of {count} sites', file=sys.stderr)
+    source = build_catalogue(args.workdir, count, args.seed)
+    rundir = tempfile.mkdtemp(prefix='bench-')
+    try:
+        database = os.path.join(rundir, 'sites.db')
+        shutil.copy(source, database)
+        app = create_app({
+            'DATABASE': database,
+            'DOMAIN_SET_DIR': os.path.join(rundir, 'domain-sets'),
+            'PAGE_CACHE_SIZE': args.page_cache,
+            'RATE_LIMIT_SUGGEST': '',
+            'RATE_LIMIT_LOGIN': '',
+        })
+        client = app.test_client()
+        db = sqlite3.connect(database)
+        site_ids = [row[0] for row in db.execute('SELECT id FROM sites')]
+        db.close()
+        rng = random.Random(args.seed)
+        words = [word.lower() for word in NAME_PARTS + ('populaire', 'abonnés', 'publicité', 'Yoti', 'selfie')]
+        scenarios: list[tuple[str, Callable[[int], int]]] = []
+        for name, make_args in filter_scenarios(rng):
+            scenarios.append((name, lambda i, make_args=make_args: client.get('/sites', query_string=make_args()).status_code))
+        scenarios += [
+            ('sites[sort=severity]', lambda i: client.get('/sites', query_string={'sort': 'severity'}).status_code),
+            ('search', lambda i: client.get('/sites', query_string={'q': rng.choice(words)}).status_code),
+            ('site_detail', lambda i: client.get(f'/site/{rng.choice(site_ids)}').status_code),
+            ('api_sites', lambda i: client.get('/api/sites', query_string={'fields': 'id,name,url'}).status_code),
+            ('api_lookup', lambda i: client.get('/api/lookup', query_string={'host': f'www.site{rng.randrange(count)}.example'}).status_code),
+            ('suggest_post', lambda i: client.post('/suggest', data={
+                'name': f'Suggestion {i} {rng.random():.12f}', 'url': f'https://suggest{i}-{rng.random():.12f}.example',
+                'category': [rng.choice(CATEGORIES)], 'country': [rng.choice(COUNTRIES)],
+                'verification_type': [rng.choice(VERIFICATION_TYPES)],
+                'alternatives': 'Alternative | https://alternative.example | Sans vérification',
+            }).status_code),
+        ]
+        results: dict[str, Any] = {}
+        for name, send in scenarios:
+            results[name] = run_scenario(send, args.requests, args.warmup)
+            print(f"  {name:<45} p50 {results[name]['p50_ms']:>9.3f} ms  "
+                  f"p99 {results[name]['p99_ms']:>9.3f} ms  {results[name]['throughput_rps']:>8} req/s",
+                  file=sys.stderr)
+        # Approval consumes the suggestions posted above, one per request.
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+        db = sqlite3.connect(database)
+        pending = [row[0] for row in db.execute('SELECT id FROM suggestions ORDER BY id')]
+        db.close()
+        approvals = min(args.requests, len(pending) - args.warmup)
+        if approvals > 0:
+            results['admin_approve'] = run_scenario(
+                lambda i: client.get(f'/admin/approve/{pending[i]}').status_code, approvals, args.warmup
+            )
+            print(f"  {'admin_approve':<45} p50 {results['admin_approve']['p50_ms']:>9.3f} ms", file=sys.stderr)
+        return results
+    finally:
+        shutil.rmtree(rundir, ignore_errors=True)
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Return a line per scenario whose p50 or p90 latency regressed by more than `threshold`."""
+    regressions = []
+    for size, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ('p50_ms', 'p90_ms'):
+                if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                    regressions.append(f'{size} {name} {metric}: {previous[metric]:.3f} -> {current[metric]:.3f} ms '
+                                       f'(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000',
+                        help='comma-separated catalogue sizes, e.g. 1000,100000,1000000 (default: 1000)')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario (default: 200)')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per scenario (default: 20)')
+    parser.add_argument('--seed', type=int, default=42, help='seed of the generator and of the request mix')
+    parser.add_argument('--page-cache', type=int, default=0,
+                        help='PAGE_CACHE_SIZE of the benchmarked app (default: 0, cache disabled)')
+    parser.add_argument('--workdir', default='bench-data', help='where generated catalogues are cached')
+    parser.add_argument('--output', help='write the JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative latency increase reported as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'page_cache': args.page_cache,
+        },
+        'results': {},
+    }
+    for size in (int(value) for value in args.sizes.split(',') if value.strip()):
+        results['results'][str(size)] = benchmark_size(size, args)
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            return 1
+        print('no regression against the baseline', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
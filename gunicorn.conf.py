@@ -0,0 +1,37 @@
+"""gunicorn settings for production: gunicorn -c gunicorn.conf.py wsgi:app
+
+Every value can be overridden from the environment (see README.md).
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# One process per CPU serves pages in parallel despite the GIL; a few
+# threads per process overlap SQLite reads and slow clients.  Each worker
+# keeps its own caches, kept coherent through the `data_changes` log (see
+# CACHE_SYNC_INTERVAL).
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the application in the master: migrations and warm-up run once,
+# and the workers share the warmed indexes and templates copy-on-write.
+# Database connections are reopened in each worker (see ConnectionPool).
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to bound memory growth; the jitter keeps
+# them from restarting all at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+# Rate limits must be shared between workers to mean anything.
+if workers > 1:
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'sqlite')
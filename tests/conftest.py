@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An application on a fresh database holding the sample catalogue."""
+    return create_app({
+        'DATABASE': str(tmp_path / 'sites.db'),
+        'TESTING': True,
+        'RATE_LIMIT_SUGGEST': '',
+        'RATE_LIMIT_LOGIN': '',
+        'CACHE_SYNC_INTERVAL': 0,
+    })
+
+
+@pytest.fixture
+def db(app):
+    """A plain connection to the application's database."""
+    connection = sqlite3.connect(app.config['DATABASE'])
+    connection.row_factory = sqlite3.Row
+    yield connection
+    connection.close()
@@ -0,0 +1,69 @@
+import struct
+
+from app import (decode_domain_set, domain_hash, domain_set_width, encode_domain_set,
+                 encode_domain_set_delta, normalize_host)
+
+DELTA_HEADER = '>4sBBBxII16s16s'
+
+
+def apply_delta(base, delta):
+    """Rebuild the full artifact a delta leads to, as a client would."""
+    width, version, hashes = decode_domain_set(base)
+    magic, kind, delta_width, _reserved, added, removed, delta_base, new_version = \
+        struct.unpack_from(DELTA_HEADER, delta)
+    assert (magic, kind, delta_width, delta_base) == (b'SIDS', 1, width, version)
+    body = delta[struct.calcsize(DELTA_HEADER):]
+    assert len(body) == (added + removed) * width
+    chunks = [body[i:i + width] for i in range(0, len(body), width)]
+    result = (set(hashes) - set(chunks[added:])) | set(chunks[:added])
+    return encode_domain_set(sorted(result), width, new_version)
+
+
+def test_width_follows_the_false_positive_rate():
+    assert domain_set_width(0, 1e-6) == 4
+    assert domain_set_width(1000, 1e-6) == 4
+    # 10 million hosts at 1e-9 need 54 bits.
+    assert domain_set_width(10 ** 7, 1e-9) == 7
+    assert domain_set_width(10 ** 9, 1e-30) == 16
+
+
+def test_full_encoding_round_trip():
+    width = 5
+    hashes = sorted(domain_hash(host, width) for host in ('reddit.com', 'example.org', 'xn--bcher-kva.de'))
+    blob = encode_domain_set(hashes, width, b'v' * 16)
+    assert len(blob) == 28 + 3 * width
+    assert decode_domain_set(blob) == (width, b'v' * 16, hashes)
+
+
+def test_delta_applied_to_base_gives_new_artifact():
+    width = 4
+    old = sorted(domain_hash(host, width) for host in ('a.example', 'b.example', 'c.example'))
+    new = sorted(domain_hash(host, width) for host in ('b.example', 'c.example', 'd.example'))
+    base = encode_domain_set(old, width, b'1' * 16)
+    delta = encode_domain_set_delta(sorted(set(new) - set(old)), sorted(set(old) - set(new)),
+                                    width, b'1' * 16, b'2' * 16)
+    assert apply_delta(base, delta) == encode_domain_set(new, width, b'2' * 16)
+
+
+def test_api_serves_full_set_delta_and_not_modified(app, tmp_path):
+    client = app.test_client()
+    full = client.get('/api/domain-set')
+    assert full.headers['X-Domain-Set-Kind'] == 'full'
+    width, version, hashes = decode_domain_set(full.data)
+    assert version.hex() == full.headers['X-Domain-Set-Version']
+    assert domain_hash(normalize_host('https://www.reddit.com'), width) in hashes
+
+    source = tmp_path / 'new.ndjson'
+    source.write_text('{"name": "Foo", "url": "https://foo.example", "category": "Forum"}\n', encoding='utf-8')
+    assert app.test_cli_runner().invoke(args=['sites', 'import', str(source)]).exit_code == 0
+
+    delta = client.get('/api/domain-set', query_string={'since': version.hex()})
+    assert delta.status_code == 200
+    assert delta.headers['X-Domain-Set-Kind'] == 'delta'
+    current = client.get('/api/domain-set')
+    assert current.headers['X-Domain-Set-Version'] != version.hex()
+    assert apply_delta(full.data, delta.data) == current.data
+
+    unchanged = client.get('/api/domain-set', query_string={'since': current.headers['X-Domain-Set-Version']})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
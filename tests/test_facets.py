@@ -0,0 +1,60 @@
+from werkzeug.datastructures import MultiDict
+
+from app import FACET_NAMES, FACET_TABLES, build_site_query, paginate_query
+
+
+def stored_counts(db):
+    return {(row['facet'], row['value']): row['count'] for row in db.execute('SELECT * FROM facet_counts')}
+
+
+def recomputed_counts(db):
+    counts = {}
+    for name, (table, column) in zip(FACET_NAMES, FACET_TABLES):
+        for value, count in db.execute(f'SELECT {column}, COUNT(*) FROM {table} GROUP BY {column}'):
+            counts[(name, value)] = count
+    for rank, count in db.execute('SELECT severity_rank, COUNT(*) FROM sites '
+                                  'WHERE severity_rank IS NOT NULL GROUP BY severity_rank'):
+        counts[('severity', str(rank))] = count
+    return counts
+
+
+def filtered(db, **args):
+    sql, params, sort_keys = build_site_query(MultiDict(args))
+    return [row['id'] for row in paginate_query(db, sql, params, sort_keys, 100)]
+
+
+def test_junction_rows_and_counts_follow_inserts_and_deletes(app, db, tmp_path):
+    before = stored_counts(db)
+    assert before == recomputed_counts(db)
+    source = tmp_path / 'new.ndjson'
+    source.write_text(
+        '{"name": "Foo", "url": "https://foo.example", "category": "Forum, Jeux", "country": "FR, AUS",'
+        ' "verification_type": "Selfie vidéo"}\n', encoding='utf-8')
+    assert app.test_cli_runner().invoke(args=['sites', 'import', str(source)]).exit_code == 0
+
+    site_id = db.execute("SELECT id FROM sites WHERE name = 'Foo'").fetchone()[0]
+    categories = [row[0] for row in db.execute(
+        'SELECT category FROM site_categories WHERE site_id = ? ORDER BY category', (site_id,))]
+    assert categories == ['Forum', 'Jeux']
+    counts = stored_counts(db)
+    assert counts == recomputed_counts(db)
+    assert counts[('category', 'Forum')] == before.get(('category', 'Forum'), 0) + 1
+    assert counts[('country', 'FR')] == before[('country', 'FR')] + 1
+    # Exact values: 'AUS' is not a match for 'US', and vice versa.
+    assert site_id in filtered(db, country='AUS')
+    assert site_id not in filtered(db, country='US')
+    assert filtered(db, category='Jeux', country='FR') == [site_id]
+
+    db.execute('DELETE FROM sites WHERE id = ?', (site_id,))
+    db.commit()
+    for table, _column in FACET_TABLES:
+        assert db.execute(f'SELECT COUNT(*) FROM {table} WHERE site_id = ?', (site_id,)).fetchone()[0] == 0
+    assert stored_counts(db) == before
+
+
+def test_severity_counts_follow_updates(db):
+    before = stored_counts(db)
+    db.execute('UPDATE sites SET severity_rank = 0 WHERE id = 2')
+    db.commit()
+    assert stored_counts(db) == recomputed_counts(db)
+    assert stored_counts(db) != before
@@ -0,0 +1,107 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import create_app
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    conditional_hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/ok':
+            if self.headers.get('If-None-Match') == '"v1"':
+                type(self).conditional_hits += 1
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+            else:
+                self.reply(200, b'<html>hello</html>', [('ETag', '"v1"')])
+        elif self.path == '/redirect':
+            self.reply(302, headers=[('Location', '/ok')])
+        elif self.path == '/gate':
+            self.reply(200, b'<p>Please verify your age with <script src="https://yoti.com/sdk.js"></script>')
+        elif self.path == '/forbidden':
+            self.reply(403)
+        elif self.path == '/slow':
+            time.sleep(2)
+            try:
+                self.reply(200, b'late')
+            except OSError:
+                pass
+        elif self.path == '/no-length':
+            # Body delimited by the end of the connection.
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write('<p>Vérification de l’âge requise</p>'.encode())
+            self.close_connection = True
+        else:
+            self.reply(404, b'not found')
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_links_check_against_a_stub_server(app, db, stub):
+    app = create_app({**app.config, 'WARMUP': False, 'LINK_CHECK_TIMEOUT': 1})
+    site_ids = [row['id'] for row in db.execute('SELECT id FROM sites ORDER BY id')]
+    urls = ['/ok', '/redirect', '/gate', '/forbidden', '/slow', '/no-length', '/missing']
+    for site_id, path in zip(site_ids, urls):
+        db.execute('UPDATE sites SET url = ? WHERE id = ?', (stub + path, site_id))
+    db.executemany('INSERT INTO alternatives (site_id, alt_name, alt_url, alt_description) VALUES (?, ?, ?, ?)',
+                   [(site_ids[0], f'Alt {path}', stub + path, '') for path in urls[len(site_ids):]]
+                   + [(site_ids[0], 'Bad scheme', 'ftp://example.org/', '')])
+    db.commit()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['links', 'check'])
+
+    assert result.exit_code == 0, result.output
+    rows = {row['url'].replace(stub, ''): row for row in db.execute('SELECT * FROM link_checks')}
+    assert rows['/ok']['status'] == 200 and rows['/ok']['etag'] == '"v1"' and rows['/ok']['age_gate'] is None
+    assert rows['/redirect']['status'] == 200 and rows['/redirect']['final_url'] == stub + '/ok'
+    assert rows['/gate']['age_gate'] == 'verify your age'
+    assert rows['/forbidden']['status'] == 403
+    assert rows['/slow']['status'] is None and rows['/slow']['error'] == 'timeout'
+    assert rows['/no-length']['status'] == 200 and rows['/no-length']['age_gate'] == 'vérification de l’âge'
+    assert rows['/missing']['status'] == 404
+    assert rows['ftp://example.org/']['error'].startswith('ValueError')
+
+    page = app.test_client().get(f'/site/{site_ids[0]}').get_data(as_text=True)
+    assert 'link-ok' in page
+    page = app.test_client().get(f'/site/{site_ids[2]}').get_data(as_text=True)
+    assert 'link-gated' in page
+
+    # A second run revalidates with the stored ETag and changes nothing.
+    hits = StubHandler.conditional_hits
+    result = runner.invoke(args=['links', 'check'])
+    assert result.exit_code == 0, result.output
+    assert StubHandler.conditional_hits >= hits + 2
+    assert '0 sites updated' in result.output
+    assert db.execute('SELECT status FROM link_checks WHERE url = ?', (stub + '/ok',)).fetchone()[0] == 200
+
+    # Recently checked links are skipped.
+    result = runner.invoke(args=['links', 'check', '--older-than', '1'])
+    assert result.output.startswith('0 links checked')
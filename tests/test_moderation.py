@@ -0,0 +1,38 @@
+import threading
+
+from app import create_app
+
+
+def submit(client, count):
+    for i in range(count):
+        client.post('/suggest', data={
+            'name': f'Foo{i}', 'url': f'https://foo{i}.example', 'category': ['Adulte'],
+            'country': ['FR'], 'verification_type': ['Selfie'],
+        })
+
+
+def test_concurrent_approvals_publish_each_suggestion_once(app, db):
+    other = create_app({**app.config, 'WARMUP': False})
+    submit(app.test_client(), 20)
+    ids = [row[0] for row in db.execute('SELECT id FROM suggestions ORDER BY id')]
+    sites_before = db.execute('SELECT COUNT(*) FROM sites').fetchone()[0]
+    results = []
+
+    def approve(application):
+        client = application.test_client()
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+        results.extend(client.post('/admin/suggestions/approve', json={'ids': ids}).get_json()['results'])
+
+    threads = [threading.Thread(target=approve, args=(application,)) for application in (app, other)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    approved = sorted(result['id'] for result in results if result['status'] == 'approved')
+    assert approved == ids
+    assert sorted(result['id'] for result in results if result['status'] == 'not_found') == ids
+    assert db.execute('SELECT COUNT(*) FROM sites').fetchone()[0] == sites_before + len(ids)
+    assert db.execute('SELECT COUNT(*) FROM suggestions').fetchone()[0] == 0
+
@@ -0,0 +1,51 @@
+from app import NameIndex
+
+
+def names(results):
+    return [result['name'] for result in results]
+
+
+def make_index():
+    index = NameIndex()
+    index.load([
+        (1, 'site', 'Pornhub Premium', 'https://pornhub.com'),
+        (2, 'site', 'Reddit', 'https://reddit.com'),
+        (3, 'site', 'Roblox', 'https://roblox.com'),
+        (2, 'alternative', 'Lemmy', 'https://join-lemmy.org'),
+        (3, 'alternative', 'Lemmy', 'https://join-lemmy.org'),
+    ], version=1)
+    return index
+
+
+def test_prefix_and_word_matches():
+    index = make_index()
+    assert names(index.search('Red')) == ['Reddit']
+    assert names(index.search('r')) == ['Reddit', 'Roblox']
+    assert names(index.search('premi')) == ['Pornhub Premium']
+    # An alternative listed under two sites is a single entry.
+    assert index.search('lem') == [{'type': 'alternative', 'name': 'Lemmy', 'url': 'https://join-lemmy.org'}]
+
+
+def test_misspelled_prefixes():
+    index = make_index()
+    assert names(index.search('redit')) == ['Reddit']
+    assert names(index.search('rbolox')) == ['Roblox']
+    # The first character must be right, and short prefixes must be exact.
+    assert index.search('edit') == []
+    assert index.search('rb') == []
+
+
+def test_update_replaces_the_names_of_a_site():
+    index = make_index()
+    assert index.update([2], [(2, 'site', 'Rabbit', 'https://rabbit.example')], from_version=1, to_version=2)
+    assert index.search('redd') == []
+    assert names(index.search('rabb')) == ['Rabbit']
+    # Site 3 still lists the alternative.
+    assert names(index.search('lemm')) == ['Lemmy']
+    assert not index.update([3], [], from_version=1, to_version=3)
+    assert index.version == 2
+
+
+def test_autocomplete_endpoint(app):
+    response = app.test_client().get('/api/suggest?prefix=spotfy')
+    assert response.get_json()['results'][0]['name'] == 'Spotify'
@@ -0,0 +1,38 @@
+def test_conditional_get_and_invalidation(app, tmp_path):
+    client = app.test_client()
+    first = client.get('/sites')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    assert client.get('/sites').headers['ETag'] == etag
+    unchanged = client.get('/sites', headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
+
+    source = tmp_path / 'new.ndjson'
+    source.write_text('{"name": "Foo", "url": "https://foo.example", "category": "Forum"}\n', encoding='utf-8')
+    assert app.test_cli_runner().invoke(args=['sites', 'import', str(source)]).exit_code == 0
+
+    changed = client.get('/sites', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert 'Foo' in changed.get_data(as_text=True)
+
+
+def test_query_string_order_shares_an_entry(app):
+    client = app.test_client()
+    etag = client.get('/sites?country=UK&category=R%C3%A9seaux+sociaux').headers['ETag']
+    assert client.get('/sites?category=R%C3%A9seaux+sociaux&country=UK',
+                      headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_admin_session_bypasses_the_cache(app):
+    client = app.test_client()
+    client.get('/sites')
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+    response = client.get('/sites')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
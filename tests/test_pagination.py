@@ -0,0 +1,81 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import app as app_module
+from app import build_site_query, create_app, decode_cursor, encode_cursor, paginate_query
+
+
+@pytest.fixture
+def catalogue(db):
+    # Repeated names and severities, so the id tie-breaker matters.
+    db.executemany(
+        'INSERT INTO sites (name, url, category, description, severity_rank) VALUES (?, ?, ?, ?, ?)',
+        [(f'Site {i % 7}', f'https://site{i}.example', 'Forum', 'forum de discussion', i % 4)
+         for i in range(30)])
+    db.commit()
+    return db
+
+
+def walk(db, args, page_size, direction='after', cursor=None):
+    """The pages met following the `direction` links from `cursor`, in display order."""
+    sql, params, sort_keys = build_site_query(MultiDict(args))
+    pages = []
+    while True:
+        page = paginate_query(db, sql, params, sort_keys, page_size, **{direction: cursor})
+        ids = [row['id'] for row in page]
+        if direction == 'after':
+            pages.append(ids)
+            cursor = page.next_cursor
+        else:
+            pages.insert(0, ids)
+            cursor = page.prev_cursor
+        if cursor is None:
+            return pages, page
+
+
+def unpaginated(db, args):
+    sql, params, sort_keys = build_site_query(MultiDict(args))
+    return [row['id'] for row in paginate_query(db, sql, params, sort_keys, 10 ** 6)]
+
+
+def test_cursor_round_trip():
+    values = ['Café', 3, -1.5, None]
+    assert decode_cursor(encode_cursor(values), 4) == values
+    assert decode_cursor(encode_cursor(values), 3) is None
+    assert decode_cursor('not a cursor!', 4) is None
+    assert decode_cursor('', 4) is None
+
+
+@pytest.mark.parametrize('args', [{}, {'sort': 'severity'}, {'q': 'forum'}, {'q': 'forum', 'sort': 'severity'}])
+def test_page_walks_match_unpaginated_order(catalogue, args):
+    expected = unpaginated(catalogue, args)
+    assert len(expected) >= 30
+
+    forward, last = walk(catalogue, args, 4)
+    assert [site_id for page in forward for site_id in page] == expected
+    assert all(len(page) == 4 for page in forward[:-1])
+
+    backward, first = walk(catalogue, args, 4, 'before', last.prev_cursor)
+    assert backward + forward[-1:] == forward
+    assert first.prev_cursor is None
+
+
+def test_streamed_list_returns_its_connection_when_setup_fails(app, monkeypatch):
+    # A streamed page holds its own connection besides `g.read_db`: with a
+    # pool of two, any leaked connection makes the next page time out.
+    streaming = create_app({**app.config, 'WARMUP': False, 'SITES_STREAMING': True,
+                            'DB_READ_POOL_SIZE': 2, 'DB_POOL_TIMEOUT': 0.5})
+    client = streaming.test_client()
+
+    def failing(*args, **kwargs):
+        raise RuntimeError('boom')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(app_module, 'paginate_query', failing)
+        with pytest.raises(RuntimeError):
+            client.get('/sites')
+    # A body that is never read is released when the response is closed.
+    client.get('/sites', buffered=False).close()
+    response = client.get('/sites?per_page=2')
+    assert response.status_code == 200
+    assert 'Reddit' in response.get_data(as_text=True)
@@ -0,0 +1,32 @@
+import re
+
+from app import create_app
+
+
+def test_streamed_pages_are_measured_to_the_end(app):
+    app = create_app({**app.config, 'WARMUP': False, 'PROFILING': True,
+                      'SITES_STREAMING': True, 'COMPRESSION': False})
+    client = app.test_client()
+
+    response = client.get('/sites')
+    assert response.is_streamed
+    assert 'streamed;desc="partial' in response.headers['Server-Timing']
+    assert b'Reddit' in response.get_data()
+    response.close()
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert re.search(r'stopidcheck_request_duration_seconds_count\{route="list_sites",method="GET"\} 1\b', metrics)
+    # The page rows are read while the body streams.
+    assert re.search(r'route="list_sites",phase="render"', metrics)
+
+
+def test_buffered_pages_report_full_timings(app):
+    app = create_app({**app.config, 'WARMUP': False, 'PROFILING': True})
+    client = app.test_client()
+
+    response = client.get('/site/2')
+
+    timing = response.headers['Server-Timing']
+    assert 'total;dur=' in timing and 'streamed' not in timing
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert re.search(r'stopidcheck_request_duration_seconds_count\{route="view_site",method="GET"\} 1\b', metrics)
@@ -0,0 +1,27 @@
+import time
+
+from app import MemoryRateLimiter, create_app
+
+
+def test_fast_limits_do_not_evict_slower_buckets():
+    limiter = MemoryRateLimiter()
+    for _ in range(10):
+        assert limiter.consume('suggest:1.2.3.4', 10 / 600, 10) == 0
+    assert limiter.consume('suggest:1.2.3.4', 10 / 600, 10) > 0
+    time.sleep(0.01)
+    # This bucket is full again after a millisecond; the other one is not.
+    limiter.consume('login:5.6.7.8', 1000, 1)
+    assert limiter.consume('suggest:1.2.3.4', 10 / 600, 10) > 0
+
+
+def test_limits_apply_per_forwarded_client(app):
+    app = create_app({**app.config, 'WARMUP': False, 'TRUSTED_PROXIES': 1, 'RATE_LIMIT_LOGIN': '1/300'})
+    client = app.test_client()
+
+    def login(address):
+        return client.post('/login', data={'username': 'x', 'password': 'y'},
+                           headers={'X-Forwarded-For': address}).status_code
+
+    assert login('203.0.113.1') != 429
+    assert login('203.0.113.1') == 429
+    assert login('203.0.113.2') != 429
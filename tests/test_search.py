@@ -0,0 +1,44 @@
+from werkzeug.datastructures import MultiDict
+
+from app import build_fts_query, build_site_query, paginate_query
+
+
+def search(db, text):
+    sql, params, sort_keys = build_site_query(MultiDict({'q': text}))
+    return [row['id'] for row in paginate_query(db, sql, params, sort_keys, 100)]
+
+
+def test_fts_query_quotes_every_token():
+    assert build_fts_query('c++ -foo: bar*') == '"c"* "foo"* "bar"*'
+    assert build_fts_query('  !!! ') == ''
+
+
+def test_triggers_keep_the_index_in_sync(db):
+    cursor = db.execute("INSERT INTO sites (name, url, category, description) "
+                        "VALUES ('Foo', 'https://foo.example', 'Forum', 'Vérification faciale obligatoire')")
+    site_id = cursor.lastrowid
+    db.commit()
+    # Case and accents are folded, tokens are prefixes and all must match.
+    assert search(db, 'verification FACIAL') == [site_id]
+    assert search(db, 'faciale inexistant') == []
+
+    db.execute("UPDATE sites SET description = 'Questionnaire palmipède' WHERE id = ?", (site_id,))
+    db.commit()
+    assert search(db, 'faciale') == []
+    assert search(db, 'palmipede') == [site_id]
+
+    db.execute('DELETE FROM sites WHERE id = ?', (site_id,))
+    db.commit()
+    assert search(db, 'palmipede') == []
+
+
+def test_results_are_ranked_by_relevance(db):
+    rows = [
+        ('Jeux en ligne', 'https://jeux.example',
+         'Un portail de jeux avec de nombreuses rubriques variées, des forums et parfois un casino'),
+        ('Casino Royal', 'https://casino.example', 'Casino en ligne'),
+    ]
+    ids = [db.execute("INSERT INTO sites (name, url, category, description) VALUES (?, ?, 'Jeux', ?)", row).lastrowid
+           for row in rows]
+    db.commit()
+    assert search(db, 'casino') == ids[::-1]
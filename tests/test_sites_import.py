@@ -0,0 +1,75 @@
+import io
+import json
+
+import pytest
+
+from app import iter_json_array
+
+
+def test_partial_import_keeps_missing_columns(app, db, tmp_path):
+    before = db.execute("SELECT * FROM sites WHERE name = 'Reddit'").fetchone()
+    source = tmp_path / 'partial.csv'
+    source.write_text('name,url,category\nReddit,https://reddit.com/,Forum\n', encoding='utf-8')
+
+    result = app.test_cli_runner().invoke(args=['sites', 'import', str(source)])
+
+    assert result.exit_code == 0, result.output
+    assert '0 sites added, 1 updated' in result.output
+    after = db.execute('SELECT * FROM sites WHERE id = ?', (before['id'],)).fetchone()
+    assert after['category'] == 'Forum'
+    assert after['url'] == 'https://reddit.com/'
+    for column in ('description', 'context', 'sources', 'verification_type', 'country', 'status'):
+        assert after[column] == before[column]
+    assert after['severity_rank'] == before['severity_rank']
+    countries = [row[0] for row in db.execute('SELECT country FROM site_countries WHERE site_id = ?', (before['id'],))]
+    assert countries == ['UK']
+    assert db.execute('SELECT COUNT(*) FROM site_categories WHERE site_id = ? AND category = ?',
+                      (before['id'], 'Forum')).fetchone()[0] == 1
+
+
+def test_import_inserts_new_sites_with_their_ids(app, db, tmp_path):
+    source = tmp_path / 'new.ndjson'
+    source.write_text(
+        '{"name": "Foo", "url": "https://foo.example", "category": "Forum", "country": "FR",'
+        ' "alternatives": [{"name": "Bar", "url": "https://bar.example"}]}\n'
+        '{"name": "Baz", "url": "https://baz.example", "category": "Jeux", "country": "UK"}\n',
+        encoding='utf-8')
+
+    result = app.test_cli_runner().invoke(args=['sites', 'import', str(source)])
+
+    assert result.exit_code == 0, result.output
+    assert '2 sites added, 0 updated' in result.output
+    rows = {row['name']: row['id'] for row in db.execute("SELECT id, name FROM sites WHERE name IN ('Foo', 'Baz')")}
+    alternatives = [row[0] for row in db.execute('SELECT alt_name FROM alternatives WHERE site_id = ?', (rows['Foo'],))]
+    assert alternatives == ['Bar']
+    countries = [row[0] for row in db.execute('SELECT country FROM site_countries WHERE site_id = ?', (rows['Baz'],))]
+    assert countries == ['UK']
+
+
+def test_json_import_spans_several_lookup_chunks(app, db, tmp_path):
+    source = tmp_path / 'many.json'
+    sites = [{'name': f'Site {i}', 'url': f'https://site{i}.example', 'category': 'Forum'} for i in range(1200)]
+    source.write_text(json.dumps(sites, indent=1), encoding='utf-8')
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['sites', 'import', '--batch-size', '5000', str(source)])
+    assert result.exit_code == 0, result.output
+    assert '1200 sites added, 0 updated' in result.output
+
+    for site in sites:
+        site['category'] = 'Jeux'
+    source.write_text(json.dumps(sites), encoding='utf-8')
+    result = runner.invoke(args=['sites', 'import', '--batch-size', '5000', str(source)])
+    assert result.exit_code == 0, result.output
+    assert '0 sites added, 1200 updated' in result.output
+    assert db.execute("SELECT COUNT(*) FROM sites WHERE url LIKE 'https://site%' AND category = 'Jeux'").fetchone()[0] == 1200
+
+
+def test_iter_json_array_reads_items_split_across_chunks():
+    items = [{'name': 'Foo', 'n': 12345}, 1.5e10, 'a,]', [1, [2]], None]
+    text = json.dumps(items)
+    for chunk_size in (1, 2, 5, 64):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == items
+    for bad in ('{}', '[1 2]', '[1,'):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(bad), 2))
@@ -0,0 +1,52 @@
+import pytest
+
+import app as app_module
+
+
+def suggest(client, name, url):
+    return client.post('/suggest', data={
+        'name': name, 'url': url, 'category': ['Adulte'],
+        'country': ['FR'], 'verification_type': ['Selfie'],
+    })
+
+
+def pending(db):
+    return [tuple(row) for row in db.execute('SELECT name, submission_count FROM suggestions ORDER BY id')]
+
+
+@pytest.mark.parametrize('url', ['https://', 'http://', 'not a url', 'javascript:alert(1)', 'mailto:a@b.fr'])
+def test_suggest_rejects_urls_without_a_host(app, db, url):
+    response = suggest(app.test_client(), 'Alpha', url)
+    assert response.status_code == 200
+    assert 'adresse de site valide' in response.get_data(as_text=True)
+    assert pending(db) == []
+
+
+def test_unparseable_urls_do_not_merge_different_names(app, db, monkeypatch):
+    # Rows written before the form checked URLs have an empty key, which
+    # must not act as a shared identity.
+    monkeypatch.setattr(app_module, 'is_site_url', lambda url: True)
+    client = app.test_client()
+    suggest(client, 'Alpha Streaming', 'https://')
+    suggest(client, 'Zebra Cams', 'http://')
+    assert pending(db) == [('Alpha Streaming', 1), ('Zebra Cams', 1)]
+
+
+def test_same_url_key_merges(app, db):
+    client = app.test_client()
+    suggest(client, 'Alpha Streaming', 'https://www.alpha.example/')
+    suggest(client, 'Something Else', 'http://alpha.example')
+    assert pending(db) == [('Alpha Streaming', 2)]
+
+
+def test_similar_names_merge_and_distinct_names_do_not(app, db):
+    client = app.test_client()
+    suggest(client, 'Alpha Streaming', 'https://alpha.example')
+    suggest(client, 'alpha-streaming', 'https://alpha-streaming.example')
+    suggest(client, 'Zebra Cams', 'https://zebra.example')
+    assert pending(db) == [('Alpha Streaming', 2), ('Zebra Cams', 1)]
+
+
+def test_listed_url_is_not_suggested(app, db):
+    suggest(app.test_client(), 'Reddit again', 'http://reddit.com/')
+    assert pending(db) == []
@@ -0,0 +1,20 @@
+import click
+
+from app import create_app
+
+
+def test_cli_commands_skip_the_warm_up(app):
+    with click.Context(click.Command('sites')):
+        cold = create_app(dict(app.config))
+    assert len(cold.jinja_env.cache) == 0
+    warm = create_app(dict(app.config))
+    assert len(warm.jinja_env.cache) > 0
+
+
+def test_cold_application_loads_its_caches_on_first_use(app):
+    with click.Context(click.Command('sites')):
+        cold = create_app(dict(app.config))
+    client = cold.test_client()
+    assert client.get('/api/lookup?host=www.reddit.com').get_json()['sites'][0]['name'] == 'Reddit'
+    assert client.get('/api/suggest?prefix=redit').get_json()['results'][0]['name'] == 'Reddit'
+    assert client.get('/site/2').status_code == 200
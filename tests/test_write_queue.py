@@ -0,0 +1,43 @@
+import gc
+import threading
+import time
+
+from app import WriteQueue, create_app, open_write_queues
+
+
+def test_close_does_not_block_on_a_full_queue():
+    release = threading.Event()
+    written = []
+
+    def handler(batch):
+        release.wait()
+        written.extend(batch)
+
+    write_queue = WriteQueue(handler, 1, 10, lambda exc, batch: None)
+    assert write_queue.submit(1)
+    time.sleep(0.05)  # the writer is now blocked on the first item
+    assert write_queue.submit(2)
+    started = time.monotonic()
+    write_queue.close(0.2)
+    assert time.monotonic() - started < 1
+    release.set()
+
+
+def test_close_flushes_pending_items():
+    written = []
+    write_queue = WriteQueue(written.extend, 100, 10, lambda exc, batch: None)
+    for item in range(25):
+        assert write_queue.submit(item)
+    write_queue.close(5)
+    assert written == list(range(25))
+    assert not write_queue.submit(25)
+
+
+def test_discarded_applications_are_not_kept_for_exit(app):
+    gc.collect()
+    count = len(open_write_queues)
+    other = create_app({**app.config, 'WARMUP': False})
+    assert len(open_write_queues) == count + 1
+    del other
+    gc.collect()
+    assert len(open_write_queues) == count
@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The application is configured from the environment (see README.md).
+"""
+
+from app import create_app
+
+app = create_app()